@@ -1,7 +1,15 @@
-from fastapi import FastAPI
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from text_processor import TextProcessor
+from starlette.requests import ClientDisconnect
+from config import Config
+from model_service import get_model_service
 
 app = FastAPI(title="Email Extraction AI Service")
 
@@ -13,7 +21,14 @@ app.add_middleware(
 	allow_headers=["*"],
 )
 
-processor = TextProcessor()
+# Loaded and warmed up once per process, before the first request
+model_service = get_model_service().start()
+processor = model_service.text_processor
+
+# Extraction is CPU-bound: it runs on a small dedicated pool so the event loop
+# keeps answering /health while requests queue for the model
+extraction_executor = ThreadPoolExecutor(max_workers=max(1, Config.API_EXECUTOR_WORKERS),
+	thread_name_prefix="extract")
 
 class ExtractRequest(BaseModel):
 	text: str
@@ -21,15 +36,160 @@ class ExtractRequest(BaseModel):
 class ExtractResponse(BaseModel):
 	data: dict
 
+class BatchExtractRequest(BaseModel):
+	texts: List[str]
+
+class BatchExtractResponse(BaseModel):
+	data: List[dict]
+
+def check_text_length(text: str, index: int = None):
+	"""Reject texts over API_MAX_TEXT_LENGTH with 413."""
+	if len(text) > Config.API_MAX_TEXT_LENGTH:
+		where = f"texts[{index}]" if index is not None else "text"
+		raise HTTPException(status_code=413,
+			detail=f"{where} is {len(text)} characters; the limit is {Config.API_MAX_TEXT_LENGTH}")
+
+async def run_extraction(func, *args):
+	loop = asyncio.get_running_loop()
+	return await loop.run_in_executor(extraction_executor, func, *args)
+
 @app.get("/health")
 def health():
-	return {"status": "ok"}
+	status = model_service.status()
+	return {
+		"status": "ok",
+		"ner_available": status["ner_available"],
+		"ner_backend": status["ner_backend"],
+		"model_load_seconds": status["load_seconds"],
+		"model_memory_mb": status["model_memory_mb"],
+		"process_memory_mb": status["process_memory_mb"],
+		"result_cache": status["result_cache"],
+	}
 
 @app.post("/extract", response_model=ExtractResponse)
-def extract(req: ExtractRequest):
-	data = processor.extract_all_job_info(req.text)
+async def extract(req: ExtractRequest):
+	check_text_length(req.text)
+	data = await run_extraction(processor.extract_all_job_info, req.text)
+	return {"data": data}
+
+@app.post("/extract/batch", response_model=BatchExtractResponse)
+async def extract_batch(req: BatchExtractRequest):
+	"""Extract many texts in one call; the NER model sees them in batches. Results are in input order."""
+	if not req.texts:
+		raise HTTPException(status_code=422, detail="texts must contain at least one text")
+	if len(req.texts) > Config.API_MAX_BATCH_SIZE:
+		raise HTTPException(status_code=413,
+			detail=f"Batch has {len(req.texts)} texts; the limit is {Config.API_MAX_BATCH_SIZE}")
+	for index, text in enumerate(req.texts):
+		check_text_length(text, index)
+	data = await run_extraction(processor.extract_many, req.texts)
 	return {"data": data}
 
+def parse_stream_line(line: bytes):
+	"""Return (text, id, error) for one NDJSON input line: {"text": ..., "id": ...} or a JSON string."""
+	try:
+		item = json.loads(line)
+	except ValueError as e:
+		return None, None, f"invalid JSON: {e}"
+	if isinstance(item, str):
+		item = {"text": item}
+	if not isinstance(item, dict) or not isinstance(item.get("text"), str):
+		return None, None, 'each line must be a JSON object with a "text" string'
+	item_id = item.get("id")
+	if len(item["text"]) > Config.API_MAX_TEXT_LENGTH:
+		return None, item_id, f"text is {len(item['text'])} characters; the limit is {Config.API_MAX_TEXT_LENGTH}"
+	return item["text"], item_id, None
+
+def stream_record(index: int, item_id=None, data: dict = None, error: str = None) -> bytes:
+	record = {"index": index}
+	if item_id is not None:
+		record["id"] = item_id
+	if error is None:
+		record["data"] = data
+	else:
+		record["error"] = error
+	return (json.dumps(record) + "\n").encode("utf-8")
+
+async def extract_stream_lines(lines: List[bytes], first_index: int) -> AsyncIterator[bytes]:
+	"""Extract one batch of input lines and yield one NDJSON result line per input, in order."""
+	parsed = [parse_stream_line(line) for line in lines]
+	texts = [text for text, _, error in parsed if error is None]
+	results = iter(await run_extraction(processor.extract_many, texts) if texts else [])
+	for offset, (_, item_id, error) in enumerate(parsed):
+		data = next(results) if error is None else None
+		yield stream_record(first_index + offset, item_id, data, error)
+
+async def stream_results(request: Request) -> AsyncIterator[bytes]:
+	"""Read NDJSON from the request as it arrives and stream results back batch by batch.
+	
+	At most one partial line and one batch of API_STREAM_BATCH_SIZE lines are held
+	at a time; complete lines are extracted as soon as they arrive. Batches left
+	once the body is read are dropped if the client has gone.
+	"""
+	max_line_bytes = Config.API_MAX_TEXT_LENGTH * 6 + 1024  # worst-case JSON escaping
+	batch_size = max(1, Config.API_STREAM_BATCH_SIZE)
+	pending = b""
+	skipping = False  # inside an oversized line, dropping bytes up to its end
+	body_read = False
+	index = 0
+
+	async def flush(lines: List[bytes]) -> AsyncIterator[bytes]:
+		nonlocal index
+		lines = [line for line in lines if line.strip()]
+		for start in range(0, len(lines), batch_size):
+			# While the body is being read, request.stream() raises ClientDisconnect
+			# instead; polling then would swallow body messages
+			if body_read and await request.is_disconnected():
+				return
+			batch = lines[start:start + batch_size]
+			async for output in extract_stream_lines(batch, index):
+				yield output
+			index += len(batch)
+
+	async for chunk in request.stream():
+		pending += chunk
+		if skipping:
+			if b"\n" not in pending:
+				pending = b""
+				continue
+			pending = pending.split(b"\n", 1)[1]
+			skipping = False
+		*lines, pending = pending.split(b"\n")
+		async for output in flush(lines):
+			yield output
+		if len(pending) > max_line_bytes:
+			yield stream_record(index, error=f"line exceeds {max_line_bytes} bytes")
+			index += 1
+			pending, skipping = b"", True
+	body_read = True
+	async for output in flush([pending]):
+		yield output
+
+class RequestStreamingResponse(StreamingResponse):
+	"""StreamingResponse whose body iterator is still reading the request body.
+	
+	Starlette's disconnect listener would race the iterator for request body
+	messages, so it is left out; a client disconnect surfaces as ClientDisconnect
+	from request.stream(), and the iterator checks for one itself once the body
+	is read. Background tasks run after the response as usual.
+	"""
+	async def __call__(self, scope, receive, send):
+		try:
+			await self.stream_response(send)
+		except OSError:
+			raise ClientDisconnect()
+		if self.background is not None:
+			await self.background()
+
+@app.post("/extract/stream")
+async def extract_stream(request: Request):
+	"""Extract a backlog sent as newline-delimited JSON, streaming back one result line per input line.
+	
+	Each output line is {"index": n, "id": ..., "data": {...}} or {"index": n, "id": ..., "error": "..."},
+	in input order; "id" is echoed when the input line has one.
+	"""
+	return RequestStreamingResponse(stream_results(request), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
 	import uvicorn
 	uvicorn.run(app, host="0.0.0.0", port=8001)
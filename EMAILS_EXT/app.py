@@ -7,15 +7,25 @@ import time
 import threading
 import schedule
 import os
+import io
 import json
+from collections import deque
 from typing import Dict, List, Optional
 
 # Import our custom modules
 from email_client import EmailClient
-from text_processor import TextProcessor
 from excel_manager import ExcelManager
+from extraction_engine import prefetch
+from model_service import get_model_service
+from sync_state import SyncState
+from dedupe_index import dedupe_key
+from job_classifier import get_job_classifier
+from records import JobRecord
 from config import Config
 
+# Extraction type that only fetches mail above the persisted UID mark
+INCREMENTAL_SYNC = "New Emails (Incremental Sync)"
+
 # Page configuration
 st.set_page_config(
     page_title="Email Job Extractor",
@@ -55,11 +65,19 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner="Loading NER model...")
+def load_model_service():
+    """Load the shared model once per process; every session and rerun reuses it."""
+    return get_model_service().start()
+
 class EmailJobExtractorApp:
     def __init__(self):
         self.email_client = None
-        self.text_processor = TextProcessor()
+        self.model_service = load_model_service()
+        self.text_processor = self.model_service.text_processor
+        self.extraction_engine = self.model_service.extraction_engine
         self.excel_manager = ExcelManager()
+        self.job_gate = get_job_classifier()
         self.scheduler_thread = None
         self.is_running = False
         
@@ -165,12 +183,10 @@ class EmailJobExtractorApp:
             # Use a new Excel file for the new account
             safe_email = email_address.replace('@', '_at_').replace('.', '_')
             new_excel_filename = f"job_emails_{safe_email}.xlsx"
-            # Clear the Excel file for the new account
-            import pandas as pd
-            empty_df = pd.DataFrame(columns=self.excel_manager.columns)
-            empty_df.to_excel(new_excel_filename, index=False, engine='openpyxl')
+            # Clear the job store for the new account
             self.excel_manager = ExcelManager(new_excel_filename)
-            st.sidebar.success(f"Switched account! All previous data cleared. Excel file reset: {new_excel_filename}")
+            self.excel_manager.clear_data()
+            st.sidebar.success(f"Switched account! All previous data cleared. Job store reset: {self.excel_manager.db_filename}")
         # Always update prev_email_address in session state
         st.session_state['prev_email_address'] = email_address
         # Use a new Excel file for each account
@@ -182,19 +198,14 @@ class EmailJobExtractorApp:
         st.sidebar.markdown("---")
         if st.sidebar.button("🗑️ Delete Previous Data", key="delete_previous_data"):
             try:
-                import os
-                if os.path.exists(new_excel_filename):
-                    os.remove(new_excel_filename)
+                self.excel_manager.clear_data()
+                # Forget sync marks so deleted emails can be fetched again
+                SyncState().reset()
                 # Clear all session state except prev_email_address
                 for key in list(st.session_state.keys()):
                     if key != 'prev_email_address':
                         del st.session_state[key]
-                # Recreate empty Excel file
-                import pandas as pd
-                empty_df = pd.DataFrame(columns=self.excel_manager.columns)
-                empty_df.to_excel(new_excel_filename, index=False, engine='openpyxl')
-                self.excel_manager = ExcelManager(new_excel_filename)
-                st.sidebar.success(f"All previous data deleted. Excel file reset: {new_excel_filename}")
+                st.sidebar.success(f"All previous data deleted. Job store reset: {self.excel_manager.db_filename}")
             except Exception as e:
                 st.sidebar.error(f"Failed to delete previous data: {e}")
 
@@ -324,14 +335,9 @@ class EmailJobExtractorApp:
         if st.sidebar.button("🗑️ Clear All Data", type="secondary", key="clear_all_data"):
             if st.sidebar.checkbox("Confirm deletion"):
                 try:
-                    # Method 1: Try to delete the file completely
-                    if os.path.exists(self.excel_manager.filename):
-                        os.remove(self.excel_manager.filename)
-                        st.sidebar.success("✅ Excel file deleted!")
-                    
-                    # Method 2: Create empty file with headers
-                    empty_df = pd.DataFrame(columns=self.excel_manager.columns)
-                    empty_df.to_excel(self.excel_manager.filename, index=False, engine='openpyxl')
+                    if self.excel_manager.clear_data():
+                        st.sidebar.success("✅ Job data deleted!")
+                    SyncState().reset()
                     
                     # Clear session state
                     if hasattr(st.session_state, 'last_extraction_results'):
@@ -348,9 +354,11 @@ class EmailJobExtractorApp:
         if st.sidebar.button("💥 Force Clear (Nuclear)", type="secondary", key="force_clear_nuclear"):
             if st.sidebar.checkbox("I understand this will delete everything"):
                 try:
-                    # Delete the file completely
-                    if os.path.exists(self.excel_manager.filename):
-                        os.remove(self.excel_manager.filename)
+                    # Delete the job store and its Excel export completely
+                    for filename in (self.excel_manager.filename, self.excel_manager.db_filename):
+                        if os.path.exists(filename):
+                            os.remove(filename)
+                    SyncState().reset()
                     
                     # Clear all session state
                     for key in list(st.session_state.keys()):
@@ -367,17 +375,50 @@ class EmailJobExtractorApp:
                 except Exception as e:
                     st.sidebar.error(f"❌ Nuclear clear failed: {str(e)}")
         
+        # Shared NER model: load time and memory
+        st.sidebar.markdown("---")
+        st.sidebar.markdown("### 🤖 Model")
+        model_status = self.model_service.status()
+        if model_status['loaded']:
+            st.sidebar.write(f"**NER:** {'BERT (' + model_status['ner_backend'] + ')' if model_status['ner_available'] else 'Rule-based only'}")
+            st.sidebar.write(f"**Load Time:** {model_status['load_seconds']:.1f}s"
+                             + (f" (+{model_status['warmup_seconds']:.1f}s warm-up)" if model_status['warmup_seconds'] else ""))
+            if model_status['model_memory_mb'] is not None:
+                st.sidebar.write(f"**Model Memory:** {model_status['model_memory_mb']:.0f} MB")
+            if model_status['process_memory_mb'] is not None:
+                st.sidebar.write(f"**Process Memory:** {model_status['process_memory_mb']:.0f} MB")
+            cache_stats = model_status['result_cache']
+            if cache_stats:
+                st.sidebar.write(f"**Result Cache:** {cache_stats['hit_rate']:.0%} hits "
+                                 f"({cache_stats['memory_hits'] + cache_stats['disk_hits']} of "
+                                 f"{cache_stats['memory_hits'] + cache_stats['disk_hits'] + cache_stats['misses']})")
+            st.sidebar.caption(f"Loaded at {model_status['loaded_at'].strftime('%H:%M:%S')}, shared by all sessions")
+        if st.sidebar.button("🔄 Reload Model", key="reload_model"):
+            self.model_service.shutdown()
+            load_model_service.clear()
+            st.rerun()
+        
         # Show last extraction results in sidebar
         if hasattr(st.session_state, 'last_extraction_results') and st.session_state.last_extraction_results:
             st.sidebar.markdown("---")
             st.sidebar.markdown("### 📋 Last Extraction")
             results = st.session_state.last_extraction_results
             st.sidebar.write(f"**Jobs Found:** {results['job_count']}")
+            if results.get('bytes_saved'):
+                st.sidebar.write(f"**Download Saved:** {results['bytes_saved'] / 1024:.1f} KB "
+                                 f"({results.get('skipped_duplicates', 0)} duplicates skipped)")
+            parts_saved = results.get('fetch_stats', {}).get('parts_saved')
+            if parts_saved:
+                st.sidebar.write(f"**Attachments Not Downloaded:** {parts_saved / 1024:.1f} KB")
+            gate_stats = results.get('gate_stats')
+            if gate_stats and gate_stats['checked']:
+                st.sidebar.write(f"**Non-Job Skipped:** {gate_stats['skipped']} of {gate_stats['checked']} "
+                                 f"({gate_stats['avg_ms']:.2f} ms/email gate)")
             st.sidebar.write(f"**Time:** {st.session_state.last_run.strftime('%H:%M:%S') if st.session_state.last_run else 'N/A'}")
             
             if st.sidebar.button("📥 Download Results", key="download_results"):
                 if results['job_data']:
-                    results_df = pd.DataFrame(results['job_data'])
+                    results_df = pd.DataFrame([dict(job) for job in results['job_data']])
                     csv_data = results_df.to_csv(index=False)
                     st.sidebar.download_button(
                         label="📄 Download CSV",
@@ -481,8 +522,8 @@ class EmailJobExtractorApp:
             st.metric("Industries", len(stats.get('industries', [])))
             st.markdown('</div>', unsafe_allow_html=True)
         
-        # Load data for charts
-        df = self.excel_manager.load_existing_data()
+        # Load only the columns the charts use
+        df = self.excel_manager.load_existing_data(columns=['Job_Type', 'Company_Name', 'Extraction_Date'])
         
         if not df.empty:
             # Charts
@@ -526,7 +567,7 @@ class EmailJobExtractorApp:
             st.markdown("### 📥 Extraction Options")
             extraction_type = st.selectbox(
                 "Extraction Type",
-                ["Unread Emails Only", "Date Range", "All Emails", "Custom Filter"]
+                ["Unread Emails Only", INCREMENTAL_SYNC, "Date Range", "All Emails", "Custom Filter"]
             )
             
             max_emails = st.number_input("Maximum Emails", 1, 100, 10)
@@ -667,6 +708,10 @@ class EmailJobExtractorApp:
                             'email_status': email_status,
                             'sender_filter': sender_filter,
                             'subject_filter': subject_filter,
+                            'min_size_kb': min_size,
+                            # The widget maximum means no upper limit
+                            'max_size_kb': max_size if max_size < 10000 else None,
+                            'has_attachment': has_attachment,
                             'mark_as_read': mark_as_read,
                             'save_to_excel': save_to_excel,
                             'show_notification': show_notification
@@ -783,11 +828,11 @@ class EmailJobExtractorApp:
             
             with export_cols[1]:
                 try:
-                    # Create Excel export
+                    # Create Excel export in memory, only for the download
                     excel_filename = f"jobs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                    filtered_df.to_excel(excel_filename, index=False, engine='openpyxl')
-                    with open(excel_filename, 'rb') as f:
-                        excel_data = f.read()
+                    excel_buffer = io.BytesIO()
+                    filtered_df.to_excel(excel_buffer, index=False, engine='openpyxl')
+                    excel_data = excel_buffer.getvalue()
                     st.download_button(
                         "📊 Export to Excel",
                         excel_data,
@@ -942,8 +987,10 @@ Total Jobs Found: {len(job_data)}
     def run_extraction(self, extraction_type="Unread Emails Only", max_emails=10, 
                       email_status="All", start_datetime=None, end_datetime=None, 
                       sender_filter="", subject_filter="", mark_as_read=True, 
-                      save_to_excel=True, show_notification=True):
+                      save_to_excel=True, show_notification=True,
+                      min_size_kb=0, max_size_kb=None, has_attachment="All"):
         """Run email extraction with given parameters and deduplication"""
+        email_feed = None
         try:
             # Initialize email client with latest values
             self.email_client = EmailClient(
@@ -955,89 +1002,108 @@ Total Jobs Found: {len(job_data)}
             if not self.email_client.connect():
                 return {'success': False, 'error': 'Failed to connect to email server'}
             
-            # Get already processed Message-IDs to skip duplicates
-            processed_message_ids = self.excel_manager.get_processed_message_ids()
+            # Processed-email index (Bloom filter in memory, exact set on disk) to skip duplicates
+            self.excel_manager.create_excel_file()
+            processed_index = self.excel_manager.dedupe_index
             
-            # Fetch emails based on type and status
+            # Filters compiled into one server-side IMAP SEARCH, so only matching mail is downloaded
+            subject_keywords = [k.strip().lower() for k in subject_filter.split(',') if k.strip()] if subject_filter else []
+            search_filters = {
+                'seen': {"Unread Only": False, "Read Only": True}.get(email_status),
+                'sender': sender_filter or None,
+                'subject_keywords': subject_keywords or None,
+                'min_size': min_size_kb * 1024 if min_size_kb else None,
+                'max_size': max_size_kb * 1024 if max_size_kb is not None else None,
+                'has_attachment': {"With Attachments": True, "Without Attachments": False}.get(has_attachment),
+            }
+            
+            # Stream emails based on type and status
             if extraction_type == "Unread Emails Only":
-                emails = self.email_client.fetch_unread_emails(
+                if email_status == "Read Only":
+                    st.warning("'Read Only' conflicts with 'Unread Emails Only'; fetching unread emails.")
+                email_stream = self.email_client.iter_unread_emails(
                     max_emails=max_emails, 
-                    skip_processed_ids=processed_message_ids
+                    skip_processed_ids=processed_index,
+                    filters=dict(search_filters, seen=None)
+                )
+            elif extraction_type == INCREMENTAL_SYNC:
+                # Only UIDs above the stored mark, whether or not they were read elsewhere
+                email_stream = self.email_client.iter_new_emails(
+                    max_emails=max_emails,
+                    skip_processed_ids=processed_index
                 )
-            elif extraction_type == "Date Range" and start_datetime and end_datetime:
-                emails = self.email_client.fetch_emails_by_date_range(
-                    start_datetime, end_datetime, max_emails=max_emails
+            elif extraction_type in ("Date Range", "Custom Filter") and start_datetime and end_datetime:
+                email_stream = self.email_client.iter_emails_by_date_range(
+                    start_datetime, end_datetime, max_emails=max_emails,
+                    skip_processed_ids=processed_index,
+                    filters=search_filters
                 )
-                # Filter out already processed emails
-                emails = [e for e in emails if e.get('message_id', '') not in processed_message_ids]
-            elif extraction_type == "Custom Filter" and start_datetime and end_datetime:
-                emails = self.email_client.fetch_emails_by_date_range(
-                    start_datetime, end_datetime, max_emails=max_emails
+            elif extraction_type == "All Emails":
+                email_stream = self.email_client.iter_search_emails(
+                    self.email_client.build_search_query(**search_filters),
+                    max_emails=max_emails,
+                    skip_processed_ids=processed_index
                 )
-                # Filter out already processed emails
-                emails = [e for e in emails if e.get('message_id', '') not in processed_message_ids]
-            else:  # All Emails or fallback
-                emails = self.email_client.fetch_unread_emails(
+            else:  # Fallback
+                email_stream = self.email_client.iter_unread_emails(
                     max_emails=max_emails, 
-                    skip_processed_ids=processed_message_ids
+                    skip_processed_ids=processed_index
                 )
             
-            if not emails:
-                return {
-                    'success': True, 
-                    'job_count': 0, 
-                    'job_data': [],
-                    'email_count': 0,
-                    'total_emails_processed': 0,
-                    'skipped_duplicates': len(processed_message_ids)
-                }
-            
-            # Apply email status filter
-            if email_status == "Unread Only":
-                # Emails are already unread from fetch_unread_emails
-                pass
-            elif email_status == "Read Only":
-                # This would require fetching all emails and filtering by read status
-                # For now, we'll skip this as it requires more complex IMAP operations
-                st.warning("Read-only filtering not implemented yet. Fetching unread emails.")
-            
-            # Apply sender filter
+            # The server already matched these; re-checking locally covers incremental
+            # sync and non-ASCII filters the SEARCH query leaves out
             if sender_filter:
-                emails = [e for e in emails if sender_filter.lower() in e.get('sender', '').lower()]
+                email_stream = (e for e in email_stream if sender_filter.lower() in e.get('sender', '').lower())
             
-            # Apply subject filter
-            if subject_filter:
-                keywords = [k.strip().lower() for k in subject_filter.split(',')]
-                filtered_emails = []
-                for e in emails:
-                    subject = e.get('subject', '').lower()
-                    if any(keyword in subject for keyword in keywords):
-                        filtered_emails.append(e)
-                emails = filtered_emails
+            if subject_keywords:
+                email_stream = (e for e in email_stream
+                                if any(keyword in e.get('subject', '').lower() for keyword in subject_keywords))
+            
+            # Fetch in a background thread, at most FETCH_QUEUE_SIZE emails ahead of extraction
+            email_feed = prefetch(email_stream)
             
-            # Process emails and extract job information
             job_data = []
             processed_emails = []
             skipped_count = 0
-            progress_bar = st.progress(0, text="Processing emails...")
-            total_emails = len(emails)
-            for idx, email_data in enumerate(emails):
-                try:
-                    # Double-check Message-ID to prevent duplicates
-                    message_id = email_data.get('message_id', '')
-                    if message_id in processed_message_ids:
+            total_emails = 0
+            pending_emails = deque()
+            extracted_keys = []
+            gate_stats = {'checked': 0, 'skipped': 0, 'seconds': 0.0}
+            
+            def new_email_bodies():
+                nonlocal skipped_count, total_emails
+                for email_data in email_feed:
+                    total_emails += 1
+                    # Double-check by Message-ID, or content fingerprint if there is none
+                    if email_data in processed_index:
                         skipped_count += 1
                         continue
-                    # Extract job information
-                    job_info = self.text_processor.extract_all_job_info(email_data['body'])
-                    # Add email metadata
-                    job_info.update({
-                        'email_date': email_data.get('date', ''),
-                        'sender': email_data.get('sender', ''),
-                        'subject': email_data.get('subject', ''),
-                        'message_id': message_id,
-                        'raw_email': email_data.get('body', '')
-                    })
+                    # Cheap job/non-job gate on headers and the start of the body
+                    if Config.JOB_GATE_ENABLED:
+                        gate_start = time.perf_counter()
+                        is_job = self.job_gate.is_job_email(email_data)
+                        gate_stats['seconds'] += time.perf_counter() - gate_start
+                        gate_stats['checked'] += 1
+                        if not is_job:
+                            # Not added to the dedupe index: a retrained or re-tuned gate
+                            # gets to judge the email again on the next run
+                            gate_stats['skipped'] += 1
+                            continue
+                    pending_emails.append(email_data)
+                    yield email_data['body']
+            
+            # Extract job information as emails arrive (worker pool or in-process batches)
+            progress_bar = st.progress(0, text="Processing emails...")
+            for done, job_info in enumerate(self.extraction_engine.iter_extract(new_email_bodies()), 1):
+                email_data = pending_emails.popleft()
+                if job_info.get('error'):
+                    # Not recorded as processed, so a later run can try it again
+                    st.error(f"Error processing email: {job_info['error']}")
+                    continue
+                extracted_keys.append(dedupe_key(email_data))
+                try:
+                    # Email metadata and body go into one compact record; cleaned_text is dropped
+                    job_info = JobRecord.from_extraction(job_info, email_data)
                     # Only add if it looks like a job email
                     if self._is_job_email(job_info, email_data):
                         job_data.append(job_info)
@@ -1045,10 +1111,31 @@ Total Jobs Found: {len(job_data)}
                 except Exception as e:
                     st.error(f"Error processing email: {str(e)}")
                     continue
-                # Update progress bar
-                progress_bar.progress((idx + 1) / total_emails, text=f"Processing email {idx + 1} of {total_emails}")
+                # Update progress bar (the total is not known until the fetch finishes)
+                expected = max(max_emails or done, done)
+                progress_bar.progress(done / expected, text=f"Processed {done} email(s)")
             progress_bar.empty()
             
+            # Emails skipped by the header-only pass never reached the stream
+            fetch_stats = dict(self.email_client.last_fetch_stats)
+            skipped_count += fetch_stats['skipped']
+            gate_stats['avg_ms'] = gate_stats['seconds'] * 1000 / gate_stats['checked'] if gate_stats['checked'] else 0.0
+            
+            if total_emails == 0:
+                if extraction_type == INCREMENTAL_SYNC:
+                    self.email_client.commit_sync_state()
+                return {
+                    'success': True, 
+                    'job_count': 0, 
+                    'job_data': [],
+                    'email_count': 0,
+                    'total_emails_processed': 0,
+                    'skipped_duplicates': len(processed_index),
+                    'bytes_saved': fetch_stats['bytes_saved'],
+                    'fetch_stats': fetch_stats,
+                    'gate_stats': gate_stats
+                }
+            
             # Mark emails as read if requested
             if mark_as_read and processed_emails:
                 self.email_client.mark_emails_as_read(processed_emails)
@@ -1058,6 +1145,14 @@ Total Jobs Found: {len(job_data)}
                 if not self.excel_manager.save_job_data(job_data):
                     return {'success': False, 'error': 'Failed to save job data to Excel'}
             
+            # Remember every extracted email, job or not, so it is skipped next time
+            if save_to_excel:
+                processed_index.add_many(extracted_keys)
+            
+            # Results are saved: move the sync mark past this batch
+            if extraction_type == INCREMENTAL_SYNC:
+                self.email_client.commit_sync_state()
+            
             # Update session state
             st.session_state.current_status = "Completed"
             st.session_state.last_run = datetime.now()
@@ -1065,23 +1160,29 @@ Total Jobs Found: {len(job_data)}
             # Show notification if requested
             if show_notification:
                 if job_data:
-                    st.success(f"✅ Successfully extracted {len(job_data)} job(s) from {len(processed_emails)} email(s). Skipped {skipped_count} duplicates.")
+                    st.success(f"✅ Successfully extracted {len(job_data)} job(s) from {len(processed_emails)} email(s). Skipped {skipped_count} duplicates and {gate_stats['skipped']} non-job emails.")
                 else:
-                    st.info(f"ℹ️ No new job emails found. Skipped {skipped_count} already processed emails.")
+                    st.info(f"ℹ️ No new job emails found. Skipped {skipped_count} already processed emails and {gate_stats['skipped']} non-job emails.")
             
             return {
                 'success': True,
                 'job_count': len(job_data),
                 'job_data': job_data,
                 'email_count': len(processed_emails),
-                'total_emails_processed': len(emails),
-                'skipped_duplicates': skipped_count
+                'total_emails_processed': total_emails,
+                'skipped_duplicates': skipped_count,
+                'bytes_saved': fetch_stats['bytes_saved'],
+                'fetch_stats': fetch_stats,
+                'gate_stats': gate_stats
             }
             
         except Exception as e:
             st.session_state.current_status = "Error"
             return {'success': False, 'error': str(e)}
         finally:
+            # Stop the background fetch before closing the connection it uses
+            if email_feed is not None:
+                email_feed.close()
             if self.email_client:
                 self.email_client.disconnect()
     
@@ -1146,7 +1247,7 @@ Total Jobs Found: {len(job_data)}
             while self.is_running:
                 try:
                     results = self.run_extraction(
-                        extraction_type="Unread Emails",
+                        extraction_type=INCREMENTAL_SYNC,
                         max_emails=max_emails,
                         mark_as_read=True,
                         save_to_excel=True
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark for HTML-to-text conversion of HTML-only emails.
+Compares the previous BeautifulSoup path (when bs4 is installed) with the
+streaming converter's html.parser and lxml backends on a job-board digest
+built from nested table layouts.
+"""
+
+import timeit
+
+from html_text import LXML_AVAILABLE, html_to_text
+
+ROW = """<tr><td class="card"><table width="100%" cellpadding="0" cellspacing="0"><tr>
+<td style="padding:8px"><a href="https://jobs.example.com/{i}"><b>Senior Python Developer {i}</b></a></td>
+<td style="padding:8px">TechCorp Inc.</td></tr>
+<tr><td style="padding:8px">Location: San Francisco, CA</td><td style="padding:8px">$120,000 - $150,000</td></tr>
+</table></td></tr>
+"""
+
+DIGEST = ("<html><head><title>Your job alert</title><style>td {font-family: Arial}</style>"
+          "<script>var tracking = {};</script></head><body><table>"
+          + ''.join(ROW.format(i=i) for i in range(500))
+          + "</table><p>Unsubscribe</p></body></html>")
+
+
+def legacy_html_to_text(html_content: str) -> str:
+    """The previous conversion: a BeautifulSoup tree, then whitespace passes into a single line."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def run_benchmark(number: int = 5):
+    """Time each converter on the digest and print per-email costs."""
+    cases = []
+    try:
+        import bs4  # noqa: F401
+        cases.append(("BeautifulSoup", lambda: legacy_html_to_text(DIGEST)))
+    except ImportError:
+        print("bs4 not installed, skipping the previous BeautifulSoup path")
+    cases.append(("html.parser", lambda: html_to_text(DIGEST, backend='stdlib')))
+    if LXML_AVAILABLE:
+        cases.append(("lxml", lambda: html_to_text(DIGEST, backend='lxml')))
+
+    print(f"⏱️  HTML-to-Text Benchmark ({len(DIGEST) / 1024:.0f} KB digest, "
+          f"{len(html_to_text(DIGEST).splitlines())} lines of text)")
+    print("=" * 60)
+    baseline = None
+    for name, convert in cases:
+        seconds = min(timeit.repeat(convert, number=number, repeat=3)) / number
+        baseline = baseline or seconds
+        print(f"{name:<15} {seconds * 1000:8.1f} ms/email  speedup: {baseline / seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
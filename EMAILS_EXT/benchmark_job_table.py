@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark for reads of the job table.
+Compares reading every column as object dtype (the previous path behind
+get_statistics and search_jobs) with column-projected reads that hold the
+low-cardinality columns as categoricals.
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from excel_manager import STATS_COLUMNS, ExcelManager
+
+COMPANIES = [f"Company {i}" for i in range(200)]
+JOB_TYPES = ['Full-time', 'Part-time', 'Contract', 'Internship', 'Remote']
+INDUSTRIES = ['Technology', 'Finance', 'Healthcare', 'Education', 'Retail', 'Manufacturing']
+SENIORITY = ['Entry', 'Mid', 'Senior', 'Lead', 'Executive']
+
+
+def make_jobs(count: int):
+    rng = random.Random(0)
+    for i in range(count):
+        yield {
+            'message_id': f'<job{i}@example.com>', 'email_date': 'Mon, 15 Jan 2024 10:00:00 +0000',
+            'sender': 'recruiter@example.com', 'subject': f'Job opening {i}', 'job_title': f'Engineer {i % 300}',
+            'years_experience': str(rng.randint(0, 10)), 'required_skills': ['Python', 'SQL', 'AWS'],
+            'company_name': rng.choice(COMPANIES), 'job_type': rng.choice(JOB_TYPES),
+            'industry': rng.choice(INDUSTRIES), 'seniority_level': rng.choice(SENIORITY),
+            'job_summary': 'We are hiring. ' * 30, 'location': f'City {i % 100}',
+            'min_salary': 90000, 'max_salary': 150000, 'raw_email': 'x' * 1000,
+        }
+
+
+def legacy_read(db_filename: str) -> pd.DataFrame:
+    """The previous read: every column, object dtypes."""
+    with sqlite3.connect(db_filename) as conn:
+        return pd.read_sql_query('SELECT * FROM jobs ORDER BY id', conn)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(rows: int = 20000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = ExcelManager(os.path.join(tmp_dir, 'jobs.xlsx'))
+        manager.save_job_data(list(make_jobs(rows)))
+
+        full, full_ms = timed(lambda: legacy_read(manager.db_filename))
+        stats_df, stats_ms = timed(lambda: manager._read_columns(STATS_COLUMNS)[2])
+        found, search_ms = timed(lambda: manager.search_jobs({'Company_Name': 'Company 1'},
+                                                             columns=['Message_ID', 'Job_Title']))
+
+        full_mb = full.memory_usage(deep=True).sum() / 1024 ** 2
+        legacy_stats_mb = full[STATS_COLUMNS].memory_usage(deep=True).sum() / 1024 ** 2
+        stats_mb = stats_df.memory_usage(deep=True).sum() / 1024 ** 2
+        found_mb = found.memory_usage(deep=True).sum() / 1024 ** 2
+
+        print(f"⏱️  Job Table Read Benchmark ({rows} rows)")
+        print("=" * 60)
+        print(f"{'all columns, object':<32} {full_ms:8.1f} ms  {full_mb:8.2f} MB")
+        print(f"{'stats columns, object':<32} {'':>11}  {legacy_stats_mb:8.2f} MB")
+        print(f"{'stats columns, categorical':<32} {stats_ms:8.1f} ms  {stats_mb:8.2f} MB")
+        print(f"{'search, 2 columns returned':<32} {search_ms:8.1f} ms  {found_mb:8.2f} MB ({len(found)} rows)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Accuracy parity and throughput of the NER inference backends.
+Runs the PyTorch pipeline and the ONNX Runtime exports (fp32 and int8) over a
+fixed corpus, reports entity agreement with PyTorch and documents per second,
+and exits non-zero if an ONNX backend falls below its parity threshold.
+
+    python benchmark_ner_backends.py [--repeat N] [--batch-size B]
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+from onnx_ner import ONNXRUNTIME_AVAILABLE, load_onnx_pipeline
+from text_processor import NER_MODEL_NAME, TRANSFORMERS_AVAILABLE
+
+# Minimum entity F1 against the PyTorch pipeline
+PARITY_THRESHOLDS = {'onnx': 0.99, 'onnx-int8': 0.95}
+
+CORPUS = [
+    "We are hiring a Senior Python Developer at TechCorp Inc. in San Francisco, CA. "
+    "Please send your resume to Sarah Johnson by December 31, 2024.",
+    "Microsoft is looking for a Data Scientist to join the Azure AI team in Redmond, Washington. "
+    "Experience with PyTorch and Spark is required.",
+    "Goldman Sachs has an opening for a Quantitative Analyst in New York. "
+    "Contact Michael Chen at the London office for details.",
+    "Join Shopify as a Staff Frontend Engineer, remote within Canada. "
+    "You will work with the Checkout team on React and GraphQL.",
+    "Deloitte Consulting seeks an SAP Functional Consultant for a 6-month contract in Berlin, Germany.",
+    "The Mayo Clinic in Rochester, Minnesota is recruiting a Clinical Data Manager. "
+    "Applications are reviewed by Dr. Emily Carter.",
+    "Amazon Web Services is expanding its Seattle office and hiring DevOps Engineers "
+    "with Kubernetes and Terraform experience.",
+    "Infosys is looking for Java Developers in Bangalore and Hyderabad, India. "
+    "Walk-in interviews on Saturday with Rahul Sharma.",
+]
+
+
+def entity_set(entities: List[Dict]) -> Set[Tuple[str, str]]:
+    return {(entity['entity_group'], entity['word'].strip()) for entity in entities}
+
+
+def parity_f1(reference: List[List[Dict]], candidate: List[List[Dict]]) -> float:
+    """Micro F1 of candidate entities against reference entities, over the corpus."""
+    matched = expected = predicted = 0
+    for ref, cand in zip(reference, candidate):
+        ref_set, cand_set = entity_set(ref), entity_set(cand)
+        matched += len(ref_set & cand_set)
+        expected += len(ref_set)
+        predicted += len(cand_set)
+    if not expected and not predicted:
+        return 1.0
+    precision = matched / predicted if predicted else 0.0
+    recall = matched / expected if expected else 0.0
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+
+def throughput(pipeline, texts: List[str], batch_size: int) -> float:
+    """Documents per second, after one warm-up batch."""
+    pipeline(texts[:batch_size], batch_size=batch_size)
+    start = time.perf_counter()
+    pipeline(texts, batch_size=batch_size)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def run_benchmark(repeat: int = 8, batch_size: int = 8) -> int:
+    if not TRANSFORMERS_AVAILABLE or not ONNXRUNTIME_AVAILABLE:
+        print("❌ Needs transformers, torch and onnxruntime: pip install transformers torch onnxruntime onnx")
+        return 1
+
+    from transformers import pipeline
+    backends = {'torch': pipeline("ner", model=NER_MODEL_NAME, aggregation_strategy="simple", device=-1)}
+    backends['onnx'] = load_onnx_pipeline(NER_MODEL_NAME, quantize=False)
+    backends['onnx-int8'] = load_onnx_pipeline(NER_MODEL_NAME, quantize=True)
+
+    reference = backends['torch'](CORPUS, batch_size=batch_size)
+    texts = CORPUS * repeat
+
+    print("⏱️  NER Backend Parity and Throughput")
+    print(f"{len(CORPUS)} documents for parity, {len(texts)} for throughput, batch size {batch_size}")
+    print("=" * 60)
+    failed = False
+    for name, backend in backends.items():
+        f1 = parity_f1(reference, backend(CORPUS, batch_size=batch_size))
+        docs_per_second = throughput(backend, texts, batch_size)
+        threshold = PARITY_THRESHOLDS.get(name)
+        status = "" if threshold is None else ("✅" if f1 >= threshold else "❌")
+        failed = failed or (threshold is not None and f1 < threshold)
+        print(f"{name:<10} entity F1 vs torch: {f1:.3f} {status}  throughput: {docs_per_second:7.1f} docs/s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=8, help="Corpus copies timed for throughput")
+    parser.add_argument('--batch-size', type=int, default=8)
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.repeat, args.batch_size))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the email and job records kept during an extraction run.
+
+Simulates a run over N emails (default 10,000), each with a text body, an HTML
+alternative and a small attachment, and holds on to every email and job the
+way run_extraction does until the run ends. Compares the previous layout
+(email dicts carrying the parsed 'raw_message', job dicts carrying both
+'cleaned_text' and 'raw_email') with EmailRecord/JobRecord. Each layout runs
+in its own process so peak RSS is measured separately.
+
+    python benchmark_records.py [--emails 10000] [--attachment-kb 8]
+"""
+
+import argparse
+import email
+import json
+import os
+import resource
+import subprocess
+import sys
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from email_client import EmailClient
+from records import JobRecord
+
+BODY = """Hi,
+
+We are hiring a Senior Python Developer (#{num}) at TechCorp Inc. in San Francisco, CA.
+This is a full-time position. Requirements: 5+ years of experience with Python, Django and AWS.
+Salary range: $120,000 - $150,000 per year. Apply before December 31, 2024.
+
+Best regards,
+HR Team
+"""
+
+
+def raw_messages(count: int, attachment_kb: int):
+    """Yield RFC822 bytes one at a time, like a fetch stream."""
+    attachment = os.urandom(attachment_kb * 1024)
+    for num in range(count):
+        message = MIMEMultipart('mixed')
+        message['Message-ID'] = f'<job{num}@techcorp.com>'
+        message['From'] = 'recruiter@techcorp.com'
+        message['Subject'] = f'Senior Python Developer #{num}'
+        message['Date'] = 'Mon, 15 Jan 2024 10:00:00 +0000'
+        alternative = MIMEMultipart('alternative')
+        alternative.attach(MIMEText(BODY.format(num=num), 'plain'))
+        alternative.attach(MIMEText(f"<html><body><pre>{BODY.format(num=num)}</pre></body></html>", 'html'))
+        message.attach(alternative)
+        if attachment_kb:
+            pdf = MIMEApplication(attachment, 'pdf')
+            pdf.add_header('Content-Disposition', 'attachment', filename='job_description.pdf')
+            message.attach(pdf)
+        yield message.as_bytes()
+
+
+def fake_extraction(body: str) -> dict:
+    """Stand-in for extract_all_job_info: a typical result, including its cleaned copy of the body."""
+    cleaned_text = ' '.join(body.split())
+    return {
+        'job_title': 'Senior Python Developer', 'years_experience': '5', 'required_skills': ['python', 'django', 'aws'],
+        'company_name': 'TechCorp Inc.', 'job_type': 'Full-time', 'industry': 'Technology',
+        'seniority_level': 'Senior', 'job_summary': cleaned_text[:200], 'location': 'San Francisco, CA',
+        'application_deadline': 'December 31, 2024', 'min_salary': 120000, 'max_salary': 150000,
+        'cleaned_text': cleaned_text,
+    }
+
+
+def run_dicts(count: int, attachment_kb: int):
+    """The previous layout."""
+    client = EmailClient()
+    job_data, processed_emails = [], []
+    for num, raw in enumerate(raw_messages(count, attachment_kb)):
+        message = email.message_from_bytes(raw)
+        email_data = {
+            'subject': message.get('Subject', ''), 'sender': message.get('From', ''),
+            'date': message.get('Date', ''), 'message_id': message.get('Message-ID', ''),
+            'body': client._get_email_body(message), 'raw_message': message, 'message_number': str(num),
+        }
+        job_info = fake_extraction(email_data['body'])
+        job_info.update({'email_date': email_data['date'], 'sender': email_data['sender'],
+                         'subject': email_data['subject'], 'message_id': email_data['message_id'],
+                         'raw_email': email_data['body']})
+        job_data.append(job_info)
+        processed_emails.append(email_data)
+    return job_data, processed_emails
+
+
+def run_records(count: int, attachment_kb: int):
+    """EmailRecord from the client, JobRecord per job."""
+    client = EmailClient()
+    job_data, processed_emails = [], []
+    for num, raw in enumerate(raw_messages(count, attachment_kb)):
+        email_data = client._extract_email_data(email.message_from_bytes(raw))
+        email_data['message_number'] = str(num)
+        job_data.append(JobRecord.from_extraction(fake_extraction(email_data['body']), email_data))
+        processed_emails.append(email_data)
+    return job_data, processed_emails
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emails', type=int, default=10000)
+    parser.add_argument('--attachment-kb', type=int, default=8)
+    parser.add_argument('--layout', choices=('dicts', 'records'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        baseline = peak_rss_mb()
+        runner = run_dicts if args.layout == 'dicts' else run_records
+        job_data, processed_emails = runner(args.emails, args.attachment_kb)
+        print(json.dumps({'peak_rss_mb': peak_rss_mb(), 'baseline_mb': baseline, 'jobs': len(job_data)}))
+        return
+
+    print(f"🧠 Record Memory Benchmark ({args.emails} emails, {args.attachment_kb} KB attachment each)")
+    print("=" * 60)
+    results = {}
+    for layout in ('dicts', 'records'):
+        output = subprocess.run([sys.executable, __file__, '--layout', layout, '--emails', str(args.emails),
+                                 '--attachment-kb', str(args.attachment_kb)],
+                                capture_output=True, text=True, check=True).stdout
+        results[layout] = json.loads(output.strip().splitlines()[-1])
+        growth = results[layout]['peak_rss_mb'] - results[layout]['baseline_mb']
+        print(f"{layout:<8} peak RSS: {results[layout]['peak_rss_mb']:8.1f} MB  (run: +{growth:.1f} MB)")
+    saved = results['dicts']['peak_rss_mb'] - results['records']['peak_rss_mb']
+    print(f"Saved: {saved:.1f} MB ({saved / results['dicts']['peak_rss_mb']:.0%} of peak)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the precompiled regex pattern bank in TextProcessor.
+Compares the current cleaning/extraction path against the previous approach of
+calling re.sub/re.search with pattern strings and flags on every call.
+"""
+
+import re
+import timeit
+
+from text_processor import TextProcessor
+
+SAMPLE_EMAIL = """From: recruiter@techcorp.com
+To: candidate@example.com
+Subject: Senior Python Developer Position
+Date: Mon, 15 Jan 2024 10:00:00 +0000
+Message-ID: <abc123@techcorp.com>
+MIME-Version: 1.0
+Content-Type: text/plain
+
+Hi there,
+
+We are looking for a Senior Python Developer to join our team at TechCorp Inc.
+This is a full-time position based in San Francisco, CA.
+
+Requirements:
+- 5+ years of experience with Python
+- Experience with Django, Flask, and FastAPI
+- Knowledge of AWS and Docker
+
+Salary range: $120,000 - $150,000 per year.
+Application deadline: December 31, 2024
+
+Best regards,
+HR Team
+--
+TechCorp Recruiting
+
+---------- Forwarded message ----------
+On Mon, Jan 15, 2024 someone wrote:
+> earlier message
+"""
+
+
+def legacy_clean_email_text(processor: TextProcessor, text: str) -> str:
+    """The previous cleaning path: one re.sub per pattern, compiled through the re cache."""
+    for pattern in processor.email_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+    for pattern in processor.signature_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+    for pattern in processor.forward_reply_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip()
+
+
+def legacy_regex_extractors(processor: TextProcessor, text: str) -> None:
+    """The previous extractor path: re.search with pattern strings on every call."""
+    for patterns in (processor.basic_job_title_patterns, processor.company_patterns,
+                     processor.location_patterns, processor.experience_patterns,
+                     processor.deadline_patterns, processor.salary_range_patterns):
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                break
+
+
+def current_regex_extractors(processor: TextProcessor, text: str) -> None:
+    """The current extractor path using the precompiled pattern bank."""
+    for name in ('basic_job_title', 'company', 'location', 'experience', 'deadline', 'salary_range'):
+        for pattern in processor.patterns[name]:
+            if pattern.search(text):
+                break
+
+
+def run_benchmark(iterations: int = 2000):
+    """Time legacy vs. precompiled paths and print per-call costs."""
+    processor = TextProcessor()
+    cleaned = processor.clean_email_text(SAMPLE_EMAIL)
+
+    cases = [
+        ("clean_email_text", lambda: legacy_clean_email_text(processor, SAMPLE_EMAIL),
+         lambda: processor.clean_email_text(SAMPLE_EMAIL)),
+        ("regex extractors", lambda: legacy_regex_extractors(processor, cleaned),
+         lambda: current_regex_extractors(processor, cleaned)),
+    ]
+
+    print("⏱️  TextProcessor Regex Micro-Benchmark")
+    print("=" * 60)
+    for name, legacy, current in cases:
+        legacy_time = min(timeit.repeat(legacy, number=iterations, repeat=3)) / iterations
+        current_time = min(timeit.repeat(current, number=iterations, repeat=3)) / iterations
+        print(f"{name:<20} legacy: {legacy_time * 1e6:8.1f}µs  "
+              f"precompiled: {current_time * 1e6:8.1f}µs  "
+              f"speedup: {legacy_time / current_time:.2f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
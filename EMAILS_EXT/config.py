@@ -18,11 +18,65 @@ class Config:
     CHECK_INTERVAL_MINUTES = int(os.getenv('CHECK_INTERVAL_MINUTES', '5'))
     EXCEL_FILENAME = os.getenv('EXCEL_FILENAME', 'job_emails.xlsx')
     MAX_EMAILS_PER_CHECK = int(os.getenv('MAX_EMAILS_PER_CHECK', '50'))
+    # Messages requested per IMAP FETCH command
+    IMAP_FETCH_CHUNK_SIZE = int(os.getenv('IMAP_FETCH_CHUNK_SIZE', '50'))
+    # Download only the text part found via BODYSTRUCTURE, not attachments
+    IMAP_TEXT_PART_FETCH = os.getenv('IMAP_TEXT_PART_FETCH', 'true').lower() == 'true'
+    # Partial-fetch cap on that text part in bytes (0 = no cap)
+    IMAP_BODY_MAX_BYTES = int(os.getenv('IMAP_BODY_MAX_BYTES', '0'))
+    # HTML-only emails: HTML parsed at most, and plain text kept at most, in characters
+    HTML_MAX_INPUT_CHARS = int(os.getenv('HTML_MAX_INPUT_CHARS', '2000000'))
+    HTML_MAX_TEXT_CHARS = int(os.getenv('HTML_MAX_TEXT_CHARS', '100000'))
+    # UIDVALIDITY / last seen UID per mailbox for incremental sync
+    SYNC_STATE_FILE = os.getenv('SYNC_STATE_FILE', 'imap_sync_state.json')
+    # Runs a UID whose fetch keeps failing holds the sync mark back before it is skipped
+    SYNC_MAX_UID_FAILURES = int(os.getenv('SYNC_MAX_UID_FAILURES', '3'))
+    # Bloom filter in front of the processed-email index
+    DEDUPE_BLOOM_CAPACITY = int(os.getenv('DEDUPE_BLOOM_CAPACITY', '100000'))
+    DEDUPE_BLOOM_ERROR_RATE = float(os.getenv('DEDUPE_BLOOM_ERROR_RATE', '0.001'))
     
     # NLP Model Settings
     USE_SPACY = os.getenv('USE_SPACY', 'true').lower() == 'true'
     USE_BERT = os.getenv('USE_BERT', 'true').lower() == 'true'
     CONFIDENCE_THRESHOLD = float(os.getenv('CONFIDENCE_THRESHOLD', '0.7'))
+    NER_BATCH_SIZE = int(os.getenv('NER_BATCH_SIZE', '16'))
+    # NER inference backend: torch, onnx, or onnx-int8 (ONNX Runtime with int8 weights)
+    NER_BACKEND = os.getenv('NER_BACKEND', 'torch')
+    ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR', 'onnx_models')
+    # Long texts run through NER in overlapping token windows, up to a per-document token budget
+    NER_WINDOW_TOKENS = int(os.getenv('NER_WINDOW_TOKENS', '256'))
+    NER_WINDOW_STRIDE = int(os.getenv('NER_WINDOW_STRIDE', '192'))
+    NER_MAX_DOC_TOKENS = int(os.getenv('NER_MAX_DOC_TOKENS', '2048'))
+    
+    # Extraction Engine Settings (0 or 1 worker = extract in-process)
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '0'))
+    EXTRACTION_CHUNK_SIZE = int(os.getenv('EXTRACTION_CHUNK_SIZE', '8'))
+    # Max fetched emails buffered ahead of the extraction stage
+    FETCH_QUEUE_SIZE = int(os.getenv('FETCH_QUEUE_SIZE', '16'))
+    
+    # Extraction Result Cache (in-memory LRU entries + on-disk SQLite tier)
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '1024'))
+    # Defaults to the app directory, so the cache doesn't depend on the working directory
+    RESULT_CACHE_FILE = os.getenv('RESULT_CACHE_FILE') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'extraction_cache.db')
+    
+    # Job Email Gate (skips full extraction of mail that isn't about jobs)
+    JOB_GATE_ENABLED = os.getenv('JOB_GATE_ENABLED', 'true').lower() == 'true'
+    JOB_GATE_BODY_CHARS = int(os.getenv('JOB_GATE_BODY_CHARS', '2000'))
+    # Keyword score needed without a trained model
+    JOB_GATE_MIN_SCORE = float(os.getenv('JOB_GATE_MIN_SCORE', '1.0'))
+    # Probability needed with a trained model
+    JOB_GATE_THRESHOLD = float(os.getenv('JOB_GATE_THRESHOLD', '0.5'))
+    JOB_GATE_MODEL_FILE = os.getenv('JOB_GATE_MODEL_FILE', 'job_gate_model.json')
+    
+    # AI Service API Settings
+    API_MAX_BATCH_SIZE = int(os.getenv('API_MAX_BATCH_SIZE', '64'))
+    API_MAX_TEXT_LENGTH = int(os.getenv('API_MAX_TEXT_LENGTH', '100000'))
+    # Threads running extraction; the model already uses every core per call
+    API_EXECUTOR_WORKERS = int(os.getenv('API_EXECUTOR_WORKERS', '1'))
+    # Lines extracted together by the NDJSON streaming endpoint
+    API_STREAM_BATCH_SIZE = int(os.getenv('API_STREAM_BATCH_SIZE', '16'))
     
     # Job-related keywords for filtering
     JOB_KEYWORDS = [
@@ -0,0 +1,253 @@
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterable, Optional, Union
+
+from config import Config
+
+
+def dedupe_key(email_data: Mapping) -> Optional[str]:
+    """Return the dedupe key of an email (or of a job record built from one).
+
+    Emails are identified by their Message-ID. Emails without one fall back to
+    a fingerprint of sender, date and body, so they no longer all collapse
+    onto the empty string.
+    """
+    message_id = (email_data.get('message_id') or '').strip()
+    if message_id:
+        return f"mid:{message_id}"
+
+    sender = email_data.get('sender') or ''
+    date = email_data.get('date') or email_data.get('email_date') or ''
+    body = email_data.get('body') or email_data.get('raw_email') or ''
+    if not (sender or date or body):
+        return None
+    digest = hashlib.sha256('\0'.join((sender, date, body)).encode('utf-8', 'replace')).hexdigest()
+    return f"fp:{digest}"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter: no false negatives, false positives at about error_rate."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / self.capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8', 'replace'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class DedupeIndex:
+    """Persistent index of processed emails: an in-memory Bloom filter in front of an exact on-disk set.
+
+    Keys live in the dedupe_keys table of the job store database, independent
+    of the job rows. Lookups of new emails are answered by the Bloom filter;
+    only probable hits are confirmed with one indexed query. Every write bumps
+    a dedupe_version counter in the meta table, so keys added by another
+    process are picked up by rebuilding the filter. Supports ``in`` with a
+    Message-ID string or an email dict.
+    """
+
+    def __init__(self, db_filename: str):
+        self.db_filename = db_filename
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None
+        self._count = 0
+        self._file_identity = None
+        # dedupe_version the filter was built at, and the connection used to poll it
+        self._version = None
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._version_conn_pid: Optional[int] = None
+
+    @staticmethod
+    def ensure_table(conn: sqlite3.Connection):
+        """Create the exact backing set and the meta table holding its version, if they don't exist."""
+        conn.execute('CREATE TABLE IF NOT EXISTS dedupe_keys (key TEXT PRIMARY KEY)')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    @staticmethod
+    def bump_version(conn: sqlite3.Connection) -> int:
+        """Count a change to the key set inside the current write transaction; return the new version."""
+        conn.execute("INSERT INTO meta (key, value) VALUES ('dedupe_version', 1) "
+                     "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+        return DedupeIndex._read_version(conn)
+
+    @staticmethod
+    def _read_version(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'dedupe_version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_filename, timeout=30, check_same_thread=check_same_thread)
+        self.ensure_table(conn)
+        return conn
+
+    def _stored_version(self) -> int:
+        """Current dedupe_version on disk; call with self._lock held.
+
+        Read over one kept-open connection per process, so the check on every
+        lookup stays cheap. The index is shared by the fetch and extraction
+        threads, so the connection isn't tied to the thread that opened it;
+        self._lock serializes its use.
+        """
+        if self._version_conn is None or self._version_conn_pid != os.getpid():
+            self._version_conn = self._connect(check_same_thread=False)
+            self._version_conn_pid = os.getpid()
+        return self._read_version(self._version_conn)
+
+    def _current_identity(self):
+        """(device, inode) of the database file, to notice when it is replaced."""
+        try:
+            stat = os.stat(self.db_filename)
+            return (stat.st_dev, stat.st_ino)
+        except OSError:
+            return None
+
+    def _load(self):
+        """Build the Bloom filter from the backing set, unless already built for this file and version."""
+        identity = self._current_identity()
+        if identity != self._file_identity and self._version_conn is not None:
+            # The database file was replaced: stop polling the old one
+            self._version_conn.close()
+            self._version_conn = None
+        if (self._bloom is not None and identity == self._file_identity
+                and self._stored_version() == self._version):
+            return
+
+        conn = self._connect()
+        try:
+            # Version first: keys written after it was read only cause another rebuild
+            version = self._read_version(conn)
+            keys = [row[0] for row in conn.execute('SELECT key FROM dedupe_keys')]
+            conn.commit()
+        finally:
+            conn.close()
+        self._rebuild(keys)
+        self._version = version
+        self._file_identity = self._current_identity()
+        self.logger.info(f"Loaded {len(keys)} dedupe keys from {self.db_filename}")
+
+    def _rebuild(self, keys):
+        capacity = max(Config.DEDUPE_BLOOM_CAPACITY, len(keys) * 2)
+        self._bloom = BloomFilter(capacity, Config.DEDUPE_BLOOM_ERROR_RATE)
+        for key in keys:
+            self._bloom.add(key)
+        self._count = len(keys)
+
+    @staticmethod
+    def _key_of(item: Union[str, Mapping]) -> Optional[str]:
+        # Email/job dicts and EmailRecord/JobRecord alike
+        if isinstance(item, Mapping):
+            return dedupe_key(item)
+        message_id = (item or '').strip()
+        return f"mid:{message_id}" if message_id else None
+
+    def __contains__(self, item: Union[str, Mapping]) -> bool:
+        key = self._key_of(item)
+        if key is None:
+            return False
+        with self._lock:
+            self._load()
+            if key not in self._bloom:
+                return False
+        # Probable hit: confirm against the exact set
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT 1 FROM dedupe_keys WHERE key = ?', (key,)).fetchone() is not None
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return self._count
+
+    def add_many(self, items: Iterable[Union[str, Mapping]], conn: Optional[sqlite3.Connection] = None) -> int:
+        """Record emails (dicts), Message-IDs or ready-made keys as processed. Returns how many were new.
+
+        When ``conn`` is given the keys are written inside the caller's transaction.
+        """
+        keys = []
+        for item in items:
+            key = item if isinstance(item, str) and item.startswith(('mid:', 'fp:')) else self._key_of(item)
+            if key:
+                keys.append(key)
+        if not keys:
+            return 0
+
+        own_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO dedupe_keys (key) VALUES (?)', ((key,) for key in keys))
+            added = conn.total_changes - before
+            version = self.bump_version(conn) if added else None
+            if own_conn:
+                conn.commit()
+        finally:
+            if own_conn:
+                conn.close()
+
+        with self._lock:
+            if self._bloom is not None:
+                for key in keys:
+                    self._bloom.add(key)
+                self._count += added
+                # Only our own write happened since the filter was built: it stays current
+                if version is not None and self._version is not None and version == self._version + 1:
+                    self._version = version
+                if self._count > self._bloom.capacity:
+                    # Past capacity the false positive rate climbs: rebuild larger on next use
+                    self._bloom = None
+        return added
+
+    def add(self, item: Union[str, Mapping]) -> bool:
+        """Record one email as processed."""
+        return self.add_many([item]) > 0
+
+    def clear(self, conn: Optional[sqlite3.Connection] = None):
+        """Forget every processed email."""
+        own_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            conn.execute('DELETE FROM dedupe_keys')
+            self.bump_version(conn)
+            if own_conn:
+                conn.commit()
+        finally:
+            if own_conn:
+                conn.close()
+        with self._lock:
+            self._bloom = None
+
+
+_indexes: Dict[str, DedupeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_dedupe_index(db_filename: str) -> DedupeIndex:
+    """Return the process-wide dedupe index of a job store database."""
+    path = os.path.abspath(db_filename)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = DedupeIndex(db_filename)
+        return _indexes[path]
@@ -1,14 +1,35 @@
 import imaplib
 import email
 import ssl
+import base64
+import quopri
+from itertools import takewhile
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterator, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
 import time
+import re
 
 from config import Config
+from html_text import html_to_text
+from records import EmailRecord
+from sync_state import SyncState
+
+# Leading "<message number> (" of a FETCH response line
+FETCH_RESPONSE_RE = re.compile(rb'^(\d+) \(')
+RFC822_SIZE_RE = re.compile(rb'RFC822\.SIZE (\d+)')
+UID_RE = re.compile(rb'UID (\d+)')
+UIDVALIDITY_RE = re.compile(rb'UIDVALIDITY (\d+)')
+
+# Headers needed to dedupe a message before downloading its body
+HEADER_FETCH_QUERY = '(RFC822.SIZE BODY.PEEK[HEADER.FIELDS (MESSAGE-ID DATE FROM SUBJECT)])'
+# Same headers plus the MIME structure, to locate the text part without downloading attachments
+STRUCTURE_FETCH_QUERY = '(RFC822.SIZE BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS (MESSAGE-ID DATE FROM SUBJECT)])'
+
+# One token of a parenthesized IMAP list: ( ) "quoted" {literal} or an atom such as NIL
+IMAP_TOKEN_RE = re.compile(rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|\{(\d+)\}|([^\s()"]+))')
 
 class EmailClient:
     """Email client for connecting to IMAP servers and fetching emails."""
@@ -21,6 +42,9 @@ class EmailClient:
         self.password = password if password is not None else Config.EMAIL_PASSWORD
         self.connection = None
         self.logger = logging.getLogger(__name__)
+        self.last_fetch_stats = self._new_fetch_stats()
+        # (mailbox key, UIDVALIDITY, highest UID handed out) of the last incremental sync
+        self.pending_sync_mark = None
         
     def connect(self) -> bool:
         """Establish connection to IMAP server."""
@@ -57,20 +81,35 @@ class EmailClient:
     
     def fetch_unread_emails(self, max_emails: int = None, skip_processed_ids: set = None) -> List[Dict]:
         """Fetch unread emails from inbox, skipping already processed ones."""
+        return list(self.iter_unread_emails(max_emails=max_emails, skip_processed_ids=skip_processed_ids))
+    
+    def iter_unread_emails(self, max_emails: int = None, skip_processed_ids: set = None,
+                           filters: Dict = None) -> Iterator[Dict]:
+        """Yield unread emails from inbox as they are downloaded, skipping already processed ones.
+        
+        ``filters`` are build_search_query keyword arguments, applied by the server.
+        """
+        filters = dict(filters or {}, seen=False)
+        yield from self.iter_search_emails(self.build_search_query(**filters), max_emails=max_emails,
+                                           skip_processed_ids=skip_processed_ids)
+    
+    def iter_search_emails(self, search_query: str = 'ALL', max_emails: int = None,
+                           skip_processed_ids: set = None) -> Iterator[Dict]:
+        """Yield inbox emails matching an IMAP SEARCH query as they are downloaded, skipping processed ones."""
         if not self.connection:
             if not self.connect():
-                return []
+                return
         
         try:
             # Select inbox
             self.connection.select('INBOX')
             
-            # Search for unread emails
-            _, message_numbers = self.connection.search(None, 'UNSEEN')
+            # Only matching messages are listed, so nothing else crosses the wire
+            _, message_numbers = self.connection.search(None, search_query)
             
             if not message_numbers[0]:
-                self.logger.info("No unread emails found")
-                return []
+                self.logger.info(f"No emails found matching {search_query}")
+                return
             
             email_list = message_numbers[0].split()
             
@@ -78,47 +117,105 @@ class EmailClient:
             if max_emails:
                 email_list = email_list[-max_emails:]
             
-            emails = []
-            skipped_count = 0
+            self.last_fetch_stats = self._new_fetch_stats(len(email_list))
+            
+            # Drop already processed emails by their headers before downloading bodies
+            located = {}
+            if skip_processed_ids:
+                email_list = self._select_new_messages(email_list, skip_processed_ids, located=located)
             
-            for num in email_list:
+            fetched_count = 0
+            
+            for num, email_data in self._fetch_email_data(email_list, located=located):
                 try:
-                    # Fetch email
-                    _, msg_data = self.connection.fetch(num, '(RFC822)')
-                    email_body = msg_data[0][1]
-                    email_message = email.message_from_bytes(email_body)
-                    
-                    # Extract email data
-                    email_data = self._extract_email_data(email_message)
                     if email_data:
                         message_id = email_data.get('message_id', '')
                         
                         # Skip if already processed
-                        if skip_processed_ids and message_id in skip_processed_ids:
-                            skipped_count += 1
+                        if skip_processed_ids and message_id and message_id in skip_processed_ids:
+                            self.last_fetch_stats['skipped'] += 1
                             continue
                         
                         # Add message number for marking as read later
-                        email_data['message_number'] = num.decode()
-                        emails.append(email_data)
+                        email_data['message_number'] = num
+                        fetched_count += 1
+                        yield email_data
                         
                 except Exception as e:
                     self.logger.error(f"Error processing email {num}: {str(e)}")
                     continue
             
-            self.logger.info(f"Successfully fetched {len(emails)} new unread emails. Skipped {skipped_count} already processed.")
-            return emails
+            self.logger.info(f"Successfully fetched {fetched_count} new emails matching {search_query}. "
+                             f"Skipped {self.last_fetch_stats['skipped']} already processed.")
             
         except Exception as e:
             self.logger.error(f"Error fetching emails: {str(e)}")
-            return []
+    
+    @staticmethod
+    def _quote(value: str) -> Optional[str]:
+        """IMAP quoted string, or None for non-ASCII text (which needs a CHARSET search)."""
+        if not value.isascii():
+            return None
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    
+    @classmethod
+    def build_search_query(cls, seen: Optional[bool] = None, since: Optional[datetime] = None,
+                           before: Optional[datetime] = None, sender: Optional[str] = None,
+                           subject_keywords: Optional[List[str]] = None, min_size: Optional[int] = None,
+                           max_size: Optional[int] = None, has_attachment: Optional[bool] = None) -> str:
+        """Compile filter options into one IMAP SEARCH query.
+        
+        ``seen`` maps to SEEN/UNSEEN, dates to SINCE/BEFORE (day precision), sizes
+        (bytes, inclusive) to LARGER/SMALLER, and several subject keywords to an OR
+        of SUBJECT criteria. IMAP has no attachment criterion, so ``has_attachment``
+        matches on a multipart/mixed Content-Type, which is how attachments are sent.
+        Text criteria that can't be sent as ASCII are left out; callers filter
+        those locally.
+        """
+        criteria = []
+        if seen is not None:
+            criteria.append('SEEN' if seen else 'UNSEEN')
+        if since:
+            criteria.append(f'SINCE "{since.strftime("%d-%b-%Y")}"')
+        if before:
+            criteria.append(f'BEFORE "{before.strftime("%d-%b-%Y")}"')
+        if sender and cls._quote(sender):
+            criteria.append(f'FROM {cls._quote(sender)}')
+        
+        subjects = [f'SUBJECT {cls._quote(keyword)}' for keyword in (subject_keywords or [])
+                    if keyword and cls._quote(keyword)]
+        if subjects and len(subjects) == len([keyword for keyword in subject_keywords if keyword]):
+            subject_query = subjects[-1]
+            for subject in reversed(subjects[:-1]):
+                subject_query = f'OR {subject} {subject_query}'
+            criteria.append(subject_query)
+        
+        if min_size:
+            criteria.append(f'LARGER {min_size - 1}')
+        if max_size is not None:
+            criteria.append(f'SMALLER {max_size + 1}')
+        if has_attachment is not None:
+            attachment = 'HEADER Content-Type "multipart/mixed"'
+            criteria.append(attachment if has_attachment else f'NOT {attachment}')
+        
+        return f'({" ".join(criteria)})' if criteria else 'ALL'
     
     def fetch_emails_by_date_range(self, start_date: datetime, end_date: datetime, 
-                                 max_emails: int = None) -> List[Dict]:
+                                 max_emails: int = None, skip_processed_ids: set = None) -> List[Dict]:
         """Fetch emails within a date range, robust to IMAP quirks and time zones."""
+        return list(self.iter_emails_by_date_range(start_date, end_date, max_emails=max_emails,
+                                                   skip_processed_ids=skip_processed_ids))
+    
+    def iter_emails_by_date_range(self, start_date: datetime, end_date: datetime, 
+                                  max_emails: int = None, skip_processed_ids: set = None,
+                                  filters: Dict = None) -> Iterator[Dict]:
+        """Yield emails within a date range as they are downloaded, robust to IMAP quirks and time zones.
+        
+        ``filters`` are build_search_query keyword arguments, applied by the server.
+        """
         if not self.connection:
             if not self.connect():
-                return []
+                return
         try:
             # Always select INBOX, fallback to first folder if needed
             try:
@@ -128,22 +225,27 @@ class EmailClient:
                 self.connection.select()
 
             # IMAP search for broad range (may be inaccurate on some servers)
-            start_str = (start_date - timedelta(days=1)).strftime('%d-%b-%Y')  # start a day early for safety
-            end_str = (end_date + timedelta(days=2)).strftime('%d-%b-%Y')  # end a day late for safety
-            search_criteria = f'(SINCE "{start_str}" BEFORE "{end_str}")'
+            # Start a day early and end a day late for safety
+            search_criteria = self.build_search_query(since=start_date - timedelta(days=1),
+                                                      before=end_date + timedelta(days=2), **(filters or {}))
             try:
                 _, message_numbers = self.connection.search(None, search_criteria)
             except Exception as e:
                 self.logger.error(f"IMAP search failed: {e}")
-                return []
+                return
             if not message_numbers or not message_numbers[0]:
-                self.logger.info(f"No emails found between {start_str} and {end_str}")
-                return []
+                self.logger.info(f"No emails found matching {search_criteria}")
+                return
             email_list = message_numbers[0].split()
             # Limit number of emails to process
             if max_emails:
                 email_list = email_list[-max_emails:]
-            emails = []
+            self.last_fetch_stats = self._new_fetch_stats(len(email_list))
+            # Drop already processed emails by their headers before downloading bodies
+            located = {}
+            if skip_processed_ids:
+                email_list = self._select_new_messages(email_list, skip_processed_ids, located=located)
+            fetched_count = 0
             from email.utils import parsedate_to_datetime
             import pytz
             user_tz = None
@@ -152,12 +254,8 @@ class EmailClient:
                 user_tz = tzlocal.get_localzone()
             except Exception:
                 user_tz = None
-            for num in email_list:
+            for num, email_data in self._fetch_email_data(email_list, located=located):
                 try:
-                    _, msg_data = self.connection.fetch(num, '(RFC822)')
-                    email_body = msg_data[0][1]
-                    email_message = email.message_from_bytes(email_body)
-                    email_data = self._extract_email_data(email_message)
                     if not email_data:
                         continue
                     # Parse date header robustly
@@ -171,21 +269,471 @@ class EmailClient:
                         if user_tz:
                             email_dt = email_dt.astimezone(user_tz)
                         # Only include if within range
-                        if start_date <= email_dt <= end_date:
-                            emails.append(email_data)
+                        if not start_date <= email_dt <= end_date:
+                            continue
                     except Exception as ex:
                         self.logger.warning(f"Could not parse date for email: {email_data.get('subject', '')} - {ex}")
                         continue
+                    # Add message number for marking as read later
+                    email_data['message_number'] = num
+                    fetched_count += 1
+                    yield email_data
                 except Exception as e:
                     self.logger.error(f"Error processing email {num}: {str(e)}")
                     continue
-            self.logger.info(f"Fetched {len(emails)} emails after robust date filtering.")
-            return emails
+            self.logger.info(f"Fetched {fetched_count} emails after robust date filtering.")
         except Exception as e:
             self.logger.error(f"Error fetching emails by date range: {str(e)}")
-            return []
     
-    def _extract_email_data(self, email_message) -> Optional[Dict]:
+    def fetch_new_emails(self, max_emails: int = None, skip_processed_ids: set = None,
+                         mailbox: str = 'INBOX', sync_state: SyncState = None) -> List[Dict]:
+        """Fetch emails that arrived since the last incremental sync."""
+        return list(self.iter_new_emails(max_emails=max_emails, skip_processed_ids=skip_processed_ids,
+                                         mailbox=mailbox, sync_state=sync_state))
+    
+    def iter_new_emails(self, max_emails: int = None, skip_processed_ids: set = None,
+                        mailbox: str = 'INBOX', sync_state: SyncState = None) -> Iterator[Dict]:
+        """Yield emails whose UID is above the persisted sync mark, oldest first.
+        
+        Read state is ignored, so mail opened by another client is not missed.
+        Without a mark, or when the mailbox UIDVALIDITY changed, the sync starts
+        over from the newest max_emails messages (all of them if max_emails is
+        not set). Once the run completes, the advanced mark is kept in
+        pending_sync_mark until commit_sync_state() is called, so it only
+        moves after results are saved. A UID whose fetch fails holds the mark
+        back for a retry, but only for Config.SYNC_MAX_UID_FAILURES runs;
+        after that it is skipped so it can't block the sync.
+        """
+        self.pending_sync_mark = None
+        if not self.connection:
+            if not self.connect():
+                return
+        
+        sync_state = sync_state or SyncState()
+        key = SyncState.mailbox_key(self.email_address, self.imap_server, mailbox)
+        
+        try:
+            self.connection.select(mailbox)
+            uidvalidity = self._get_uidvalidity(mailbox)
+            if uidvalidity is None:
+                self.logger.error(f"Server did not report UIDVALIDITY for {mailbox}")
+                return
+            
+            state = sync_state.get(key)
+            failures = {}
+            if state and state.get('uidvalidity') == uidvalidity:
+                last_uid = state.get('last_uid', 0)
+                failures = state.get('failures', {})
+                _, data = self.connection.uid('SEARCH', None, f'UID {last_uid + 1}:*')
+            else:
+                if state:
+                    self.logger.info(f"UIDVALIDITY of {mailbox} changed, running a full resync")
+                last_uid = 0
+                _, data = self.connection.uid('SEARCH', None, 'ALL')
+            
+            # "n:*" always matches the highest UID, even when it is below n
+            uids = sorted(int(uid) for uid in (data[0].split() if data and data[0] else []))
+            uids = [str(uid) for uid in uids if uid > last_uid]
+            if max_emails:
+                # Incremental: oldest first, so nothing is left behind the mark
+                uids = uids[:max_emails] if last_uid else uids[-max_emails:]
+            
+            self.pending_sync_mark = (key, uidvalidity, last_uid, failures)
+            if not uids:
+                self.logger.info(f"No new emails in {mailbox} since UID {last_uid}")
+                return
+            
+            self.last_fetch_stats = self._new_fetch_stats(len(uids))
+            new_uids = uids
+            located = {}
+            if skip_processed_ids:
+                new_uids = self._select_new_messages(uids, skip_processed_ids, by_uid=True, located=located)
+            
+            fetched_count = 0
+            received = set()
+            for uid, email_data in self._fetch_email_data(new_uids, by_uid=True, located=located):
+                received.add(uid)
+                try:
+                    if email_data:
+                        email_data['uid'] = uid
+                        fetched_count += 1
+                        yield email_data
+                except Exception as e:
+                    self.logger.error(f"Error processing email UID {uid}: {str(e)}")
+            
+            # Advance the mark past everything handed out or skipped, but not past a failed
+            # fetch that still has retries left
+            retry = {}
+            for uid in new_uids:
+                if uid in received:
+                    continue
+                attempts = failures.get(uid, 0) + 1
+                if attempts >= max(1, Config.SYNC_MAX_UID_FAILURES):
+                    self.logger.error(f"Giving up on email UID {uid} after {attempts} failed fetches")
+                else:
+                    retry[uid] = attempts
+            new_mark = min(int(uid) for uid in retry) - 1 if retry else int(uids[-1])
+            self.pending_sync_mark = (key, uidvalidity, max(last_uid, new_mark), retry)
+            self.logger.info(f"Fetched {fetched_count} new emails above UID {last_uid}. "
+                             f"Skipped {self.last_fetch_stats['skipped']} already processed.")
+            
+        except Exception as e:
+            self.logger.error(f"Error syncing new emails: {str(e)}")
+    
+    def commit_sync_state(self, sync_state: SyncState = None) -> bool:
+        """Persist the mark reached by the last iter_new_emails run."""
+        if not self.pending_sync_mark:
+            return False
+        key, uidvalidity, last_uid, failures = self.pending_sync_mark
+        return (sync_state or SyncState()).update(key, uidvalidity, last_uid, failures)
+    
+    def _get_uidvalidity(self, mailbox: str) -> Optional[int]:
+        """Return the UIDVALIDITY of the selected mailbox."""
+        _, data = self.connection.response('UIDVALIDITY')
+        if data and data[0]:
+            return int(data[0])
+        # Not reported on SELECT: ask for it explicitly
+        _, data = self.connection.status(mailbox, '(UIDVALIDITY)')
+        match = UIDVALIDITY_RE.search(data[0]) if data and data[0] else None
+        return int(match.group(1)) if match else None
+    
+    @staticmethod
+    def _build_message_set(message_numbers: List[str]) -> str:
+        """Compress message numbers into an IMAP message set, e.g. ['1', '2', '3', '7'] -> '1:3,7'."""
+        numbers = sorted({int(num) for num in message_numbers})
+        ranges = []
+        start = prev = numbers[0]
+        for num in numbers[1:]:
+            if num != prev + 1:
+                ranges.append(f"{start}:{prev}" if start != prev else str(start))
+                start = num
+            prev = num
+        ranges.append(f"{start}:{prev}" if start != prev else str(start))
+        return ','.join(ranges)
+    
+    def _fetch(self, message_set: str, query: str, by_uid: bool = False):
+        """Issue FETCH (or UID FETCH) for a message set and return the response data."""
+        if by_uid:
+            _, msg_data = self.connection.uid('FETCH', message_set, query)
+        else:
+            _, msg_data = self.connection.fetch(message_set, query)
+        return msg_data
+    
+    def _fetch_messages(self, message_numbers: List, query: str = '(RFC822)',
+                        by_uid: bool = False) -> Iterator[Tuple[str, bytes]]:
+        """Fetch messages in chunks of IMAP_FETCH_CHUNK_SIZE, one FETCH command per chunk.
+        
+        Yields (message_number, payload) in the order the numbers were given;
+        with by_uid the numbers are UIDs.
+        """
+        numbers = [num.decode() if isinstance(num, bytes) else str(num) for num in message_numbers]
+        chunk_size = max(1, Config.IMAP_FETCH_CHUNK_SIZE)
+        
+        for start in range(0, len(numbers), chunk_size):
+            chunk = numbers[start:start + chunk_size]
+            try:
+                msg_data = self._fetch(self._build_message_set(chunk), query, by_uid)
+            except Exception as e:
+                self.logger.error(f"Error fetching messages {chunk[0]}..{chunk[-1]}: {str(e)}")
+                continue
+            
+            payloads = self._split_fetch_response(msg_data, by_uid)
+            for num in chunk:
+                if num in payloads:
+                    self.last_fetch_stats['body_bytes'] += len(payloads[num])
+                    yield num, payloads[num]
+                else:
+                    self.logger.warning(f"Server returned no data for message {num}")
+    
+    @staticmethod
+    def _parse_fetch_response(msg_data: List, by_uid: bool = False) -> List[Tuple[str, bytes, bytes]]:
+        """Split a multi-message FETCH response into (key, item_text, literal) per message.
+        
+        imaplib returns one (b'<num> (<items> {<size>}', literal) tuple per message,
+        followed by the rest of its item list (b')' or b' RFC822.SIZE 123)').
+        The key is the message number, or the UID when by_uid is set; untagged
+        responses without a literal (e.g. flag updates) are ignored.
+        """
+        messages = []
+        for part in msg_data or []:
+            if isinstance(part, tuple) and len(part) >= 2:
+                if FETCH_RESPONSE_RE.match(part[0]):
+                    messages.append([part[0], part[1]])
+            elif isinstance(part, bytes) and messages and not FETCH_RESPONSE_RE.match(part):
+                messages[-1][0] += part
+        
+        parsed = []
+        for item_text, literal in messages:
+            match = UID_RE.search(item_text) if by_uid else FETCH_RESPONSE_RE.match(item_text)
+            if match:
+                parsed.append((match.group(1).decode(), item_text, literal))
+        return parsed
+    
+    @classmethod
+    def _split_fetch_response(cls, msg_data: List, by_uid: bool = False) -> Dict[str, bytes]:
+        """Split a multi-message FETCH response into {message_number: payload}."""
+        return {key: literal for key, _, literal in cls._parse_fetch_response(msg_data, by_uid)}
+    
+    @staticmethod
+    def _new_fetch_stats(listed: int = 0) -> Dict[str, int]:
+        """Counters describing the transfer cost of one fetch run."""
+        return {
+            'listed': listed,        # messages matched by the search
+            'skipped': 0,            # already processed, body never downloaded
+            'header_bytes': 0,       # bytes spent on the header-only pass
+            'body_bytes': 0,         # bytes of message bodies (or just their text parts) downloaded
+            'bytes_saved': 0,        # RFC822.SIZE of the skipped messages
+            'parts_saved': 0,        # attachment and alternative-part bytes left on the server
+        }
+    
+    def _select_new_messages(self, message_numbers: List, skip_processed_ids: set,
+                             by_uid: bool = False, located: Optional[Dict] = None) -> List[str]:
+        """Header-only pass: return the message numbers whose Message-ID is not yet processed.
+        
+        Messages without a Message-ID, or whose headers could not be fetched,
+        are kept so that the full fetch can deal with them. With ``located``
+        and IMAP_TEXT_PART_FETCH the same round trip also fetches BODYSTRUCTURE,
+        and the text part of each new message is recorded there for
+        _fetch_email_data, so its headers aren't fetched twice.
+        """
+        numbers = [num.decode() if isinstance(num, bytes) else str(num) for num in message_numbers]
+        chunk_size = max(1, Config.IMAP_FETCH_CHUNK_SIZE)
+        stats = self.last_fetch_stats
+        new_numbers = []
+        with_structure = located is not None and Config.IMAP_TEXT_PART_FETCH
+        query = STRUCTURE_FETCH_QUERY if with_structure else HEADER_FETCH_QUERY
+        
+        for start in range(0, len(numbers), chunk_size):
+            chunk = numbers[start:start + chunk_size]
+            try:
+                msg_data = self._fetch(self._build_message_set(chunk), query, by_uid)
+                headers = self._split_header_response(msg_data, by_uid)
+                if with_structure:
+                    new_parts = self._locate_text_parts(msg_data, by_uid)
+            except Exception as e:
+                self.logger.warning(f"Header fetch failed for {chunk[0]}..{chunk[-1]}: {str(e)}")
+                new_numbers.extend(chunk)
+                continue
+            
+            for num in chunk:
+                if num not in headers:
+                    new_numbers.append(num)
+                    continue
+                header_bytes, size = headers[num]
+                stats['header_bytes'] += len(header_bytes)
+                message_id = email.message_from_bytes(header_bytes).get('Message-ID', '')
+                if message_id and message_id in skip_processed_ids:
+                    stats['skipped'] += 1
+                    stats['bytes_saved'] += size
+                else:
+                    new_numbers.append(num)
+                    if with_structure:
+                        # None: structure unreadable, fetch the message whole
+                        located[num] = new_parts.get(num)
+        
+        return new_numbers
+    
+    @classmethod
+    def _split_header_response(cls, msg_data: List, by_uid: bool = False) -> Dict[str, Tuple[bytes, int]]:
+        """Split a header-only FETCH response into {message_number: (headers, RFC822.SIZE)}.
+        
+        Servers may send RFC822.SIZE before or after the header literal; both
+        end up in the item text.
+        """
+        headers = {}
+        for key, item_text, literal in cls._parse_fetch_response(msg_data, by_uid):
+            size = RFC822_SIZE_RE.search(item_text)
+            headers[key] = (literal, int(size.group(1)) if size else 0)
+        return headers
+    
+    def _fetch_email_data(self, message_numbers: List, by_uid: bool = False,
+                          located: Optional[Dict] = None) -> Iterator[Tuple[str, Optional[EmailRecord]]]:
+        """Fetch messages chunk by chunk and yield (message_number, email data).
+        
+        With IMAP_TEXT_PART_FETCH only the text/plain part (text/html as fallback)
+        is downloaded, located via BODYSTRUCTURE and capped at IMAP_BODY_MAX_BYTES;
+        messages whose structure can't be read are fetched whole. Structures
+        already in ``located`` (from _select_new_messages) aren't fetched again.
+        Email data is None for messages without a text body.
+        """
+        if not Config.IMAP_TEXT_PART_FETCH:
+            for num, payload in self._fetch_messages(message_numbers, by_uid=by_uid):
+                yield num, self._extract_email_data(email.message_from_bytes(payload))
+            return
+        
+        numbers = [num.decode() if isinstance(num, bytes) else str(num) for num in message_numbers]
+        chunk_size = max(1, Config.IMAP_FETCH_CHUNK_SIZE)
+        byte_cap = f'<0.{Config.IMAP_BODY_MAX_BYTES}>' if Config.IMAP_BODY_MAX_BYTES > 0 else ''
+        stats = self.last_fetch_stats
+        located = located if located is not None else {}
+        
+        for start in range(0, len(numbers), chunk_size):
+            chunk = numbers[start:start + chunk_size]
+            unlocated = [num for num in chunk if num not in located]
+            if unlocated:
+                try:
+                    msg_data = self._fetch(self._build_message_set(unlocated), STRUCTURE_FETCH_QUERY, by_uid)
+                    new_parts = self._locate_text_parts(msg_data, by_uid)
+                    for headers, _, _ in new_parts.values():
+                        stats['header_bytes'] += len(headers)
+                    located.update(new_parts)
+                except Exception as e:
+                    self.logger.warning(f"BODYSTRUCTURE fetch failed for {unlocated[0]}..{unlocated[-1]}: {str(e)}")
+            
+            # Messages sharing a section number are fetched with one command
+            sections = {}
+            for num in chunk:
+                if located.get(num) and located[num][1]:
+                    sections.setdefault(located[num][1]['section'], []).append(num)
+            texts = {}
+            for section, nums in sections.items():
+                try:
+                    msg_data = self._fetch(self._build_message_set(nums), f'(BODY.PEEK[{section}]{byte_cap})', by_uid)
+                    texts.update(self._split_fetch_response(msg_data, by_uid))
+                except Exception as e:
+                    self.logger.error(f"Error fetching part {section} of messages {nums[0]}..{nums[-1]}: {str(e)}")
+            
+            # PEEK like the other fetches, so reading a message never depends on its structure
+            unreadable = [num for num in chunk if not located.get(num)]
+            whole = dict(self._fetch_messages(unreadable, '(BODY.PEEK[])', by_uid)) if unreadable else {}
+            
+            for num in chunk:
+                # Popped as it is used, so the headers of finished messages aren't held
+                entry = located.pop(num, None)
+                if num in whole:
+                    yield num, self._extract_email_data(email.message_from_bytes(whole[num]))
+                elif entry:
+                    headers, part, size = entry
+                    if part is None:
+                        yield num, None
+                    elif num in texts:
+                        stats['body_bytes'] += len(texts[num])
+                        stats['parts_saved'] += max(0, size - len(headers) - len(texts[num]))
+                        yield num, self._extract_part_data(headers, texts[num], part)
+                    else:
+                        self.logger.warning(f"Server returned no text part for message {num}")
+    
+    @classmethod
+    def _locate_text_parts(cls, msg_data: List, by_uid: bool = False) -> Dict[str, Tuple[bytes, Optional[Dict], int]]:
+        """Read a STRUCTURE_FETCH_QUERY response into {num: (headers, text part or None, RFC822.SIZE)}.
+        
+        Messages whose BODYSTRUCTURE can't be parsed are left out.
+        """
+        located = {}
+        for key, item_text, headers in cls._parse_fetch_response(msg_data, by_uid):
+            structure = cls._parse_bodystructure(item_text)
+            if structure is not None:
+                size = RFC822_SIZE_RE.search(item_text)
+                located[key] = (headers, cls._find_text_part(structure), int(size.group(1)) if size else 0)
+        return located
+    
+    @staticmethod
+    def _parse_bodystructure(item_text: bytes) -> Optional[List]:
+        """Parse the BODYSTRUCTURE of a FETCH response into nested lists of strings (NIL -> None).
+        
+        Returns None if there is none, or if it holds literals, which imaplib
+        splits out of the item text.
+        """
+        start = item_text.find(b'BODYSTRUCTURE (')
+        if start < 0:
+            return None
+        pos = start + len(b'BODYSTRUCTURE ')
+        stack = []
+        while True:
+            match = IMAP_TOKEN_RE.match(item_text, pos)
+            if not match:
+                return None
+            pos = match.end()
+            opening, closing, quoted, literal, atom = match.groups()
+            if opening:
+                stack.append([])
+            elif closing:
+                if not stack:
+                    return None
+                done = stack.pop()
+                if not stack:
+                    return done
+                stack[-1].append(done)
+            elif literal is not None or not stack:
+                return None
+            elif quoted is not None:
+                stack[-1].append(re.sub(rb'\\(.)', rb'\1', quoted).decode('utf-8', errors='replace'))
+            else:
+                stack[-1].append(None if atom.upper() == b'NIL' else atom.decode('ascii', errors='replace'))
+    
+    @classmethod
+    def _leaf_parts(cls, structure: List, prefix: str = '') -> Iterator[Tuple[str, List]]:
+        """Yield (section number, body fields) for every non-multipart part."""
+        children = list(takewhile(lambda item: isinstance(item, list), structure))
+        if not children:
+            # A non-multipart message has only part 1
+            yield prefix[:-1] or '1', structure
+            return
+        for index, child in enumerate(children, 1):
+            yield from cls._leaf_parts(child, f'{prefix}{index}.')
+    
+    @classmethod
+    def _find_text_part(cls, structure: List) -> Optional[Dict]:
+        """Locate the body text: the first inline text/plain part, else the first text/html one."""
+        found = {}
+        for section, fields in cls._leaf_parts(structure):
+            if len(fields) < 7 or not isinstance(fields[0], str) or fields[0].lower() != 'text':
+                continue
+            subtype = (fields[1] or '').lower()
+            # Text parts carry a line count, so the disposition is the 10th field
+            disposition = fields[9] if len(fields) > 9 and isinstance(fields[9], list) else None
+            if subtype not in ('plain', 'html') or subtype in found:
+                continue
+            if disposition and str(disposition[0]).lower() == 'attachment':
+                continue
+            params = fields[2] if isinstance(fields[2], list) else []
+            params = {str(key).lower(): value for key, value in zip(params[::2], params[1::2])}
+            found[subtype] = {
+                'section': section,
+                'subtype': subtype,
+                'charset': params.get('charset') or 'utf-8',
+                'encoding': (fields[5] or '7bit').lower(),
+            }
+        return found.get('plain') or found.get('html')
+    
+    @staticmethod
+    def _decode_part(payload: bytes, encoding: str, charset: str) -> str:
+        """Undo the transfer encoding and charset of a fetched part, which may be cut short by the byte cap."""
+        if encoding == 'base64':
+            data = re.sub(rb'[^A-Za-z0-9+/=]', b'', payload)
+            payload = base64.b64decode(data[:len(data) - len(data) % 4])
+        elif encoding == 'quoted-printable':
+            payload = quopri.decodestring(payload)
+        try:
+            return payload.decode(charset, errors='replace')
+        except LookupError:
+            return payload.decode('utf-8', errors='replace')
+    
+    def _extract_part_data(self, headers: bytes, payload: bytes, part: Dict) -> Optional[EmailRecord]:
+        """Build email data from the header fields and the fetched text part."""
+        try:
+            header_message = email.message_from_bytes(headers)
+            body = self._decode_part(payload, part['encoding'], part['charset'])
+            if part['subtype'] == 'html':
+                body = self._html_to_text(body)
+            body = body.strip()
+            
+            if not body:
+                return None
+            
+            return EmailRecord(
+                subject=header_message.get('Subject', ''),
+                sender=header_message.get('From', ''),
+                date=header_message.get('Date', ''),
+                message_id=header_message.get('Message-ID', ''),
+                body=body
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error extracting email data: {str(e)}")
+            return None
+    
+    def _extract_email_data(self, email_message) -> Optional[EmailRecord]:
         """Extract relevant data from email message."""
         try:
             # Extract basic headers
@@ -200,14 +748,8 @@ class EmailClient:
             if not body:
                 return None
             
-            return {
-                'subject': subject,
-                'sender': sender,
-                'date': date,
-                'message_id': message_id,
-                'body': body,
-                'raw_message': email_message
-            }
+            # The parsed message (attachments included) is not kept past this point
+            return EmailRecord(subject=subject, sender=sender, date=date, message_id=message_id, body=body)
             
         except Exception as e:
             self.logger.error(f"Error extracting email data: {str(e)}")
@@ -259,42 +801,28 @@ class EmailClient:
         return body.strip()
     
     def _html_to_text(self, html_content: str) -> str:
-        """Convert HTML content to plain text."""
+        """Convert HTML content to plain text, keeping one line per block or table row."""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text()
-            
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            return text
-        except ImportError:
-            # Fallback if BeautifulSoup is not available
-            import re
-            # Remove HTML tags
-            clean = re.compile('<.*?>')
-            text = re.sub(clean, '', html_content)
-            return text
-        except Exception:
-            return html_content
-    
-    def mark_as_read(self, message_numbers: List[str]) -> bool:
-        """Mark emails as read using message numbers."""
+            return html_to_text(html_content)
+        except Exception as e:
+            self.logger.warning(f"Could not convert HTML body: {str(e)}")
+            return re.sub(r'<[^>]+>', ' ', html_content[:Config.HTML_MAX_TEXT_CHARS])
+    
+    def mark_as_read(self, message_numbers: List[str], by_uid: bool = False) -> bool:
+        """Mark emails as read using message numbers (or UIDs with by_uid)."""
         if not self.connection:
             return False
         
         try:
-            for msg_num in message_numbers:
-                self.connection.store(msg_num, '+FLAGS', '\\Seen')
+            # One STORE per message-set chunk instead of one per message
+            numbers = [str(num) for num in message_numbers]
+            chunk_size = max(1, Config.IMAP_FETCH_CHUNK_SIZE)
+            for start in range(0, len(numbers), chunk_size):
+                message_set = self._build_message_set(numbers[start:start + chunk_size])
+                if by_uid:
+                    self.connection.uid('STORE', message_set, '+FLAGS', '\\Seen')
+                else:
+                    self.connection.store(message_set, '+FLAGS', '\\Seen')
             self.logger.info(f"Marked {len(message_numbers)} emails as read")
             return True
         except Exception as e:
@@ -307,8 +835,16 @@ class EmailClient:
             return True
         
         message_numbers = []
+        uids = []
         for email_data in emails:
-            if 'message_number' in email_data:
+            if 'uid' in email_data:
+                uids.append(email_data['uid'])
+            elif 'message_number' in email_data:
                 message_numbers.append(email_data['message_number'])
         
-        return self.mark_as_read(message_numbers) 
\ No newline at end of file
+        success = True
+        if uids:
+            success = self.mark_as_read(uids, by_uid=True)
+        if message_numbers:
+            success = self.mark_as_read(message_numbers) and success
+        return success 
\ No newline at end of file
@@ -1,15 +1,74 @@
 import pandas as pd
 import logging
-from typing import List, Dict, Optional
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import os
 
+from dedupe_index import DedupeIndex, get_dedupe_index
+
+# Low-cardinality text columns, held as pandas categoricals
+CATEGORY_COLUMNS = ['Company_Name', 'Job_Type', 'Industry', 'Seniority_Level']
+# The only columns get_statistics reads
+STATS_COLUMNS = ['Company_Name', 'Job_Type', 'Industry', 'Location']
+# Rows inserted per statement while migrating a workbook
+MIGRATION_BATCH_SIZE = 1000
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the low-cardinality text columns present in df to categoricals, in place."""
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    return df
+
+
+class _CachedTable:
+    """Snapshot of one store's jobs table at a given store version."""
+    
+    def __init__(self, store_id: str, version: int, df: pd.DataFrame, last_id: int):
+        self.store_id = store_id
+        self.version = version
+        self.df = df
+        self.last_id = last_id
+        self.message_ids = set(df['Message_ID'].dropna())
+    
+    def append(self, version: int, new_rows: pd.DataFrame, last_id: int):
+        """Add rows written by this process and move the snapshot to the new version."""
+        # Categoricals with different categories concatenate to object; convert back
+        self.df = optimize_dtypes(pd.concat([self.df, new_rows], ignore_index=True)) if len(self.df) else new_rows
+        self.message_ids.update(new_rows['Message_ID'].dropna())
+        self.version = version
+        self.last_id = last_id
+
+
+# Process-wide cache of job tables by database path, shared by every
+# ExcelManager (and every Streamlit rerun). An entry is reused only while the
+# store's id and version counter match, so any write - from this process or
+# another - invalidates it.
+_table_cache: Dict[str, _CachedTable] = {}
+# get_statistics results by database path, as (store id, version, stats)
+_stats_cache: Dict[str, Tuple[str, int, Dict]] = {}
+_table_cache_lock = threading.Lock()
+
 class ExcelManager:
-    """Manages Excel file operations for job email data."""
+    """Manages job email data in an indexed SQLite store, with Excel as an export format.
+    
+    Jobs live in '<filename without extension>.db'. Saves are append-only inserts
+    guarded by a unique index on Message_ID; the Excel file is only written on
+    export. An existing workbook is migrated into the store once.
+    """
     
     def __init__(self, filename: str = "job_emails.xlsx"):
         self.filename = filename
+        self.db_filename = os.path.splitext(filename)[0] + '.db'
         self.logger = logging.getLogger(__name__)
+        self._store_ready = False
+        # Processed-email index, kept next to the job rows in the same database
+        self.dedupe_index = get_dedupe_index(self.db_filename)
         
         # Define column headers
         self.columns = [
@@ -33,67 +92,224 @@ class ExcelManager:
             'Raw_Email'  # Added for email preview
         ]
     
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the job store, committing on success."""
+        conn = sqlite3.connect(self.db_filename, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def _ensure_store(self):
+        """Create the jobs table and Message_ID index, migrating the workbook on first use."""
+        if self._store_ready and os.path.exists(self.db_filename):
+            return
+        column_defs = ', '.join(f'"{column}"' for column in self.columns)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, {column_defs})')
+            # NULL Message_IDs do not collide, so emails without one are all kept
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_message_id ON jobs ("Message_ID")')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            # A fresh id per database file, so a recreated store never matches a cached one
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('store_id', ?)", (uuid.uuid4().hex,))
+            migrated = conn.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+            if not migrated:
+                self._migrate_excel(conn)
+            DedupeIndex.ensure_table(conn)
+            seeded = conn.execute("SELECT value FROM meta WHERE key = 'dedupe_seeded'").fetchone()
+            if not seeded:
+                # Stores created before the dedupe index: seed it from the saved Message-IDs
+                conn.execute('INSERT OR IGNORE INTO dedupe_keys (key) '
+                             'SELECT \'mid:\' || trim("Message_ID") FROM jobs '
+                             'WHERE "Message_ID" IS NOT NULL AND trim("Message_ID") != \'\'')
+                DedupeIndex.bump_version(conn)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dedupe_seeded', '1')")
+        self._store_ready = True
+    
+    def _migrate_excel(self, conn: sqlite3.Connection):
+        """One-time import of the existing Excel workbook into the job store."""
+        if os.path.exists(self.filename):
+            # Rows are inserted batch by batch as they are read; a failure undoes them all
+            conn.execute('SAVEPOINT migrate_excel')
+            try:
+                inserted = 0
+                batch = []
+                for record in self.iter_excel_records(self.filename, self.columns):
+                    batch.append(record)
+                    if len(batch) >= MIGRATION_BATCH_SIZE:
+                        inserted += self._insert_records(conn, batch)
+                        batch = []
+                inserted += self._insert_records(conn, batch)
+                if inserted:
+                    self._bump_version(conn)
+                conn.execute('RELEASE migrate_excel')
+                self.logger.info(f"Migrated {inserted} records from {self.filename} to {self.db_filename}")
+            except Exception as e:
+                conn.execute('ROLLBACK TO migrate_excel')
+                conn.execute('RELEASE migrate_excel')
+                # Leave the migration pending so it is retried on the next start
+                self.logger.error(f"Error migrating {self.filename}: {str(e)}")
+                return
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (self.filename,))
+    
+    @staticmethod
+    def iter_excel_records(filename: str, columns: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Stream the rows of a workbook's first sheet as {column: value} dicts.
+        
+        Uses openpyxl's read-only mode, so rows are parsed one at a time instead
+        of loading the whole workbook. With ``columns``, only those columns are
+        kept; empty rows are skipped.
+        """
+        from openpyxl import load_workbook
+        workbook = load_workbook(filename, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            wanted = set(columns) if columns is not None else None
+            positions = [(index, str(name)) for index, name in enumerate(header)
+                         if name is not None and (wanted is None or str(name) in wanted)]
+            for row in rows:
+                record = {name: row[index] for index, name in positions if index < len(row)}
+                if any(value is not None for value in record.values()):
+                    yield record
+        finally:
+            workbook.close()
+    
+    def _insert_records(self, conn: sqlite3.Connection, records: List[Dict]) -> int:
+        """Insert records, ignoring Message_IDs already stored. Returns the number inserted."""
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+        placeholders = ', '.join('?' for _ in self.columns)
+        rows = [tuple(self._to_db_value(record.get(column)) for column in self.columns) for record in records]
+        before = conn.total_changes
+        conn.executemany(f'INSERT OR IGNORE INTO jobs ({columns}) VALUES ({placeholders})', rows)
+        return conn.total_changes - before
+    
+    @staticmethod
+    def _get_version(conn: sqlite3.Connection) -> Tuple[str, int]:
+        """Return (store id, version counter); the counter grows with every write."""
+        meta = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('store_id', 'version')"))
+        return meta.get('store_id', ''), int(meta.get('version', 0))
+    
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection):
+        """Increment the store version inside the current write transaction."""
+        conn.execute("INSERT INTO meta (key, value) VALUES ('version', 1) "
+                     "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+    
+    def _read_rows(self, conn: sqlite3.Connection, after_id: int = 0) -> Tuple[pd.DataFrame, int]:
+        """Read jobs with id > after_id, returning the rows and the highest id seen."""
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+        df = pd.read_sql_query(f'SELECT id, {columns} FROM jobs WHERE id > ? ORDER BY id', conn,
+                               params=(after_id,))
+        last_id = int(df['id'].iloc[-1]) if len(df) else after_id
+        return optimize_dtypes(df.drop(columns='id')), last_id
+    
+    def _project(self, columns: Optional[Iterable[str]]) -> List[str]:
+        """Validate a column projection; None means every column."""
+        if columns is None:
+            return list(self.columns)
+        projection = list(dict.fromkeys(columns))
+        unknown = [column for column in projection if column not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown job table columns: {', '.join(unknown)}")
+        return projection
+    
+    def _read_columns(self, columns: List[str]) -> Tuple[str, int, pd.DataFrame]:
+        """Read only the given columns, oldest row first, with the store id and version they belong to.
+        
+        A current cached table is sliced instead of querying the store.
+        """
+        self._ensure_store()
+        with self._connect() as conn:
+            conn.execute('BEGIN')
+            store_id, version = self._get_version(conn)
+            with _table_cache_lock:
+                cached = _table_cache.get(self.db_filename)
+            if cached and cached.store_id == store_id and cached.version == version:
+                return store_id, version, cached.df[columns].copy()
+            selected = ', '.join(f'"{column}"' for column in columns)
+            df = pd.read_sql_query(f'SELECT {selected} FROM jobs ORDER BY id', conn)
+        return store_id, version, optimize_dtypes(df)
+    
+    def _get_table(self) -> _CachedTable:
+        """Return the cached jobs table, reloading it only if the store changed."""
+        self._ensure_store()
+        with self._connect() as conn:
+            # One read transaction, so the version and the rows agree
+            conn.execute('BEGIN')
+            store_id, version = self._get_version(conn)
+            with _table_cache_lock:
+                cached = _table_cache.get(self.db_filename)
+                if cached and cached.store_id == store_id and cached.version == version:
+                    return cached
+            df, last_id = self._read_rows(conn)
+        
+        cached = _CachedTable(store_id, version, df, last_id)
+        with _table_cache_lock:
+            _table_cache[self.db_filename] = cached
+        self.logger.info(f"Loaded {len(df)} existing records from {self.db_filename}")
+        return cached
+    
+    @staticmethod
+    def _to_db_value(value):
+        """Store empty cells as NULL, as they read back from Excel."""
+        if value is None or value == '':
+            return None
+        if isinstance(value, float) and pd.isna(value):
+            return None
+        if isinstance(value, datetime):
+            return str(value)
+        if hasattr(value, 'item'):
+            # numpy scalar -> Python scalar
+            return value.item()
+        return value
+    
     def create_excel_file(self) -> bool:
-        """Create a new Excel file with headers if it doesn't exist."""
+        """Create the job store if it doesn't exist (kept for compatibility)."""
         try:
-            if not os.path.exists(self.filename):
-                # Create empty DataFrame with headers
-                df = pd.DataFrame(columns=self.columns)
-                df.to_excel(self.filename, index=False, engine='openpyxl')
-                self.logger.info(f"Created new Excel file: {self.filename}")
-                return True
+            self._ensure_store()
             return True
         except Exception as e:
-            self.logger.error(f"Error creating Excel file: {str(e)}")
+            self.logger.error(f"Error creating job store: {str(e)}")
             return False
     
-    def load_existing_data(self) -> pd.DataFrame:
-        """Load existing data from Excel file."""
+    def load_existing_data(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load stored jobs, oldest first.
+        
+        Without ``columns`` this is a copy of the cached full table; with them,
+        only those columns are read.
+        """
         try:
-            if os.path.exists(self.filename):
-                df = pd.read_excel(self.filename, engine='openpyxl')
-                self.logger.info(f"Loaded {len(df)} existing records from {self.filename}")
-                return df
-            else:
-                return pd.DataFrame(columns=self.columns)
+            if columns is None:
+                return self._get_table().df.copy()
+            return self._read_columns(self._project(columns))[2]
         except Exception as e:
-            self.logger.error(f"Error loading Excel file: {str(e)}")
-            return pd.DataFrame(columns=self.columns)
+            self.logger.error(f"Error loading job store: {str(e)}")
+            return pd.DataFrame(columns=columns or self.columns)
     
     def save_job_data(self, job_data: List[Dict]) -> bool:
-        """Save job data to Excel file with Message-ID deduplication."""
+        """Append job data to the store with Message-ID deduplication."""
         try:
             if not job_data:
                 self.logger.info("No job data to save")
                 return True
             
-            # Create file if it doesn't exist
+            # Create store if it doesn't exist
             if not self.create_excel_file():
                 return False
             
-            # Load existing data
-            existing_df = self.load_existing_data()
-            
-            # Get existing Message-IDs to prevent duplicates
-            existing_message_ids = set()
-            if 'Message_ID' in existing_df.columns:
-                existing_message_ids = set(existing_df['Message_ID'].dropna().tolist())
-            
-            # Prepare new data (only for emails not already processed)
-            new_records = []
-            skipped_count = 0
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            new_records = []
             
             for job in job_data:
-                message_id = job.get('message_id', '')
-                
-                # Skip if already processed
-                if message_id in existing_message_ids:
-                    skipped_count += 1
-                    continue
-                
                 record = {
-                    'Message_ID': message_id,
+                    'Message_ID': job.get('message_id', ''),
                     'Email_Date': job.get('email_date', ''),
                     'Sender': job.get('sender', ''),
                     'Subject': job.get('subject', ''),
@@ -114,26 +330,30 @@ class ExcelManager:
                 }
                 new_records.append(record)
             
-            if not new_records:
+            # The unique Message_ID index skips already processed emails
+            new_rows = None
+            with self._connect() as conn:
+                store_id, version = self._get_version(conn)
+                inserted = self._insert_records(conn, new_records)
+                self.dedupe_index.add_many(job_data, conn)
+                if inserted:
+                    self._bump_version(conn)
+                    with _table_cache_lock:
+                        cached = _table_cache.get(self.db_filename)
+                    # Cache is current: read back just the new rows to update it in place
+                    if cached and cached.store_id == store_id and cached.version == version:
+                        new_rows, last_id = self._read_rows(conn, cached.last_id)
+            if new_rows is not None:
+                with _table_cache_lock:
+                    if cached.version == version:
+                        cached.append(version + 1, new_rows, last_id)
+            skipped_count = len(new_records) - inserted
+            
+            if not inserted:
                 self.logger.info(f"No new job records to save. Skipped {skipped_count} already processed emails.")
                 return True
             
-            # Create DataFrame for new records
-            new_df = pd.DataFrame(new_records)
-            
-            # Combine existing and new data
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-            
-            # Remove duplicates based on Message-ID (primary) and Subject/Sender (secondary)
-            combined_df = combined_df.drop_duplicates(
-                subset=['Message_ID'], 
-                keep='last'
-            )
-            
-            # Save to Excel
-            combined_df.to_excel(self.filename, index=False, engine='openpyxl')
-            
-            self.logger.info(f"Successfully saved {len(new_records)} new job records to {self.filename}. Skipped {skipped_count} duplicates.")
+            self.logger.info(f"Successfully saved {inserted} new job records to {self.db_filename}. Skipped {skipped_count} duplicates.")
             return True
             
         except Exception as e:
@@ -141,19 +361,51 @@ class ExcelManager:
             return False
     
     def get_processed_message_ids(self) -> set:
-        """Get set of already processed Message-IDs."""
+        """Get set of Message-IDs of saved jobs (run_extraction uses dedupe_index instead)."""
         try:
-            df = self.load_existing_data()
-            if 'Message_ID' in df.columns:
-                return set(df['Message_ID'].dropna().tolist())
-            return set()
+            return set(self._get_table().message_ids)
         except Exception as e:
             self.logger.error(f"Error getting processed Message-IDs: {str(e)}")
             return set()
     
     def is_email_processed(self, message_id: str) -> bool:
         """Check if an email with given Message-ID has been processed."""
-        return message_id in self.get_processed_message_ids()
+        if not message_id:
+            return False
+        try:
+            self._ensure_store()
+            return message_id in self.dedupe_index
+        except Exception as e:
+            self.logger.error(f"Error checking Message-ID: {str(e)}")
+            return False
+    
+    def clear_data(self) -> bool:
+        """Delete all stored jobs and the exported Excel file."""
+        try:
+            self._ensure_store()
+            with self._connect() as conn:
+                conn.execute('DELETE FROM jobs')
+                self.dedupe_index.clear(conn)
+                self._bump_version(conn)
+            if os.path.exists(self.filename):
+                os.remove(self.filename)
+            self.logger.info(f"Cleared all records from {self.db_filename}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error clearing job store: {str(e)}")
+            return False
+    
+    def export_to_excel(self, output_filename: str = None) -> bool:
+        """Export all stored jobs to an Excel file (by default the manager's filename)."""
+        try:
+            output_filename = output_filename or self.filename
+            df = self.load_existing_data()
+            df.to_excel(output_filename, index=False, engine='openpyxl')
+            self.logger.info(f"Exported {len(df)} records to {output_filename}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error exporting to Excel: {str(e)}")
+            return False
     
     def _format_skills(self, skills: List[str]) -> str:
         """Format skills list as comma-separated string."""
@@ -162,9 +414,9 @@ class ExcelManager:
         return ", ".join(skills)
     
     def get_statistics(self) -> Dict:
-        """Get statistics about the Excel file."""
+        """Get statistics about the job store."""
         try:
-            if not os.path.exists(self.filename):
+            if not os.path.exists(self.db_filename) and not os.path.exists(self.filename):
                 return {
                     'total_records': 0,
                     'file_size': 0,
@@ -174,16 +426,28 @@ class ExcelManager:
                     'industries': []
                 }
             
-            df = self.load_existing_data()
+            self._ensure_store()
+            with self._connect() as conn:
+                store_id, version = self._get_version(conn)
+            with _table_cache_lock:
+                cached = _stats_cache.get(self.db_filename)
+            if cached and cached[:2] == (store_id, version):
+                stats = dict(cached[2])
+            else:
+                # Derived once per store version, from just the columns it needs
+                store_id, version, df = self._read_columns(STATS_COLUMNS)
+                stats = {
+                    'total_records': len(df),
+                    'companies': df['Company_Name'].dropna().unique().tolist(),
+                    'job_types': df['Job_Type'].dropna().unique().tolist(),
+                    'industries': df['Industry'].dropna().unique().tolist(),
+                    'locations': df['Location'].dropna().unique().tolist()
+                }
+                with _table_cache_lock:
+                    _stats_cache[self.db_filename] = (store_id, version, dict(stats))
             
-            stats = {
-                'total_records': len(df),
-                'file_size': os.path.getsize(self.filename),
-                'last_modified': datetime.fromtimestamp(os.path.getmtime(self.filename)),
-                'companies': df['Company_Name'].dropna().unique().tolist(),
-                'job_types': df['Job_Type'].dropna().unique().tolist(),
-                'industries': df['Industry'].dropna().unique().tolist()
-            }
+            stats['file_size'] = os.path.getsize(self.db_filename)
+            stats['last_modified'] = datetime.fromtimestamp(os.path.getmtime(self.db_filename))
             
             return stats
             
@@ -191,26 +455,37 @@ class ExcelManager:
             self.logger.error(f"Error getting statistics: {str(e)}")
             return {}
     
-    def search_jobs(self, criteria: Dict) -> pd.DataFrame:
-        """Search jobs based on criteria."""
+    @staticmethod
+    def _contains(series: pd.Series, pattern: str) -> pd.Series:
+        """Case-insensitive regex match; on a categorical each category is tested once."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            matched = categories[categories.astype(str).str.contains(pattern, case=False, na=False)]
+            return series.isin(matched)
+        return series.str.contains(pattern, case=False, na=False)
+    
+    def search_jobs(self, criteria: Dict, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Search jobs based on criteria; ``columns`` limits the columns read and returned."""
         try:
-            df = self.load_existing_data()
+            output = self._project(columns)
+            filters = [(column, value) for column, value in criteria.items() if column in self.columns and value]
+            df = self.load_existing_data(None if columns is None else
+                                         self._project(output + [column for column, _ in filters]))
             
             if df.empty:
-                return df
+                return df[output]
             
             # Apply filters
-            for column, value in criteria.items():
-                if column in df.columns and value:
-                    if isinstance(value, list):
-                        # Multiple values (OR condition)
-                        mask = df[column].str.contains('|'.join(value), case=False, na=False)
-                    else:
-                        # Single value
-                        mask = df[column].str.contains(str(value), case=False, na=False)
-                    df = df[mask]
-            
-            return df
+            for column, value in filters:
+                if isinstance(value, list):
+                    # Multiple values (OR condition)
+                    mask = self._contains(df[column], '|'.join(value))
+                else:
+                    # Single value
+                    mask = self._contains(df[column], str(value))
+                df = df[mask]
+            
+            return df[output]
             
         except Exception as e:
             self.logger.error(f"Error searching jobs: {str(e)}")
@@ -234,21 +509,26 @@ class ExcelManager:
             return False
     
     def backup_file(self, backup_filename: str = None) -> bool:
-        """Create a backup of the Excel file."""
+        """Create a backup of the job store."""
         try:
-            if not os.path.exists(self.filename):
+            if not os.path.exists(self.db_filename):
                 self.logger.warning("No file to backup")
                 return False
             
             if not backup_filename:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                backup_filename = f"backup_{timestamp}_{self.filename}"
+                backup_filename = f"backup_{timestamp}_{os.path.basename(self.db_filename)}"
             
-            import shutil
-            shutil.copy2(self.filename, backup_filename)
+            # SQLite online backup: consistent even while another thread writes
+            with self._connect() as conn:
+                backup_conn = sqlite3.connect(backup_filename)
+                try:
+                    conn.backup(backup_conn)
+                finally:
+                    backup_conn.close()
             self.logger.info(f"Created backup: {backup_filename}")
             return True
             
         except Exception as e:
             self.logger.error(f"Error creating backup: {str(e)}")
-            return False 
\ No newline at end of file
+            return False 
@@ -0,0 +1,256 @@
+import atexit
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import Config
+
+# TextProcessor owned by each worker process, loaded once by _init_worker
+_worker_processor = None
+
+
+def _init_worker():
+    """Pool initializer: load the TextProcessor (and its NER model) once per worker."""
+    global _worker_processor
+    from text_processor import TextProcessor
+    _worker_processor = TextProcessor()
+
+
+def _extract_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """Extract job information for one chunk of emails inside a worker process."""
+    return _worker_processor.extract_many(texts)
+
+
+def failed_result(error: Exception) -> Dict[str, Any]:
+    """Result standing in for an email whose extraction raised."""
+    return {'error': str(error)}
+
+
+_END_OF_STREAM = object()
+
+
+def prefetch(iterable: Iterable[Any], maxsize: Optional[int] = None) -> Iterator[Any]:
+    """Run an iterable in a background thread, handing items over through a bounded queue.
+
+    Lets a producer (e.g. an IMAP fetch) run ahead of its consumer (extraction)
+    by at most ``maxsize`` items, so network I/O and CPU work overlap without
+    holding the whole stream in memory. Exceptions raised by the producer are
+    re-raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=max(1, maxsize or Config.FETCH_QUEUE_SIZE))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((_END_OF_STREAM, e))
+            return
+        put((_END_OF_STREAM, None))
+
+    producer = threading.Thread(target=produce, name="prefetch-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _END_OF_STREAM:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Consumer finished or gave up early: release the producer and wait for it
+        stop.set()
+        producer.join()
+
+
+class ExtractionEngine:
+    """Runs TextProcessor extraction on a pool of worker processes.
+
+    Emails are dispatched in chunks and results are yielded back in input order.
+    With fewer than two workers, or if the pool cannot be started or breaks,
+    extraction runs in-process instead. A chunk that fails is retried one email
+    at a time; an email that still fails gets a failed_result, so one bad
+    email doesn't abort the run.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 text_processor=None):
+        self.logger = logging.getLogger(__name__)
+        self.workers = Config.EXTRACTION_WORKERS if workers is None else workers
+        self.chunk_size = max(1, chunk_size or Config.EXTRACTION_CHUNK_SIZE)
+        self.text_processor = text_processor
+        self._executor = None
+        self._pool_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def uses_pool(self) -> bool:
+        """Whether extraction is (still) dispatched to worker processes."""
+        return self.workers > 1 and not self._pool_failed
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Start the worker pool on first use, or return None to run in-process."""
+        if not self.uses_pool:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    # Spawn, not fork: forking a process with torch/threads loaded is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker
+                    )
+                    self.logger.info(f"Started extraction pool with {self.workers} workers")
+                except (OSError, ValueError, NotImplementedError) as e:
+                    self.logger.warning(f"Could not start extraction pool: {e}. Extracting in-process.")
+                    self._pool_failed = True
+            return self._executor
+
+    def _get_text_processor(self):
+        """Return the in-process TextProcessor, creating it on first use."""
+        if self.text_processor is None:
+            from text_processor import TextProcessor
+            self.text_processor = TextProcessor()
+        return self.text_processor
+
+    def _chunks(self, texts: Iterable[str]) -> Iterator[List[str]]:
+        """Group an iterable of texts into lists of at most chunk_size."""
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def iter_extract(self, texts: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Extract job information for each text, yielding results in input order.
+
+        ``texts`` may be any iterable, including a generator; only a bounded
+        number of chunks is in flight at a time.
+        """
+        executor = self._get_executor()
+        chunks = self._chunks(texts)
+
+        if executor is not None:
+            max_in_flight = self.workers * 2
+            pending = deque()
+            submitting = None
+            try:
+                for chunk in chunks:
+                    submitting = chunk
+                    pending.append((chunk, executor.submit(_extract_chunk, chunk)))
+                    submitting = None
+                    while len(pending) >= max_in_flight:
+                        yield from self._pool_results(executor, *pending[0])
+                        pending.popleft()
+                while pending:
+                    yield from self._pool_results(executor, *pending[0])
+                    pending.popleft()
+                return
+            except BrokenProcessPool as e:
+                self.logger.warning(f"Extraction pool failed: {e}. Falling back to in-process extraction.")
+                self._pool_failed = True
+                self.shutdown()
+                # Re-run every chunk without a result yet, then the rest, in order
+                remaining = [chunk for chunk, _ in pending]
+                if submitting is not None:
+                    remaining.append(submitting)
+                chunks = itertools.chain(remaining, chunks)
+
+        text_processor = self._get_text_processor()
+        for chunk in chunks:
+            yield from self._in_process_results(text_processor, chunk)
+
+    def _pool_results(self, executor: ProcessPoolExecutor, chunk: List[str], future) -> List[Dict[str, Any]]:
+        """Results of a chunk sent to the pool; if it failed, its emails are resent one by one."""
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            self.logger.warning(f"Extraction of a chunk of {len(chunk)} emails failed ({e}); "
+                                "retrying one email at a time.")
+        results = []
+        for text in chunk:
+            try:
+                results.extend(executor.submit(_extract_chunk, [text]).result())
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error extracting email: {e}")
+                results.append(failed_result(e))
+        return results
+
+    def _in_process_results(self, text_processor, chunk: List[str]) -> List[Dict[str, Any]]:
+        """Results of a chunk extracted in-process; if it failed, its emails are retried one by one."""
+        try:
+            return text_processor.extract_many(chunk)
+        except Exception as e:
+            self.logger.warning(f"Extraction of a chunk of {len(chunk)} emails failed ({e}); "
+                                "retrying one email at a time.")
+        results = []
+        for text in chunk:
+            try:
+                results.extend(text_processor.extract_many([text]))
+            except Exception as e:
+                self.logger.error(f"Error extracting email: {e}")
+                results.append(failed_result(e))
+        return results
+
+    def extract_many(self, texts: List[str],
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+        """Extract job information for a list of texts, in input order."""
+        results = []
+        for job_info in self.iter_extract(texts):
+            results.append(job_info)
+            if progress_callback:
+                progress_callback(len(results), len(texts))
+        return results
+
+    def shutdown(self):
+        """Stop the worker pool, if one was started."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_engine: Optional[ExtractionEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_extraction_engine(text_processor=None) -> ExtractionEngine:
+    """Return the process-wide extraction engine, creating it on first use.
+
+    ``text_processor`` is used for in-process extraction if the engine does not
+    have one yet, so callers that already loaded a model do not load a second one.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ExtractionEngine(text_processor=text_processor)
+            atexit.register(_engine.shutdown)
+        elif _engine.text_processor is None and text_processor is not None:
+            _engine.text_processor = text_processor
+        return _engine
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML-to-text conversion for HTML-only emails.
+
+Tags are handled as parser events, without building a DOM: script, style and
+head content is skipped, block elements and <br> end a line, and table cells
+on one row are joined with spaces, so one table row becomes one line for the
+extractors' line heuristics. Conversion stops once the output reaches
+HTML_MAX_TEXT_CHARS; input past HTML_MAX_INPUT_CHARS is never parsed.
+
+lxml's event-driven target parser is used when installed, the standard
+library's html.parser otherwise.
+"""
+
+import importlib.util
+import logging
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+from config import Config
+
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None
+
+# Elements whose content is never text
+SKIP_TAGS = {'script', 'style', 'head', 'title', 'noscript', 'template', 'svg', 'object'}
+# Elements that start and end a line of their own
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'center', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'li',
+    'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'tfoot', 'thead', 'tr', 'ul',
+}
+# Void elements that break the line where they stand
+BREAK_TAGS = {'br', 'hr'}
+CELL_TAGS = {'td', 'th'}
+
+FEED_CHUNK_CHARS = 64 * 1024
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+logger = logging.getLogger(__name__)
+
+
+class TextSink:
+    """Receives start/end/data events and collects the text, up to max_chars.
+
+    Doubles as an lxml parser target.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.size = 0
+        self.full = False
+        self.skip_depth = 0
+        self.pre_depth = 0
+        self.at_line_start = True
+
+    def start(self, tag: str, attrib=None):
+        tag = tag.lower()
+        if tag == 'body':
+            # An unclosed <head> must not hide the body
+            self.skip_depth = 0
+        elif tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS or tag in BREAK_TAGS:
+            self._newline(force=tag in BREAK_TAGS)
+        elif tag in CELL_TAGS:
+            self._append(' ')
+        if tag == 'pre':
+            self.pre_depth += 1
+
+    def end(self, tag: str):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._newline()
+        if tag == 'pre':
+            self.pre_depth = max(0, self.pre_depth - 1)
+
+    def data(self, text: str):
+        if self.skip_depth or self.full:
+            return
+        if self.pre_depth:
+            for index, line in enumerate(text.split('\n')):
+                if index:
+                    self._newline(force=True)
+                self._append(line)
+        else:
+            self._append(_WHITESPACE_RE.sub(' ', text))
+
+    def close(self):
+        pass
+
+    def _append(self, text: str):
+        if not text or self.full:
+            return
+        remaining = self.max_chars - self.size
+        if len(text) >= remaining:
+            text = text[:remaining]
+            self.full = True
+        self.parts.append(text)
+        self.size += len(text)
+        if not text.isspace():
+            self.at_line_start = False
+
+    def _newline(self, force: bool = False):
+        # Nested blocks (<div><p>...) give one line break, not several
+        if force or not self.at_line_start:
+            self._append('\n')
+            self.at_line_start = True
+
+    def text(self) -> str:
+        """The collected text, spaces collapsed and blank lines dropped."""
+        lines = (' '.join(line.split()) for line in ''.join(self.parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+
+class _StdlibParser(HTMLParser):
+    """html.parser event handler feeding a TextSink."""
+
+    def __init__(self, sink: TextSink):
+        super().__init__(convert_charrefs=True)
+        self.sink = sink
+
+    def handle_starttag(self, tag, attrs):
+        self.sink.start(tag)
+
+    def handle_endtag(self, tag):
+        self.sink.end(tag)
+
+    def handle_data(self, data):
+        self.sink.data(data)
+
+
+def _feed(parser, sink: TextSink, html: str, max_input: int):
+    for start in range(0, min(len(html), max_input), FEED_CHUNK_CHARS):
+        parser.feed(html[start:min(start + FEED_CHUNK_CHARS, max_input)])
+        if sink.full:
+            return
+    parser.close()
+
+
+def _convert_lxml(html: str, max_chars: int, max_input: int) -> str:
+    from lxml import etree
+    sink = TextSink(max_chars)
+    _feed(etree.HTMLParser(target=sink, recover=True), sink, html, max_input)
+    return sink.text()
+
+
+def _convert_stdlib(html: str, max_chars: int, max_input: int) -> str:
+    sink = TextSink(max_chars)
+    _feed(_StdlibParser(sink), sink, html, max_input)
+    return sink.text()
+
+
+def html_to_text(html: str, max_chars: Optional[int] = None, max_input: Optional[int] = None,
+                 backend: Optional[str] = None) -> str:
+    """Convert HTML to plain text, one line per block element or table row.
+
+    ``backend`` is 'lxml' or 'stdlib'; by default lxml is used when installed.
+    """
+    max_chars = max_chars or Config.HTML_MAX_TEXT_CHARS
+    max_input = max_input or Config.HTML_MAX_INPUT_CHARS
+    backend = backend or ('lxml' if LXML_AVAILABLE else 'stdlib')
+    if backend == 'lxml':
+        try:
+            return _convert_lxml(html, max_chars, max_input)
+        except Exception as e:
+            logger.debug(f"lxml could not convert HTML ({e}); using html.parser")
+    return _convert_stdlib(html, max_chars, max_input)
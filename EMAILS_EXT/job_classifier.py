@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Cheap job vs. non-job gate run before full extraction.
+
+Looks only at the subject, sender and the start of the body. Without a trained
+model it scores job keywords against non-job keywords; with one it uses a
+hashed-feature logistic regression trained locally on labeled emails:
+
+    python job_classifier.py train labeled.jsonl   # lines of {"subject", "sender", "body", "label": 0/1}
+    python job_classifier.py evaluate labeled.jsonl
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Words typical of mail that is not a job posting (receipts, newsletters, account mail)
+NON_JOB_KEYWORDS = [
+    'unsubscribe', 'receipt', 'invoice', 'order', 'shipped', 'delivery', 'newsletter',
+    'password', 'verify', 'verification', 'sale', 'discount', 'coupon', 'statement', 'payment',
+]
+
+HASH_BITS = 18
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class JobEmailClassifier:
+    """Decides job vs. non-job from headers and the first Config.JOB_GATE_BODY_CHARS of the body.
+
+    Keyword scoring (subject hits weigh double, non-job words count against)
+    is used until a model has been trained; a trained model takes the keyword
+    score as one of its features.
+    """
+
+    def __init__(self, model_file: Optional[str] = None):
+        self.model_file = model_file or Config.JOB_GATE_MODEL_FILE
+        self.logger = logging.getLogger(__name__)
+        self.job_keywords = set(Config.JOB_KEYWORDS)
+        self.support_keywords = set(Config.SKILLS_KEYWORDS) | set(Config.SALARY_KEYWORDS)
+        self.non_job_keywords = set(NON_JOB_KEYWORDS)
+        self.weights: Optional[Dict[int, float]] = None
+        self.bias = 0.0
+        self.load()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.weights is not None
+
+    def _fields(self, email_data: Dict) -> Tuple[List[str], List[str], List[str]]:
+        body = (email_data.get('body') or '')[:Config.JOB_GATE_BODY_CHARS]
+        return (_tokens(email_data.get('subject') or ''), _tokens(email_data.get('sender') or ''), _tokens(body))
+
+    def _hits(self, tokens: List[str], keywords: set) -> int:
+        # Plurals count too: 'jobs', 'positions', 'openings'
+        return len({token for token in tokens if token in keywords or token.rstrip('s') in keywords})
+
+    def keyword_score(self, email_data: Dict) -> float:
+        """Job keywords minus non-job keywords; subject hits count double."""
+        subject, _, body = self._fields(email_data)
+        return (2 * self._hits(subject, self.job_keywords)
+                + self._hits(body, self.job_keywords)
+                + 0.5 * self._hits(body, self.support_keywords)
+                - 2 * self._hits(subject, self.non_job_keywords)
+                - self._hits(body, self.non_job_keywords))
+
+    def features(self, email_data: Dict) -> Dict[int, float]:
+        """Hashed unigram and bigram features per field, plus the keyword score."""
+        subject, sender, body = self._fields(email_data)
+        mask = (1 << HASH_BITS) - 1
+        features: Dict[int, float] = {}
+        for prefix, tokens in (('s', subject), ('f', sender), ('b', body)):
+            grams = tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+            for gram in grams:
+                index = zlib.crc32(f"{prefix}:{gram}".encode('utf-8')) & mask
+                features[index] = 1.0  # binary presence
+        features[mask + 1] = self.keyword_score(email_data)
+        return features
+
+    def probability(self, email_data: Dict) -> float:
+        """Probability that the email is a job email, from the trained model."""
+        z = self.bias + sum(self.weights.get(index, 0.0) * value
+                            for index, value in self.features(email_data).items())
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def is_job_email(self, email_data: Dict) -> bool:
+        """True if the email should go through full extraction."""
+        if self.is_trained:
+            return self.probability(email_data) >= Config.JOB_GATE_THRESHOLD
+        return self.keyword_score(email_data) >= Config.JOB_GATE_MIN_SCORE
+
+    def train(self, emails: List[Dict], labels: List[int], epochs: int = 5,
+              learning_rate: float = 0.1, l2: float = 1e-5) -> 'JobEmailClassifier':
+        """Fit the logistic regression with SGD on labeled emails (label 1 = job)."""
+        examples = [(self.features(email_data), label) for email_data, label in zip(emails, labels)]
+        self.weights, self.bias = {}, 0.0
+        rng = random.Random(0)
+        for _ in range(epochs):
+            rng.shuffle(examples)
+            for features, label in examples:
+                z = self.bias + sum(self.weights.get(index, 0.0) * value for index, value in features.items())
+                error = 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z)))) - label
+                self.bias -= learning_rate * error
+                for index, value in features.items():
+                    weight = self.weights.get(index, 0.0)
+                    self.weights[index] = weight - learning_rate * (error * value + l2 * weight)
+        return self
+
+    def save(self) -> bool:
+        """Write the trained model to model_file."""
+        try:
+            with open(self.model_file, 'w', encoding='utf-8') as f:
+                json.dump({'hash_bits': HASH_BITS, 'bias': self.bias,
+                           'weights': {str(index): weight for index, weight in self.weights.items() if weight}}, f)
+            return True
+        except OSError as e:
+            self.logger.error(f"Could not save job gate model {self.model_file}: {e}")
+            return False
+
+    def load(self):
+        """Load a trained model from model_file, if there is one."""
+        if not os.path.exists(self.model_file):
+            return
+        try:
+            with open(self.model_file, 'r', encoding='utf-8') as f:
+                model = json.load(f)
+            if model.get('hash_bits') != HASH_BITS:
+                self.logger.warning(f"Job gate model {self.model_file} uses other features; retrain it")
+                return
+            self.weights = {int(index): weight for index, weight in model['weights'].items()}
+            self.bias = model['bias']
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Could not load job gate model {self.model_file}: {e}. Using keyword scoring.")
+
+
+_classifier: Optional[JobEmailClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_job_classifier() -> JobEmailClassifier:
+    """Return the process-wide job email gate."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = JobEmailClassifier()
+        return _classifier
+
+
+def _read_labeled(path: str) -> Tuple[List[Dict], List[int]]:
+    emails, labels = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                emails.append(item)
+                labels.append(int(item['label']))
+    return emails, labels
+
+
+def evaluate(classifier: JobEmailClassifier, emails: Iterable[Dict], labels: Iterable[int]) -> Dict[str, float]:
+    """Precision, recall and the share of emails the gate lets through."""
+    tp = fp = fn = passed = total = 0
+    for email_data, label in zip(emails, labels):
+        predicted = classifier.is_job_email(email_data)
+        total += 1
+        passed += predicted
+        tp += predicted and label
+        fp += predicted and not label
+        fn += (not predicted) and label
+    return {
+        'precision': tp / (tp + fp) if tp + fp else 0.0,
+        'recall': tp / (tp + fn) if tp + fn else 0.0,
+        'pass_rate': passed / total if total else 0.0,
+    }
+
+
+def main(argv: List[str]) -> int:
+    logging.basicConfig(level=logging.INFO)
+    if len(argv) != 2 or argv[0] not in ('train', 'evaluate'):
+        print(__doc__)
+        return 1
+    emails, labels = _read_labeled(argv[1])
+    classifier = JobEmailClassifier()
+    if argv[0] == 'train':
+        classifier.train(emails, labels)
+        if not classifier.save():
+            return 1
+        print(f"✅ Trained on {len(emails)} emails, saved to {classifier.model_file}")
+    metrics = evaluate(classifier, emails, labels)
+    print(f"Precision: {metrics['precision']:.3f}  Recall: {metrics['recall']:.3f}  "
+          f"Pass rate: {metrics['pass_rate']:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,136 @@
+import logging
+from collections import deque
+from typing import Dict, Iterable, List, Tuple, Union
+
+# Optional C implementation of Aho-Corasick
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# A category is either a flat list of keywords (each keyword is its own label)
+# or a mapping of label -> keywords that should be reported as that label.
+KeywordCategory = Union[List[str], Dict[str, List[str]]]
+
+
+class KeywordMatcher:
+    """Multi-category keyword matcher backed by a single Aho-Corasick automaton.
+
+    The automaton is built once from every keyword dictionary. scan() walks the
+    text a single time and returns the hits of every category together. Matches
+    must sit on word boundaries, so 'ai' does not match inside 'maintain'.
+    """
+
+    def __init__(self, categories: Dict[str, KeywordCategory], use_native: bool = True):
+        self.logger = logging.getLogger(__name__)
+
+        # keyword -> [(category, label_rank)], labels ordered as defined per category
+        self.labels: Dict[str, List[str]] = {}
+        self._outputs: Dict[str, List[Tuple[str, int]]] = {}
+        for category, keywords in categories.items():
+            if isinstance(keywords, dict):
+                groups = keywords.items()
+            else:
+                groups = ((keyword, [keyword]) for keyword in keywords)
+            self.labels[category] = []
+            for label, label_keywords in groups:
+                rank = len(self.labels[category])
+                self.labels[category].append(label)
+                for keyword in label_keywords:
+                    self._outputs.setdefault(keyword.lower(), []).append((category, rank))
+
+        self.use_native = use_native and AHOCORASICK_AVAILABLE
+        if self.use_native:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._outputs:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            self._build_automaton(self._outputs)
+
+    def _build_automaton(self, keywords: Iterable[str]):
+        """Build goto/fail/output tables of a pure-Python Aho-Corasick automaton."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._hits: List[List[str]] = [[]]
+
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._hits.append([])
+                state = next_state
+            self._hits[state].append(keyword)
+
+        # Breadth-first pass to compute failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._hits[next_state] = self._hits[next_state] + self._hits[self._fail[next_state]]
+
+    def _iter_matches(self, text: str):
+        """Yield (end_index, keyword) for every keyword occurrence in lowercased text."""
+        if self.use_native:
+            yield from self._automaton.iter(text)
+            return
+
+        goto, fail, hits = self._goto, self._fail, self._hits
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in hits[state]:
+                yield index, keyword
+
+    @staticmethod
+    def _on_word_boundary(text: str, keyword: str, end: int) -> bool:
+        """Check that a keyword ending at ``end`` is not part of a larger word.
+        
+        A plural 's' or a version number directly after the keyword is allowed,
+        so 'apis' and 'html5' still count as 'api' and 'html'.
+        """
+        start = end - len(keyword) + 1
+        if keyword[0].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if keyword[-1].isalnum():
+            after = end + 1
+            if after < len(text) and text[after] == 's':
+                after += 1
+            else:
+                while after < len(text) and text[after].isdigit():
+                    after += 1
+            if after < len(text) and text[after].isalnum():
+                return False
+        return True
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Scan text once and return the matched labels of every category.
+
+        Labels are listed in the order they were defined for their category, so
+        callers that want "the first matching label" can take the first entry.
+        """
+        ranks: Dict[str, set] = {category: set() for category in self.labels}
+        if text:
+            text_lower = text.lower()
+            for end, keyword in self._iter_matches(text_lower):
+                if self._on_word_boundary(text_lower, keyword, end):
+                    for category, rank in self._outputs[keyword]:
+                        ranks[category].add(rank)
+
+        return {
+            category: [self.labels[category][rank] for rank in sorted(category_ranks)]
+            for category, category_ranks in ranks.items()
+        }
@@ -0,0 +1,150 @@
+import atexit
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Optional process memory readings
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+# Short job email run once after loading, so the first real request does not
+# pay for lazy initialisation inside the tokenizer, model and regex engine
+WARMUP_TEXT = """Subject: Senior Python Developer
+
+We are hiring a Senior Python Developer at TechCorp Inc. in San Francisco, CA.
+Requirements: 5+ years of experience with Python, Django and AWS.
+Salary range: $120,000 - $150,000 per year. Full-time position.
+"""
+
+
+def process_memory_mb() -> Optional[float]:
+    """Resident memory of this process in MB (peak RSS without psutil), or None if unavailable."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Peak RSS: kilobytes on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return None
+
+
+class ModelService:
+    """Process-wide owner of the TextProcessor (and its NER model) and the extraction engine.
+
+    start() loads the model once and warms it up; every Streamlit session and
+    rerun, and the API service, reuse the same instance until shutdown().
+    Load time and memory figures are kept for display.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.text_processor = None
+        self.extraction_engine = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.model_memory_mb: Optional[float] = None
+        self.loaded_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.text_processor is not None
+
+    def start(self, warm_up: bool = True) -> 'ModelService':
+        """Load the model and extraction engine if not loaded yet. Safe to call repeatedly."""
+        with self._lock:
+            if self.is_loaded:
+                return self
+
+            from text_processor import TextProcessor
+            from extraction_engine import get_extraction_engine
+
+            start_time = time.perf_counter()
+            text_processor = TextProcessor()
+            self.load_seconds = time.perf_counter() - start_time
+            self.model_memory_mb = self._model_memory_mb(text_processor)
+
+            if warm_up:
+                start_time = time.perf_counter()
+                try:
+                    text_processor.extract_all_job_info(WARMUP_TEXT, use_cache=False)
+                except Exception as e:
+                    self.logger.warning(f"Model warm-up failed: {str(e)}")
+                self.warmup_seconds = time.perf_counter() - start_time
+
+            self.extraction_engine = get_extraction_engine(text_processor)
+            self.text_processor = text_processor
+            self.loaded_at = datetime.now()
+            self.logger.info(f"Model service ready: loaded in {self.load_seconds:.2f}s"
+                             + (f", warmed up in {self.warmup_seconds:.2f}s" if self.warmup_seconds else ""))
+            return self
+
+    @staticmethod
+    def _model_memory_mb(text_processor) -> Optional[float]:
+        """Size of the NER model weights in MB, if a model is loaded."""
+        pipeline = getattr(text_processor, 'ner_pipeline', None)
+        if getattr(pipeline, 'model_size_mb', None) is not None:
+            return pipeline.model_size_mb  # ONNX Runtime: size of the model file
+        model = getattr(pipeline, 'model', None)
+        if model is None:
+            return None
+        try:
+            total = sum(p.numel() * p.element_size() for p in model.parameters())
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+
+    def status(self) -> Dict[str, Any]:
+        """Load state, timings and memory figures for display."""
+        return {
+            'loaded': self.is_loaded,
+            'ner_available': bool(self.is_loaded and self.text_processor.ner_pipeline),
+            'ner_backend': getattr(self.text_processor, 'ner_backend', None),
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'model_memory_mb': self.model_memory_mb,
+            'process_memory_mb': process_memory_mb(),
+            'loaded_at': self.loaded_at,
+            'extraction_workers': self.extraction_engine.workers if self.extraction_engine else 0,
+            'result_cache': self._result_cache_stats(),
+        }
+
+    def _result_cache_stats(self) -> Optional[Dict[str, Any]]:
+        cache = getattr(self.text_processor, 'result_cache', None)
+        return cache.stats() if cache else None
+
+    def shutdown(self):
+        """Release the model and stop the extraction pool; the next start() loads again."""
+        with self._lock:
+            if self.extraction_engine is not None:
+                self.extraction_engine.shutdown()
+                self.extraction_engine.text_processor = None
+            self.text_processor = None
+            self.extraction_engine = None
+            self.loaded_at = None
+
+
+_service: Optional[ModelService] = None
+_service_lock = threading.Lock()
+
+
+def get_model_service() -> ModelService:
+    """Return the process-wide model service (not started yet on first call)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ModelService()
+            atexit.register(_service.shutdown)
+        return _service
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+NLTK data handling for TextProcessor.
+
+NLTK corpora are installed once, at install/build time:
+
+    python nlp_resources.py --download
+
+At runtime they are only verified offline. Nothing is downloaded on import,
+and when data is missing TextProcessor falls back to simple regex tokenizers.
+"""
+
+import logging
+import re
+import sys
+import threading
+from typing import Callable, List, NamedTuple, Optional, Set
+
+# Packages covering both NLTK < 3.9 (punkt, averaged_perceptron_tagger)
+# and NLTK >= 3.9 (punkt_tab, averaged_perceptron_tagger_eng)
+NLTK_PACKAGES = [
+    'punkt',
+    'punkt_tab',
+    'stopwords',
+    'averaged_perceptron_tagger',
+    'averaged_perceptron_tagger_eng',
+]
+
+# Used when the NLTK stopwords corpus is not installed
+FALLBACK_STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+    'he', 'her', 'his', 'i', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'our',
+    'she', 'that', 'the', 'their', 'they', 'this', 'to', 'was', 'we', 'were',
+    'will', 'with', 'you', 'your',
+}
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r"\w+(?:[-']\w+)*|[^\w\s]")
+
+logger = logging.getLogger(__name__)
+
+
+class NltkTools(NamedTuple):
+    """Tokenizers, tagger and stop words, backed by NLTK where its data is installed."""
+    sent_tokenize: Callable[[str], List[str]]
+    word_tokenize: Callable[[str], List[str]]
+    pos_tag: Optional[Callable]  # None when the tagger is not installed
+    stop_words: Set[str]
+    missing: List[str]
+
+
+def _regex_sent_tokenize(text: str) -> List[str]:
+    return [sentence for sentence in _SENTENCE_END_RE.split(text.strip()) if sentence]
+
+
+def _regex_word_tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall(text)
+
+
+def _load_tools() -> NltkTools:
+    """Import NLTK and probe each resource offline, falling back where it is missing."""
+    missing = []
+    try:
+        import nltk  # noqa: F401
+        from nltk.tokenize import sent_tokenize, word_tokenize
+        from nltk.corpus import stopwords
+        from nltk.tag import pos_tag
+    except ImportError:
+        logger.warning("nltk is not installed; using regex tokenizers")
+        return NltkTools(_regex_sent_tokenize, _regex_word_tokenize, None, set(FALLBACK_STOP_WORDS), ['nltk'])
+
+    try:
+        sent_tokenize("Probe. Probe.")
+        word_tokenize("Probe")
+    except LookupError:
+        missing.append('punkt')
+        sent_tokenize, word_tokenize = _regex_sent_tokenize, _regex_word_tokenize
+
+    try:
+        stop_words = set(stopwords.words('english'))
+    except LookupError:
+        missing.append('stopwords')
+        stop_words = set(FALLBACK_STOP_WORDS)
+
+    try:
+        pos_tag(['Probe'])
+    except LookupError:
+        missing.append('averaged_perceptron_tagger')
+        pos_tag = None
+
+    if missing:
+        logger.warning(f"NLTK data missing ({', '.join(missing)}); using fallbacks. "
+                       f"Install it with: python nlp_resources.py --download")
+    return NltkTools(sent_tokenize, word_tokenize, pos_tag, stop_words, missing)
+
+
+_tools: Optional[NltkTools] = None
+_tools_lock = threading.Lock()
+
+
+def get_nltk_tools() -> NltkTools:
+    """Return the process-wide NLTK tools, importing and verifying NLTK on first use."""
+    global _tools
+    with _tools_lock:
+        if _tools is None:
+            _tools = _load_tools()
+        return _tools
+
+
+def download_nltk_data(download_dir: Optional[str] = None) -> bool:
+    """Download every NLTK package TextProcessor can use. Meant for install/build time."""
+    import nltk
+    for package in NLTK_PACKAGES:
+        # Packages unknown to the installed NLTK version are skipped
+        if not nltk.download(package, download_dir=download_dir, quiet=True, raise_on_error=False):
+            logger.info(f"NLTK package {package} not downloaded")
+    if download_dir and download_dir not in nltk.data.path:
+        nltk.data.path.append(download_dir)
+    return not _load_tools().missing
+
+
+def main(argv: List[str]) -> int:
+    logging.basicConfig(level=logging.INFO)
+    if '--download' in argv:
+        download_dir = None
+        if '--dir' in argv:
+            download_dir = argv[argv.index('--dir') + 1]
+        if not download_nltk_data(download_dir):
+            print("❌ Some NLTK data is still missing after download")
+            return 1
+    tools = _load_tools()
+    if tools.missing:
+        print(f"❌ Missing NLTK data: {', '.join(tools.missing)}")
+        return 1
+    print("✅ All NLTK data is installed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+ONNX Runtime backend for the BERT NER model.
+
+The Hugging Face model is exported to ONNX once (optionally with dynamic int8
+quantization of the weights) and then served by ONNX Runtime on CPU:
+
+    pip install -r requirements-onnx.txt
+    python onnx_ner.py --export [--quantize]
+
+OnnxNerPipeline is called like the transformers "ner" pipeline with
+aggregation_strategy="simple", so TextProcessor uses either interchangeably.
+torch is only needed for the export, not at inference time.
+"""
+
+import importlib.util
+import json
+import logging
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Union
+
+from config import Config
+
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec('onnxruntime') is not None
+
+ONNX_FILENAME = 'model.onnx'
+QUANTIZED_ONNX_FILENAME = 'model.int8.onnx'
+
+logger = logging.getLogger(__name__)
+
+
+def onnx_model_dir(model_name: str, model_dir: Optional[str] = None) -> str:
+    """Directory holding the exported model, tokenizer and config of ``model_name``."""
+    return os.path.join(model_dir or Config.ONNX_MODEL_DIR, re.sub(r'[^\w.-]+', '_', model_name))
+
+
+def export_onnx_model(model_name: str, model_dir: Optional[str] = None, quantize: bool = False) -> str:
+    """Export ``model_name`` to ONNX (and an int8 copy if ``quantize``). Returns the model file to load.
+
+    Existing exports are reused.
+    """
+    output_dir = onnx_model_dir(model_name, model_dir)
+    onnx_path = os.path.join(output_dir, ONNX_FILENAME)
+
+    if not os.path.exists(onnx_path):
+        import torch
+        from transformers import AutoModelForTokenClassification, AutoTokenizer
+
+        logger.info(f"Exporting {model_name} to ONNX in {output_dir}...")
+        os.makedirs(output_dir, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForTokenClassification.from_pretrained(model_name)
+        model.eval()
+        tokenizer.save_pretrained(output_dir)
+        model.config.save_pretrained(output_dir)
+
+        sample = tokenizer(["Export sample"], return_tensors='pt')
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['logits'] = {0: 'batch', 1: 'sequence'}
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                onnx_path,
+                input_names=input_names,
+                output_names=['logits'],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+        logger.info(f"Exported {onnx_path}")
+
+    if not quantize:
+        return onnx_path
+
+    quantized_path = os.path.join(output_dir, QUANTIZED_ONNX_FILENAME)
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info(f"Quantizing {onnx_path} to int8...")
+        quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+        logger.info(f"Quantized model written to {quantized_path}")
+    return quantized_path
+
+
+class OnnxNerPipeline:
+    """Token classification with ONNX Runtime, aggregated like the "simple" strategy of transformers.
+
+    Sub-word tokens are labelled by their most likely tag; adjacent tokens of the
+    same entity type (not starting a new B- tag) form one entity whose score is the
+    mean token score. Texts longer than the model's maximum length are truncated,
+    as with the PyTorch pipeline's tokenizer limit.
+    """
+
+    def __init__(self, model_path: str):
+        import numpy as np
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self._np = np
+        self.model_path = model_path
+        model_dir = os.path.dirname(model_path)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        with open(os.path.join(model_dir, 'config.json'), 'r', encoding='utf-8') as f:
+            self.id2label = {int(index): label for index, label in json.load(f)['id2label'].items()}
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.model_size_mb = os.path.getsize(model_path) / (1024 * 1024)
+
+    def __call__(self, inputs: Union[str, List[str]], batch_size: Optional[int] = None
+                 ) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        if isinstance(inputs, str):
+            return self._predict([inputs])[0]
+        batch_size = max(1, batch_size or len(inputs) or 1)
+        results = []
+        for start in range(0, len(inputs), batch_size):
+            results.extend(self._predict(inputs[start:start + batch_size]))
+        return results
+
+    def _predict(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        np = self._np
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=min(self.tokenizer.model_max_length, 512),
+            return_offsets_mapping=True,
+            return_special_tokens_mask=True,
+            return_tensors='np',
+        )
+        feed = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+        logits = self.session.run(['logits'], feed)[0]
+
+        # Softmax over labels, numerically stable
+        shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        probabilities = shifted / shifted.sum(axis=-1, keepdims=True)
+
+        results = []
+        for row in range(len(texts)):
+            tokens = []
+            for position, (start, end) in enumerate(encoded['offset_mapping'][row]):
+                if encoded['special_tokens_mask'][row][position] or not encoded['attention_mask'][row][position]:
+                    continue
+                label_index = int(probabilities[row, position].argmax())
+                tokens.append({
+                    'label': self.id2label[label_index],
+                    'score': float(probabilities[row, position, label_index]),
+                    'id': int(encoded['input_ids'][row][position]),
+                    'start': int(start),
+                    'end': int(end),
+                })
+            results.append(self._aggregate(tokens, texts[row]))
+        return results
+
+    def _aggregate(self, tokens: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+        """Group adjacent tokens into entities, dropping the outside ("O") group."""
+        entities = []
+        group: List[Dict[str, Any]] = []
+        group_tag = None
+
+        def close_group():
+            if group and group_tag != 'O':
+                entities.append({
+                    'entity_group': group_tag,
+                    'score': sum(token['score'] for token in group) / len(group),
+                    'word': self.tokenizer.decode([token['id'] for token in group]),
+                    'start': group[0]['start'],
+                    'end': group[-1]['end'],
+                })
+
+        for token in tokens:
+            label = token['label']
+            if label.startswith(('B-', 'I-')):
+                bi, tag = label[0], label[2:]
+            else:
+                bi, tag = 'I', label
+            if group and tag == group_tag and bi != 'B':
+                group.append(token)
+                continue
+            close_group()
+            group, group_tag = [token], tag
+        close_group()
+        return entities
+
+
+def load_onnx_pipeline(model_name: str, quantize: bool = False, model_dir: Optional[str] = None) -> OnnxNerPipeline:
+    """Load the ONNX export of ``model_name``, exporting it first if needed."""
+    return OnnxNerPipeline(export_onnx_model(model_name, model_dir, quantize))
+
+
+def main(argv: List[str]) -> int:
+    logging.basicConfig(level=logging.INFO)
+    from text_processor import NER_MODEL_NAME
+
+    if '--export' not in argv:
+        print("Usage: python onnx_ner.py --export [--quantize]")
+        return 1
+    if not ONNXRUNTIME_AVAILABLE:
+        print("❌ onnxruntime is not installed. Install with: pip install -r requirements-onnx.txt")
+        return 1
+    path = export_onnx_model(NER_MODEL_NAME, quantize='--quantize' in argv)
+    print(f"✅ ONNX model ready: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
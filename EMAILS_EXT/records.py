@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compact records for the emails and jobs held in memory during an extraction run.
+
+Both are slotted, so each costs a few references instead of a dict, and both
+read like the dicts they replace: record['body'], record.get('uid'),
+'uid' in record, dict(record). Fields that were never set are absent.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+class _Record(Mapping):
+    """Read-only mapping view over __slots__, plus item assignment to existing fields."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self.__slots__ if hasattr(self, name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={self[name]!r:.40}" for name in self)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+class EmailRecord(_Record):
+    """A fetched email: headers and text body only, no parsed message object.
+
+    message_number (sequence number) or uid is set by the fetch that produced
+    it, for marking the email as read later.
+    """
+
+    __slots__ = ('subject', 'sender', 'date', 'message_id', 'body', 'message_number', 'uid')
+
+    def __init__(self, subject: str, sender: str, date: str, message_id: str, body: str):
+        self.subject = subject
+        self.sender = sender
+        self.date = date
+        self.message_id = message_id
+        self.body = body
+
+
+class JobRecord(_Record):
+    """Extracted job fields plus the metadata of the email they came from.
+
+    The body is kept once, as raw_email; the cleaned copy the extractor
+    worked on is not retained.
+    """
+
+    __slots__ = (
+        'job_title', 'years_experience', 'required_skills', 'company_name', 'job_type', 'industry',
+        'seniority_level', 'job_summary', 'location', 'application_deadline', 'min_salary', 'max_salary',
+        'email_date', 'sender', 'subject', 'message_id', 'raw_email',
+    )
+
+    @classmethod
+    def from_extraction(cls, job_info: Dict[str, Any], email_data: Mapping) -> 'JobRecord':
+        """Combine an extraction result with its email; result keys without a field are dropped."""
+        record = cls()
+        for key, value in job_info.items():
+            if key in cls.__slots__:
+                setattr(record, key, value)
+        record.email_date = email_data.get('date', '')
+        record.sender = email_data.get('sender', '')
+        record.subject = email_data.get('subject', '')
+        record.message_id = email_data.get('message_id', '')
+        record.raw_email = email_data.get('body', '')
+        return record
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config import Config
+
+
+class ResultCache:
+    """Content-addressed cache of extraction results: a bounded in-memory LRU over a SQLite file.
+
+    Entries are keyed on a hash of the cleaned email text and the extractor
+    version, so identical bodies (job alerts, API retries) are extracted once.
+    The version changes with the model or the pattern set; entries of any
+    other version are never returned and are dropped from disk on open.
+    """
+
+    def __init__(self, version: str, filename: Optional[str] = None, max_entries: Optional[int] = None):
+        self.version = version
+        self.filename = filename or Config.RESULT_CACHE_FILE
+        self.max_entries = max(0, Config.RESULT_CACHE_SIZE if max_entries is None else max_entries)
+        self.logger = logging.getLogger(__name__)
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._disk_available = self._init_disk()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The process's connection to the on-disk tier; call with self._lock held.
+
+        One connection is kept per process and reopened after a fork, so worker
+        processes never share the parent's SQLite handle.
+        """
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.filename, timeout=30, check_same_thread=False)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _init_disk(self) -> bool:
+        """Create the on-disk tier and drop entries left by other extractor versions."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.execute('CREATE TABLE IF NOT EXISTS results '
+                                 '(key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT NOT NULL)')
+                    removed = conn.execute('DELETE FROM results WHERE version != ?', (self.version,)).rowcount
+            if removed:
+                self.logger.info(f"Dropped {removed} cached results of older extractor versions")
+            return True
+        except sqlite3.Error as e:
+            self.logger.warning(f"Result cache {self.filename} unavailable, using memory only: {e}")
+            return False
+
+    def key(self, cleaned_text: str) -> str:
+        """Cache key of a cleaned email text under the current extractor version."""
+        return hashlib.sha256(f"{self.version}\0{cleaned_text}".encode('utf-8', 'replace')).hexdigest()
+
+    def _remember(self, key: str, payload: str):
+        if not self.max_entries:
+            return
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, cleaned_text: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of the cached result for this text, or None."""
+        key = self.key(cleaned_text)
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(payload)
+
+            if self._disk_available:
+                try:
+                    row = self._connection().execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+                    payload = row[0] if row else None
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Result cache read failed: {e}")
+
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, payload)
+        return json.loads(payload)
+
+    def put(self, cleaned_text: str, result: Dict[str, Any]):
+        """Store the result of extracting this text in both tiers."""
+        self.put_many([(cleaned_text, result)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Store (cleaned text, result) pairs in both tiers, in one disk transaction."""
+        rows = []
+        for cleaned_text, result in items:
+            try:
+                rows.append((self.key(cleaned_text), self.version, json.dumps(result)))
+            except (TypeError, ValueError) as e:
+                self.logger.warning(f"Result not cacheable: {e}")
+        if not rows:
+            return
+
+        with self._lock:
+            for key, _, payload in rows:
+                self._remember(key, payload)
+            if self._disk_available:
+                try:
+                    with self._connection() as conn:
+                        conn.executemany('INSERT OR REPLACE INTO results (key, version, result) VALUES (?, ?, ?)',
+                                         rows)
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Result cache write failed: {e}")
+
+    def clear(self):
+        """Drop every cached result from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._disk_available:
+                try:
+                    with self._connection() as conn:
+                        conn.execute('DELETE FROM results')
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Result cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizes, for display."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'version': self.version,
+                'memory_entries': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+            }
+
+
+_caches: Dict[tuple, ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(version: str, filename: Optional[str] = None) -> ResultCache:
+    """Return the process-wide result cache of an extractor version."""
+    filename = filename or Config.RESULT_CACHE_FILE
+    cache_key = (os.path.abspath(filename), version)
+    with _caches_lock:
+        if cache_key not in _caches:
+            _caches[cache_key] = ResultCache(version, filename)
+        return _caches[cache_key]
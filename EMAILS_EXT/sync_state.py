@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from config import Config
+
+
+class SyncState:
+    """Persisted IMAP sync marks: UIDVALIDITY and last seen UID per account mailbox.
+
+    Stored as a small JSON file so each scheduled check only asks the server
+    for UIDs above the mark instead of rescanning the whole mailbox. UIDs
+    whose fetch failed are kept with their failure counts until retried.
+    """
+
+    def __init__(self, filename: Optional[str] = None):
+        self.filename = filename or Config.SYNC_STATE_FILE
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def mailbox_key(email_address: str, imap_server: str, mailbox: str) -> str:
+        """Key identifying one mailbox of one account."""
+        return f"{email_address.lower()}@{imap_server.lower()}/{mailbox}"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.filename):
+            return {}
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read sync state {self.filename}: {e}. Starting a full resync.")
+            return {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return {'uidvalidity': ..., 'last_uid': ...} for a mailbox, or None if never synced.
+
+        A mark held back by failed fetches also has 'failures': {uid: failed attempts}.
+        """
+        with self._lock:
+            return self._load().get(key)
+
+    def update(self, key: str, uidvalidity: int, last_uid: int, failures: Optional[Dict[str, int]] = None) -> bool:
+        """Store the sync mark of a mailbox, replacing the file atomically."""
+        with self._lock:
+            state = self._load()
+            state[key] = {'uidvalidity': uidvalidity, 'last_uid': last_uid}
+            if failures:
+                state[key]['failures'] = failures
+            tmp_filename = f"{self.filename}.tmp"
+            try:
+                with open(tmp_filename, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, indent=2)
+                os.replace(tmp_filename, self.filename)
+                return True
+            except OSError as e:
+                self.logger.error(f"Could not save sync state {self.filename}: {e}")
+                return False
+
+    def reset(self, key: Optional[str] = None) -> bool:
+        """Forget the mark of one mailbox, or of all mailboxes, forcing a full resync."""
+        with self._lock:
+            state = self._load() if key else {}
+            state.pop(key, None)
+            try:
+                if state:
+                    with open(self.filename, 'w', encoding='utf-8') as f:
+                        json.dump(state, f, indent=2)
+                elif os.path.exists(self.filename):
+                    os.remove(self.filename)
+                return True
+            except OSError as e:
+                self.logger.error(f"Could not reset sync state {self.filename}: {e}")
+                return False
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for the AI service endpoints.
+Covers single, batch and streaming extraction, request limits, and /health
+staying responsive while extraction is busy.
+"""
+
+import asyncio
+import json
+import threading
+
+import httpx
+from fastapi.testclient import TestClient
+
+from config import Config
+
+# Keep test extractions out of the app's result cache; set before the service loads its model
+Config.RESULT_CACHE_ENABLED = False
+
+import ai_service  # noqa: E402
+
+BODY = "We are hiring a Senior Python Developer at TechCorp Inc. Requirements: 5+ years of experience with Python."
+
+
+def test_extract_and_batch():
+    """Batch results match single extraction, in input order."""
+    print("🧪 Testing /extract and /extract/batch")
+    client = TestClient(ai_service.app)
+    other = "Contract Data Analyst role, SQL and Tableau required. Remote."
+
+    single = client.post("/extract", json={"text": BODY})
+    assert single.status_code == 200
+
+    batch = client.post("/extract/batch", json={"texts": [BODY, other]})
+    assert batch.status_code == 200
+    data = batch.json()["data"]
+    assert len(data) == 2
+    assert data[0] == single.json()["data"]
+    print("✅ Batch extraction works")
+
+
+def test_request_limits():
+    """Oversized batches and texts are rejected with a clear message."""
+    print("🧪 Testing request limits")
+    client = TestClient(ai_service.app)
+    original = (Config.API_MAX_BATCH_SIZE, Config.API_MAX_TEXT_LENGTH)
+    Config.API_MAX_BATCH_SIZE, Config.API_MAX_TEXT_LENGTH = 2, 50
+    try:
+        response = client.post("/extract/batch", json={"texts": ["a", "b", "c"]})
+        assert response.status_code == 413 and "limit is 2" in response.json()["detail"]
+
+        response = client.post("/extract/batch", json={"texts": ["short", "x" * 51]})
+        assert response.status_code == 413 and "texts[1]" in response.json()["detail"]
+
+        response = client.post("/extract", json={"text": "x" * 51})
+        assert response.status_code == 413
+
+        response = client.post("/extract/batch", json={"texts": []})
+        assert response.status_code == 422
+    finally:
+        Config.API_MAX_BATCH_SIZE, Config.API_MAX_TEXT_LENGTH = original
+    print("✅ Limits enforced")
+
+
+def test_health_responsive_during_extraction():
+    """/health answers while an extraction is running on the executor."""
+    print("🧪 Testing /health under load")
+    started, release = threading.Event(), threading.Event()
+    original = ai_service.processor.extract_all_job_info
+
+    def slow_extract(text):
+        started.set()
+        release.wait(timeout=10)
+        return original(text)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=ai_service.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            extraction = asyncio.create_task(client.post("/extract", json={"text": BODY}))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            health = await asyncio.wait_for(client.get("/health"), timeout=2)
+            assert health.status_code == 200 and not extraction.done()
+            release.set()
+            assert (await extraction).status_code == 200
+
+    ai_service.processor.extract_all_job_info = slow_extract
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        ai_service.processor.extract_all_job_info = original
+    print("✅ /health stays responsive")
+
+
+def test_ndjson_stream():
+    """Lines split across chunks are extracted in bounded batches; bad lines get error records."""
+    print("🧪 Testing /extract/stream")
+    lines = [json.dumps({"id": f"mail-{i}", "text": f"{BODY} Ref {i}"}) for i in range(7)]
+    lines.insert(3, "not json")
+    lines.insert(5, json.dumps({"id": "too-long", "text": "x" * 200}))
+    payload = ("\n".join(lines) + "\n").encode("utf-8")
+
+    batch_sizes = []
+    original_extract_many = ai_service.processor.extract_many
+    original_limits = (Config.API_STREAM_BATCH_SIZE, Config.API_MAX_TEXT_LENGTH)
+
+    def counting_extract_many(texts, *args, **kwargs):
+        batch_sizes.append(len(texts))
+        return original_extract_many(texts, *args, **kwargs)
+
+    async def chunks():
+        # Odd-sized chunks so lines straddle chunk boundaries
+        for start in range(0, len(payload), 37):
+            yield payload[start:start + 37]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=ai_service.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/extract/stream", content=chunks(),
+                                         headers={"Content-Type": "application/x-ndjson"})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            return [json.loads(line) for line in response.text.splitlines()]
+
+    ai_service.processor.extract_many = counting_extract_many
+    Config.API_STREAM_BATCH_SIZE, Config.API_MAX_TEXT_LENGTH = 2, 150
+    try:
+        records = asyncio.run(scenario())
+    finally:
+        ai_service.processor.extract_many = original_extract_many
+        Config.API_STREAM_BATCH_SIZE, Config.API_MAX_TEXT_LENGTH = original_limits
+
+    assert [record["index"] for record in records] == list(range(9))
+    assert "invalid JSON" in records[3]["error"]
+    assert records[5]["id"] == "too-long" and "limit is 150" in records[5]["error"]
+    extracted = [record for record in records if "data" in record]
+    assert [record["id"] for record in extracted] == [f"mail-{i}" for i in range(7)]
+    assert all(record["data"]["cleaned_text"] for record in extracted)
+    assert sum(batch_sizes) == 7 and max(batch_sizes) <= 2
+    print(f"✅ Streamed {len(records)} results in batches of at most 2")
+
+
+def test_stream_stops_on_disconnect():
+    """Batches left after the body is read are skipped for a gone client; background tasks still run."""
+    print("🧪 Testing /extract/stream disconnect handling")
+    from starlette.background import BackgroundTask
+    from starlette.requests import Request
+
+    payload = "\n".join(json.dumps({"text": f"{BODY} Ref {i}"}) for i in range(3)).encode("utf-8")
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+    background_ran = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        scope = {"type": "http", "method": "POST", "path": "/extract/stream", "headers": []}
+        request = Request(scope, receive)
+        response = ai_service.RequestStreamingResponse(
+            ai_service.stream_results(request), background=BackgroundTask(background_ran.append, True))
+        await response(scope, receive, send)
+
+    original_batch_size = Config.API_STREAM_BATCH_SIZE
+    Config.API_STREAM_BATCH_SIZE = 2
+    try:
+        asyncio.run(scenario())
+    finally:
+        Config.API_STREAM_BATCH_SIZE = original_batch_size
+
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    # The first two lines were extracted while the body was read; the last batch was dropped
+    assert [json.loads(line)["index"] for line in body.splitlines()] == [0, 1]
+    assert background_ran == [True]
+    print("✅ Stream stopped for a disconnected client")
+
+
+if __name__ == "__main__":
+    test_extract_and_batch()
+    test_request_limits()
+    test_health_responsive_during_extraction()
+    test_ndjson_stream()
+    test_stream_stops_on_disconnect()
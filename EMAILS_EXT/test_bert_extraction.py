@@ -8,91 +8,95 @@ import logging
 from text_processor import TextProcessor
 from config import Config
 
+# Keep test extractions out of the app's result cache
+Config.RESULT_CACHE_ENABLED = False
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sample job emails for testing
+TEST_EMAILS = [
+    {
+        "subject": "Senior Python Developer Position at TechCorp Inc.",
+        "body": """
+        Hi there,
+        
+        We are looking for a Senior Python Developer to join our team at TechCorp Inc. 
+        This is a full-time position based in San Francisco, CA.
+        
+        Requirements:
+        - 5+ years of experience with Python
+        - Experience with Django, Flask, and FastAPI
+        - Knowledge of AWS and Docker
+        - Experience with machine learning and data science
+        
+        Salary range: $120,000 - $150,000 per year.
+        
+        Please apply by December 31, 2024.
+        
+        Best regards,
+        HR Team
+        """
+    },
+    {
+        "subject": "Data Scientist Opportunity",
+        "body": """
+        Hello,
+        
+        Microsoft is hiring a Data Scientist for our Seattle office.
+        This is a contract position with potential for full-time conversion.
+        
+        Skills needed:
+        - Python, R, SQL
+        - Machine Learning (scikit-learn, TensorFlow)
+        - Statistical analysis
+        - Data visualization (Tableau, Power BI)
+        
+        Experience: 3-5 years in data science or analytics.
+        
+        Compensation: $130k - $160k annually.
+        
+        Apply by January 15, 2025.
+        
+        Thanks,
+        Microsoft Recruiting
+        """
+    },
+    {
+        "subject": "Frontend Developer - Remote",
+        "body": """
+        Greetings,
+        
+        We're seeking a Frontend Developer at Google for a remote position.
+        This is a mid-level role in the technology industry.
+        
+        Required skills:
+        - JavaScript, React, Angular, Vue.js
+        - HTML5, CSS3, TypeScript
+        - Git, Agile methodologies
+        - REST APIs and GraphQL
+        
+        Location: Remote (US-based)
+        Type: Full-time
+        Experience: 2-4 years
+        
+        Salary: $100,000 - $130,000 per year.
+        
+        Deadline: February 1, 2025.
+        
+        Regards,
+        Google HR
+        """
+    }
+]
+
 def test_bert_extraction():
     """Test the BERT-based extraction with sample job emails."""
     
     # Initialize the text processor
     processor = TextProcessor()
-    
-    # Sample job emails for testing
-    test_emails = [
-        {
-            "subject": "Senior Python Developer Position at TechCorp Inc.",
-            "body": """
-            Hi there,
-            
-            We are looking for a Senior Python Developer to join our team at TechCorp Inc. 
-            This is a full-time position based in San Francisco, CA.
-            
-            Requirements:
-            - 5+ years of experience with Python
-            - Experience with Django, Flask, and FastAPI
-            - Knowledge of AWS and Docker
-            - Experience with machine learning and data science
-            
-            Salary range: $120,000 - $150,000 per year.
-            
-            Please apply by December 31, 2024.
-            
-            Best regards,
-            HR Team
-            """
-        },
-        {
-            "subject": "Data Scientist Opportunity",
-            "body": """
-            Hello,
-            
-            Microsoft is hiring a Data Scientist for our Seattle office.
-            This is a contract position with potential for full-time conversion.
-            
-            Skills needed:
-            - Python, R, SQL
-            - Machine Learning (scikit-learn, TensorFlow)
-            - Statistical analysis
-            - Data visualization (Tableau, Power BI)
-            
-            Experience: 3-5 years in data science or analytics.
-            
-            Compensation: $130k - $160k annually.
-            
-            Apply by January 15, 2025.
-            
-            Thanks,
-            Microsoft Recruiting
-            """
-        },
-        {
-            "subject": "Frontend Developer - Remote",
-            "body": """
-            Greetings,
-            
-            We're seeking a Frontend Developer at Google for a remote position.
-            This is a mid-level role in the technology industry.
-            
-            Required skills:
-            - JavaScript, React, Angular, Vue.js
-            - HTML5, CSS3, TypeScript
-            - Git, Agile methodologies
-            - REST APIs and GraphQL
-            
-            Location: Remote (US-based)
-            Type: Full-time
-            Experience: 2-4 years
-            
-            Salary: $100,000 - $130,000 per year.
-            
-            Deadline: February 1, 2025.
-            
-            Regards,
-            Google HR
-            """
-        }
-    ]
+    test_emails = TEST_EMAILS
     
     print("🧪 Testing BERT-Based Job Information Extraction")
     print("=" * 60)
@@ -115,6 +119,10 @@ def test_bert_extraction():
         print(f"🔧 Skills: {', '.join(job_info['required_skills'][:5])}...")
         print(f"📝 Summary: {job_info['job_summary'][:100]}..." if job_info['job_summary'] else "📝 Summary: None")
         
+        # Per-stage timings (the NER stage runs once per email)
+        timings = ", ".join(f"{stage}: {seconds * 1000:.1f}ms" for stage, seconds in processor.last_stage_timings.items())
+        print(f"⏱️  Stage Timings: {timings}")
+        
         print()
     
     print("✅ BERT extraction test completed!")
@@ -125,5 +133,25 @@ def test_bert_extraction():
     print(f"   - Confidence Threshold: {Config.CONFIDENCE_THRESHOLD}")
     print(f"   - Transformers Available: {hasattr(processor, 'ner_pipeline') and processor.ner_pipeline is not None}")
 
+def test_batch_extraction():
+    """Test that batched extraction matches one-at-a-time extraction, in input order."""
+    processor = TextProcessor()
+    bodies = [email['body'] for email in TEST_EMAILS]
+    
+    print("\n🧪 Testing Batched Extraction")
+    print("=" * 60)
+    
+    batch_results = processor.extract_many(bodies, batch_size=2)
+    # The single-call side bypasses the cache, so it can't just read back the batch results
+    single_results = [processor.extract_all_job_info(body, use_cache=False) for body in bodies]
+    
+    assert len(batch_results) == len(bodies)
+    for i, (batch_info, single_info) in enumerate(zip(batch_results, single_results), 1):
+        assert batch_info == single_info, f"Batched result differs for email {i}"
+        print(f"✅ Email {i}: {batch_info['job_title']} at {batch_info['company_name']}")
+    
+    print("✅ Batched extraction test completed!")
+
 if __name__ == "__main__":
-    test_bert_extraction() 
\ No newline at end of file
+    test_bert_extraction()
+    test_batch_extraction() 
\ No newline at end of file
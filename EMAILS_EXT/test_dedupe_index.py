@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the processed-email dedupe index.
+Covers the Bloom filter, Message-ID and fingerprint keys, and persistence.
+"""
+
+import os
+import tempfile
+import threading
+
+from dedupe_index import BloomFilter, DedupeIndex, dedupe_key
+from excel_manager import ExcelManager
+
+
+def test_bloom_filter():
+    """No false negatives, and false positives near the configured rate."""
+    print("🧪 Testing Bloom filter")
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(f"mid:<{i}@example.com>")
+    assert all(f"mid:<{i}@example.com>" in bloom for i in range(10000))
+    false_positives = sum(f"mid:<other{i}@example.com>" in bloom for i in range(10000))
+    assert false_positives < 300, false_positives
+    print(f"✅ {false_positives} false positives in 10000 lookups")
+
+
+def test_fingerprint_for_missing_message_id():
+    """Emails without a Message-ID are told apart by sender, date and body."""
+    first = {'message_id': '', 'sender': 'a@example.com', 'date': 'Mon, 1 Jan 2024', 'body': 'Job one'}
+    second = dict(first, body='Job two')
+    assert dedupe_key(first).startswith('fp:')
+    assert dedupe_key(first) != dedupe_key(second)
+    assert dedupe_key({'message_id': ' <x@example.com> '}) == 'mid:<x@example.com>'
+    # A job record built from the email gets the same key
+    job = {'message_id': '', 'sender': first['sender'], 'email_date': first['date'], 'raw_email': first['body']}
+    assert dedupe_key(job) == dedupe_key(first)
+
+
+def test_dedupe_index_persists():
+    """Recorded emails are found again, also by a fresh index over the same file."""
+    print("🧪 Testing dedupe index")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_filename = os.path.join(tmp_dir, 'jobs.db')
+        index = DedupeIndex(db_filename)
+        no_id = {'message_id': '', 'sender': 'a@example.com', 'date': 'today', 'body': 'Hello'}
+
+        assert '<a@example.com>' not in index
+        assert index.add_many(['<a@example.com>', no_id, {'message_id': '<b@example.com>'}]) == 3
+        assert '<a@example.com>' in index
+        assert {'message_id': '<b@example.com>'} in index
+        assert no_id in index
+        assert dict(no_id, body='Other') not in index
+        assert '' not in index
+
+        reopened = DedupeIndex(db_filename)
+        assert len(reopened) == 3
+        assert '<a@example.com>' in reopened
+
+        # Keys recorded by another process are seen, emails without a Message-ID included
+        other_no_id = dict(no_id, body='Another')
+        reopened.add_many(['<c@example.com>', other_no_id])
+        assert '<c@example.com>' in index and other_no_id in index
+        assert len(index) == 5
+
+        reopened.clear()
+        assert '<a@example.com>' not in reopened
+        assert len(index) == 0
+    print("✅ Dedupe index persisted and cleared")
+
+
+def test_lookups_from_several_threads():
+    """One index answers lookups from the fetch and extraction threads alike."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = DedupeIndex(os.path.join(tmp_dir, 'jobs.db'))
+        index.add_many(['<a@example.com>'])
+        assert '<a@example.com>' in index
+
+        results, errors = [], []
+
+        def lookup():
+            try:
+                results.append('<a@example.com>' in index and '<b@example.com>' not in index)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=lookup) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors and results == [True, True]
+
+
+def test_job_store_seeds_and_updates_index():
+    """Saving jobs records them in the index; clearing the store clears it."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = ExcelManager(os.path.join(tmp_dir, 'jobs.xlsx'))
+        manager.save_job_data([{'message_id': '<job@example.com>', 'job_title': 'Developer'}])
+        assert '<job@example.com>' in manager.dedupe_index
+        assert manager.is_email_processed('<job@example.com>')
+        manager.clear_data()
+        assert '<job@example.com>' not in manager.dedupe_index
+
+
+if __name__ == "__main__":
+    test_bloom_filter()
+    test_fingerprint_for_missing_message_id()
+    test_dedupe_index_persists()
+    test_lookups_from_several_threads()
+    test_job_store_seeds_and_updates_index()
@@ -96,9 +96,10 @@ def test_deduplication_system():
     
     # Clean up test file
     import os
-    if os.path.exists("test_jobs.xlsx"):
-        os.remove("test_jobs.xlsx")
-        print("🧹 Test file cleaned up")
+    for filename in ("test_jobs.xlsx", excel_manager.db_filename):
+        if os.path.exists(filename):
+            os.remove(filename)
+    print("🧹 Test files cleaned up")
 
 def test_email_client_deduplication():
     """Test EmailClient with deduplication."""
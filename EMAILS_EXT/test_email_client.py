@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Test script for EmailClient's batched IMAP fetching.
+Uses a fake IMAP connection that answers like imaplib, so no mail server is needed.
+"""
+
+import base64
+import email
+import os
+import re
+import tempfile
+from datetime import datetime
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from config import Config
+from email_client import EmailClient
+from sync_state import SyncState
+
+
+def make_message(num: int) -> bytes:
+    """Build a minimal RFC822 message."""
+    return (
+        f"Message-ID: <msg{num}@example.com>\r\n"
+        f"From: recruiter{num}@example.com\r\n"
+        f"Subject: Job opening {num}\r\n"
+        f"Date: Mon, 15 Jan 2024 10:00:00 +0000\r\n"
+        f"\r\n"
+        f"Python developer role number {num}.\r\n"
+    ).encode()
+
+
+def make_resume_message(num: int, attachment_size: int = 500_000) -> bytes:
+    """Build a recruiter email with text and HTML alternatives and a large PDF attachment."""
+    message = MIMEMultipart('mixed')
+    message['Message-ID'] = f'<resume{num}@example.com>'
+    message['From'] = 'recruiter@example.com'
+    message['Subject'] = 'Candidate for the Data Engineer role'
+    message['Date'] = 'Mon, 15 Jan 2024 10:00:00 +0000'
+    alternative = MIMEMultipart('alternative')
+    alternative.attach(MIMEText('Data Engineer – Spark, Airflow. Salary €90k.', 'plain', 'utf-8'))
+    alternative.attach(MIMEText('<p>Data Engineer</p>', 'html', 'utf-8'))
+    message.attach(alternative)
+    pdf = MIMEApplication(os.urandom(attachment_size), 'pdf')
+    pdf.add_header('Content-Disposition', 'attachment', filename='resume.pdf')
+    message.attach(pdf)
+    return message.as_bytes()
+
+
+def bodystructure(message) -> str:
+    """Render a message's MIME structure the way an IMAP server reports BODYSTRUCTURE."""
+    if message.is_multipart():
+        children = ''.join(bodystructure(part) for part in message.get_payload())
+        return f'({children} "{message.get_content_subtype().upper()}" NIL NIL NIL)'
+    payload = message.get_payload()
+    disposition = message.get_content_disposition()
+    fields = [f'"{message.get_content_maintype().upper()}"', f'"{message.get_content_subtype().upper()}"',
+              f'("CHARSET" "{message.get_content_charset() or "us-ascii"}")', 'NIL', 'NIL',
+              f'"{(message.get("Content-Transfer-Encoding") or "7bit").upper()}"', str(len(payload))]
+    if message.get_content_maintype() == 'text':
+        fields.append(str(payload.count('\n')))
+    fields += ['NIL', f'("{disposition.upper()}" NIL)' if disposition else 'NIL', 'NIL', 'NIL']
+    return f'({" ".join(fields)})'
+
+
+def body_section(message, section: str) -> bytes:
+    """Raw (still transfer-encoded) content of a BODY[<section>]."""
+    part = message
+    for index in section.split('.'):
+        if part.is_multipart():
+            part = part.get_payload()[int(index) - 1]
+    return part.get_payload().encode()
+
+
+class FakeIMAP:
+    """Answers SEARCH/FETCH/STORE (and their UID forms) like imaplib.IMAP4, recording every command.
+
+    Message number n has UID n + UID_OFFSET.
+    """
+
+    UID_OFFSET = 100
+
+    def __init__(self, count: int, uidvalidity: int = 7):
+        self.messages = {num: make_message(num) for num in range(1, count + 1)}
+        self.uidvalidity = uidvalidity
+        self.commands = []
+        # False: answer like a server whose BODYSTRUCTURE can't be parsed
+        self.report_structure = True
+
+    def add_message(self):
+        num = len(self.messages) + 1
+        self.messages[num] = make_message(num)
+
+    def select(self, mailbox='INBOX'):
+        return 'OK', [str(len(self.messages)).encode()]
+
+    def response(self, code):
+        return code, [str(self.uidvalidity).encode()]
+
+    def search(self, charset, *criteria):
+        self.commands.append(('SEARCH',) + criteria)
+        numbers = ' '.join(str(num) for num in sorted(self.messages))
+        return 'OK', [numbers.encode()]
+
+    def _expand(self, message_set: str):
+        for part in message_set.split(','):
+            if ':' in part:
+                start, end = part.split(':')
+                yield from range(int(start), int(end) + 1)
+            else:
+                yield int(part)
+
+    def fetch(self, message_set, query, by_uid=False):
+        self.commands.append(('UID FETCH' if by_uid else 'FETCH', message_set, query))
+        data = []
+        for key in self._expand(message_set):
+            num = key - self.UID_OFFSET if by_uid else key
+            body = self.messages[num]
+            uid_item = f"UID {num + self.UID_OFFSET} " if by_uid else ""
+            section = re.search(r'BODY\.PEEK\[([\d.]+)\](?:<0\.(\d+)>)?', query)
+            if 'HEADER.FIELDS' in query:
+                headers = re.split(rb'\r?\n\r?\n', body, maxsplit=1)[0] + b'\r\n\r\n'
+                structure = f"BODYSTRUCTURE {bodystructure(email.message_from_bytes(body))} " \
+                    if 'BODYSTRUCTURE' in query and self.report_structure else ""
+                item = (f"{num} ({uid_item}RFC822.SIZE {len(body)} {structure}"
+                        f"BODY[HEADER.FIELDS (MESSAGE-ID DATE FROM SUBJECT)] {{{len(headers)}}}")
+                data.append((item.encode(), headers))
+            elif section:
+                payload = body_section(email.message_from_bytes(body), section.group(1))
+                origin = ""
+                if section.group(2):
+                    payload, origin = payload[:int(section.group(2))], "<0>"
+                data.append((f"{num} ({uid_item}BODY[{section.group(1)}]{origin} {{{len(payload)}}}".encode(),
+                             payload))
+            elif 'BODY.PEEK[]' in query:
+                data.append((f"{num} ({uid_item}BODY[] {{{len(body)}}}".encode(), body))
+            else:
+                data.append((f"{num} ({uid_item}RFC822 {{{len(body)}}}".encode(), body))
+            data.append(b')')
+        # Unsolicited flag update, which must be ignored
+        data.append(b'99 (FLAGS (\\Seen))')
+        return 'OK', data
+
+    def store(self, message_set, command, flags, by_uid=False):
+        self.commands.append(('UID STORE' if by_uid else 'STORE', message_set))
+        return 'OK', []
+
+    def uid(self, command, *args):
+        if command == 'SEARCH':
+            uids = [num + self.UID_OFFSET for num in sorted(self.messages)]
+            criteria = args[1]
+            if criteria.startswith('UID '):
+                start = int(criteria[4:].split(':')[0])
+                # Like real servers, "n:*" always includes the highest UID
+                uids = [uid for uid in uids if uid >= start] or uids[-1:]
+            return 'OK', [' '.join(str(uid) for uid in uids).encode()]
+        if command == 'FETCH':
+            return self.fetch(*args, by_uid=True)
+        if command == 'STORE':
+            return self.store(*args, by_uid=True)
+        raise ValueError(command)
+
+
+def make_client(count: int) -> EmailClient:
+    client = EmailClient(imap_server='imap.example.com', email_address='me@example.com', password='x')
+    client.connection = FakeIMAP(count)
+    return client
+
+
+def test_build_message_set():
+    """Runs of consecutive numbers collapse into ranges."""
+    print("🧪 Testing message-set compression")
+    assert EmailClient._build_message_set(['1', '2', '3', '7', '9', '10']) == '1:3,7,9:10'
+    assert EmailClient._build_message_set([b'5']) == '5'
+    assert EmailClient._build_message_set(['4', '2', '3']) == '2:4'
+    print("✅ Message sets compressed correctly")
+
+
+def test_batched_fetch():
+    """Unread emails are fetched with one FETCH per chunk and come back in order."""
+    print("🧪 Testing batched FETCH")
+    original_chunk_size = Config.IMAP_FETCH_CHUNK_SIZE
+    Config.IMAP_FETCH_CHUNK_SIZE = 4
+    try:
+        client = make_client(10)
+        emails = client.fetch_unread_emails(skip_processed_ids={'<msg3@example.com>'})
+
+        fetches = [command[1] for command in client.connection.commands
+                   if command[0] == 'FETCH' and command[2] == '(BODY.PEEK[1])']
+        assert fetches == ['1:2,4:5', '6:9', '10'], fetches
+        assert [e['message_number'] for e in emails] == ['1', '2', '4', '5', '6', '7', '8', '9', '10']
+        assert all(re.match(r'Job opening \d+', e['subject']) for e in emails)
+
+        client.mark_emails_as_read(emails)
+        stores = [command[1] for command in client.connection.commands if command[0] == 'STORE']
+        assert stores == ['1:2,4:5', '6:9', '10'], stores
+    finally:
+        Config.IMAP_FETCH_CHUNK_SIZE = original_chunk_size
+    print(f"✅ Fetched {len(emails)} emails in {len(fetches)} FETCH commands")
+
+
+def test_header_first_dedupe():
+    """Already processed emails are dropped by their headers, before their bodies are downloaded."""
+    print("🧪 Testing header-first dedupe")
+    client = make_client(5)
+    processed = {'<msg1@example.com>', '<msg2@example.com>', '<msg4@example.com>'}
+    emails = client.fetch_unread_emails(skip_processed_ids=processed)
+
+    assert [e['message_id'] for e in emails] == ['<msg3@example.com>', '<msg5@example.com>']
+    # One header round trip: BODYSTRUCTURE comes with the dedupe pass, not in a second fetch
+    header_fetches = [command for command in client.connection.commands
+                      if command[0] == 'FETCH' and 'HEADER.FIELDS' in command[2]]
+    assert len(header_fetches) == 1 and 'BODYSTRUCTURE' in header_fetches[0][2], header_fetches
+    body_fetches = [command[1] for command in client.connection.commands
+                    if command[0] == 'FETCH' and command[2] == '(BODY.PEEK[1])']
+    assert body_fetches == ['3,5'], body_fetches
+
+    stats = client.last_fetch_stats
+    skipped_size = sum(len(client.connection.messages[num]) for num in (1, 2, 4))
+    assert stats['skipped'] == 3
+    assert stats['bytes_saved'] == skipped_size
+    assert stats['body_bytes'] == sum(len(client.connection.messages[num].split(b'\r\n\r\n', 1)[1])
+                                      for num in (3, 5))
+    print(f"✅ Skipped {stats['skipped']} emails, saved {stats['bytes_saved']} bytes "
+          f"for {stats['header_bytes']} bytes of headers")
+
+
+def test_split_header_response_trailing_size():
+    """RFC822.SIZE sent after the header literal is still picked up."""
+    msg_data = [(b'7 (BODY[HEADER.FIELDS (MESSAGE-ID)] {30}', b'Message-ID: <a@example.com>\r\n\r\n'),
+                b' RFC822.SIZE 4096)']
+    headers = EmailClient._split_header_response(msg_data)
+    assert headers['7'][1] == 4096
+
+
+def test_incremental_uid_sync():
+    """Only UIDs above the committed mark are fetched; a UIDVALIDITY change triggers a resync."""
+    print("🧪 Testing incremental UID sync")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state = SyncState(os.path.join(tmp_dir, 'sync_state.json'))
+        client = make_client(3)
+
+        first = client.fetch_new_emails(sync_state=state)
+        assert [e['uid'] for e in first] == ['101', '102', '103']
+        # Nothing is persisted until the results are committed
+        assert client.fetch_new_emails(sync_state=state)
+        assert client.commit_sync_state(state)
+
+        assert client.fetch_new_emails(sync_state=state) == []
+        client.commit_sync_state(state)
+
+        client.connection.add_message()
+        second = client.fetch_new_emails(sync_state=state)
+        assert [e['uid'] for e in second] == ['104']
+        client.commit_sync_state(state)
+
+        client.mark_emails_as_read(second)
+        assert client.connection.commands[-1] == ('UID STORE', '104')
+
+        # Mailbox recreated on the server: UIDs are no longer comparable
+        client.connection.uidvalidity = 8
+        resync = client.fetch_new_emails(max_emails=2, sync_state=state)
+        assert [e['uid'] for e in resync] == ['103', '104']
+        client.commit_sync_state(state)
+        key = SyncState.mailbox_key('me@example.com', 'imap.example.com', 'INBOX')
+        assert state.get(key) == {'uidvalidity': 8, 'last_uid': 104}
+    print("✅ Incremental sync fetched only new UIDs")
+
+
+def test_failing_uid_does_not_block_sync():
+    """A UID that can't be fetched is retried, then skipped after SYNC_MAX_UID_FAILURES runs."""
+    print("🧪 Testing sync past a failing UID")
+    original = (Config.IMAP_FETCH_CHUNK_SIZE, Config.SYNC_MAX_UID_FAILURES)
+    Config.IMAP_FETCH_CHUNK_SIZE, Config.SYNC_MAX_UID_FAILURES = 1, 3
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state = SyncState(os.path.join(tmp_dir, 'sync_state.json'))
+            key = SyncState.mailbox_key('me@example.com', 'imap.example.com', 'INBOX')
+            client = make_client(3)
+            fetch = client.connection.fetch
+
+            def failing_fetch(message_set, query, by_uid=False):
+                if message_set == '102':
+                    raise OSError("connection reset")
+                return fetch(message_set, query, by_uid)
+            client.connection.fetch = failing_fetch
+
+            for attempt in (1, 2):
+                emails = client.fetch_new_emails(sync_state=state)
+                assert [e['uid'] for e in emails] == (['101', '103'] if attempt == 1 else ['103'])
+                client.commit_sync_state(state)
+                assert state.get(key) == {'uidvalidity': 7, 'last_uid': 101, 'failures': {'102': attempt}}
+
+            assert [e['uid'] for e in client.fetch_new_emails(sync_state=state)] == ['103']
+            client.commit_sync_state(state)
+            assert state.get(key) == {'uidvalidity': 7, 'last_uid': 103}
+    finally:
+        Config.IMAP_FETCH_CHUNK_SIZE, Config.SYNC_MAX_UID_FAILURES = original
+    print("✅ Failing UID skipped after retries")
+
+
+def test_search_path_counts_late_dedupe_hits():
+    """Emails only recognised as processed after their body was fetched still count as skipped."""
+    client = make_client(3)
+    fetched_ids = set()
+
+    class ProcessedAfterHeaders(set):
+        """Misses in the header pass, hits once the message was fetched (e.g. saved by another run)."""
+
+        def __contains__(self, message_id):
+            seen = message_id in fetched_ids
+            fetched_ids.add(message_id)
+            return seen
+
+    emails = list(client.iter_search_emails('ALL', skip_processed_ids=ProcessedAfterHeaders({'x'})))
+    assert emails == []
+    assert client.last_fetch_stats['skipped'] == 3
+
+
+def test_build_search_query():
+    """Filter options compile into one IMAP SEARCH query."""
+    print("🧪 Testing IMAP SEARCH query builder")
+    assert EmailClient.build_search_query() == 'ALL'
+    query = EmailClient.build_search_query(
+        seen=True, since=datetime(2024, 1, 5), before=datetime(2024, 2, 1), sender='@company.com',
+        subject_keywords=['job', 'hiring', 'say "hi"'], min_size=1024, max_size=2048, has_attachment=True)
+    assert query == ('(SEEN SINCE "05-Jan-2024" BEFORE "01-Feb-2024" FROM "@company.com" '
+                     'OR SUBJECT "job" OR SUBJECT "hiring" SUBJECT "say \\"hi\\"" '
+                     'LARGER 1023 SMALLER 2049 HEADER Content-Type "multipart/mixed")'), query
+
+    # Non-ASCII text is left to local filtering
+    assert EmailClient.build_search_query(sender='josé@example.com', subject_keywords=['emploi', 'café']) == 'ALL'
+    assert EmailClient.build_search_query(seen=False, has_attachment=False) == \
+        '(UNSEEN NOT HEADER Content-Type "multipart/mixed")'
+    print("✅ Queries built")
+
+
+def test_filters_sent_to_server():
+    """Unread extraction sends its filters in the SEARCH command."""
+    client = make_client(2)
+    emails = list(client.iter_unread_emails(filters={'sender': 'recruiter', 'min_size': 100}))
+    assert len(emails) == 2 and emails[0]['message_number'] == '1'
+    assert ('SEARCH', '(UNSEEN FROM "recruiter" LARGER 99)') in client.connection.commands
+
+
+def test_text_part_fetch():
+    """Only the text/plain part of a message with a large attachment is downloaded."""
+    print("🧪 Testing BODYSTRUCTURE text-part fetch")
+    client = make_client(2)
+    client.connection.messages[2] = make_resume_message(2)
+    emails = client.fetch_unread_emails()
+
+    assert [e['body'] for e in emails] == ['Python developer role number 1.',
+                                           'Data Engineer – Spark, Airflow. Salary €90k.']
+    queries = [command[2] for command in client.connection.commands if command[0] == 'FETCH']
+    assert '(BODY.PEEK[1.1])' in queries and '(RFC822)' not in queries, queries
+
+    stats = client.last_fetch_stats
+    assert stats['body_bytes'] < 1000
+    assert stats['parts_saved'] > 500_000
+    print(f"✅ Fetched {stats['body_bytes']} bytes of text, left {stats['parts_saved']} bytes on the server")
+
+
+def test_html_fallback_and_byte_cap():
+    """HTML-only mail is converted to text; the byte cap becomes a partial fetch."""
+    print("🧪 Testing HTML fallback and partial fetch")
+    html = MIMEText('<html><body><p>Hiring a Backend Engineer in Berlin</p></body></html>', 'html')
+    html['Message-ID'] = '<html1@example.com>'
+    original_cap = Config.IMAP_BODY_MAX_BYTES
+    Config.IMAP_BODY_MAX_BYTES = 40
+    try:
+        client = make_client(1)
+        client.connection.messages[1] = html.as_bytes()
+        emails = client.fetch_unread_emails()
+    finally:
+        Config.IMAP_BODY_MAX_BYTES = original_cap
+
+    assert ('FETCH', '1', '(BODY.PEEK[1]<0.40>)') in client.connection.commands
+    assert emails[0]['body'].startswith('Hiring a Backend') and '<' not in emails[0]['body']
+    print("✅ HTML converted from a capped fetch")
+
+
+def test_parse_bodystructure():
+    """Gmail-style BODYSTRUCTURE parses; literals inside it are refused so the message is fetched whole."""
+    item = (b'1 (UID 5 RFC822.SIZE 9000 BODYSTRUCTURE ((("TEXT" "PLAIN" ("CHARSET" "UTF-8") NIL NIL '
+            b'"BASE64" 120 2 NIL NIL NIL)("TEXT" "HTML" ("CHARSET" "UTF-8") NIL NIL "QUOTED-PRINTABLE" 300 6 '
+            b'NIL NIL NIL) "ALTERNATIVE" ("BOUNDARY" "b1") NIL NIL)("APPLICATION" "PDF" ("NAME" "cv \\"1\\".pdf") '
+            b'NIL NIL "BASE64" 8000 NIL ("ATTACHMENT" ("FILENAME" "cv.pdf")) NIL) "MIXED" ("BOUNDARY" "b0") NIL NIL) '
+            b'BODY[HEADER.FIELDS (SUBJECT)] {20}')
+    structure = EmailClient._parse_bodystructure(item)
+    assert structure[1][2] == ['NAME', 'cv "1".pdf']
+    assert EmailClient._find_text_part(structure) == {
+        'section': '1.1', 'subtype': 'plain', 'charset': 'UTF-8', 'encoding': 'base64'}
+    assert EmailClient._parse_bodystructure(b'1 (BODYSTRUCTURE ("TEXT" "PLAIN" {5}') is None
+
+    assert EmailClient._decode_part(base64.b64encode('Gehalt: 90.000 €'.encode()), 'base64', 'utf-8') == \
+        'Gehalt: 90.000 €'
+    # A capped base64 fetch ending mid-quantum still decodes
+    assert EmailClient._decode_part(base64.b64encode(b'Python developer')[:10], 'base64', 'utf-8') == 'Python'
+
+
+def test_unreadable_structure_fetched_without_marking_read():
+    """Messages whose BODYSTRUCTURE can't be read are fetched whole with PEEK, not RFC822."""
+    client = make_client(2)
+    client.connection.report_structure = False
+    emails = client.fetch_unread_emails()
+    assert [e['body'] for e in emails] == ['Python developer role number 1.', 'Python developer role number 2.']
+    assert ('FETCH', '1:2', '(BODY.PEEK[])') in client.connection.commands
+    assert not any(command[0] == 'FETCH' and command[2] == '(RFC822)' for command in client.connection.commands)
+
+
+def test_full_message_fetch_option():
+    """With the text-part fetch switched off, whole messages are fetched as before."""
+    original = Config.IMAP_TEXT_PART_FETCH
+    Config.IMAP_TEXT_PART_FETCH = False
+    try:
+        client = make_client(2)
+        emails = client.fetch_unread_emails()
+    finally:
+        Config.IMAP_TEXT_PART_FETCH = original
+    assert [e['message_number'] for e in emails] == ['1', '2']
+    assert ('FETCH', '1:2', '(RFC822)') in client.connection.commands
+
+
+if __name__ == "__main__":
+    test_build_message_set()
+    test_batched_fetch()
+    test_header_first_dedupe()
+    test_split_header_response_trailing_size()
+    test_incremental_uid_sync()
+    test_failing_uid_does_not_block_sync()
+    test_search_path_counts_late_dedupe_hits()
+    test_build_search_query()
+    test_filters_sent_to_server()
+    test_text_part_fetch()
+    test_html_fallback_and_byte_cap()
+    test_unreadable_structure_fetched_without_marking_read()
+    test_parse_bodystructure()
+    test_full_message_fetch_option()
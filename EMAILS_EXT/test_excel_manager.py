@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite-backed job store behind ExcelManager.
+Covers append-only saves, Message-ID deduplication and the one-time Excel migration.
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from excel_manager import ExcelManager
+
+
+def make_job(message_id: str, title: str) -> dict:
+    return {
+        'message_id': message_id,
+        'job_title': title,
+        'company_name': 'TechCorp',
+        'required_skills': ['Python', 'AWS'],
+        'raw_email': f"Body of {title}",
+    }
+
+
+def test_save_deduplicates_by_message_id():
+    """Saving the same Message-ID twice keeps one row; emails without one are all kept."""
+    print("🧪 Testing job store deduplication")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = ExcelManager(os.path.join(tmp_dir, 'jobs.xlsx'))
+
+        assert manager.save_job_data([make_job('<a@example.com>', 'Developer'),
+                                      make_job('<b@example.com>', 'Analyst')])
+        assert manager.save_job_data([make_job('<a@example.com>', 'Developer (again)'),
+                                      make_job('', 'No ID 1'), make_job('', 'No ID 2')])
+
+        df = manager.load_existing_data()
+        assert list(df['Job_Title']) == ['Developer', 'Analyst', 'No ID 1', 'No ID 2']
+        assert df.loc[0, 'Required_Skills'] == 'Python, AWS'
+        assert manager.get_processed_message_ids() == {'<a@example.com>', '<b@example.com>'}
+        assert manager.is_email_processed('<b@example.com>')
+        assert not manager.is_email_processed('')
+
+        stats = manager.get_statistics()
+        assert stats['total_records'] == 4
+        assert stats['companies'] == ['TechCorp']
+        # Excel is only written on export
+        assert not os.path.exists(manager.filename)
+        assert manager.export_to_excel()
+        assert len(pd.read_excel(manager.filename)) == 4
+    print("✅ Duplicates skipped, rows appended in order")
+
+
+def test_migrates_existing_workbook_once():
+    """An existing workbook is imported on first use and not re-imported afterwards."""
+    print("🧪 Testing Excel migration")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'jobs.xlsx')
+        pd.DataFrame([
+            {'Message_ID': '<old1@example.com>', 'Job_Title': 'Old Job', 'Company_Name': 'OldCorp'},
+            {'Message_ID': '<old2@example.com>', 'Job_Title': 'Older Job'},
+        ]).to_excel(filename, index=False, engine='openpyxl')
+
+        manager = ExcelManager(filename)
+        assert manager.get_statistics()['total_records'] == 2
+        assert manager.is_email_processed('<old1@example.com>')
+
+        manager.save_job_data([make_job('<new@example.com>', 'New Job')])
+        assert ExcelManager(filename).get_statistics()['total_records'] == 3
+
+        assert manager.clear_data()
+        assert ExcelManager(filename).get_statistics()['total_records'] == 0
+    print("✅ Workbook migrated once")
+
+
+def test_table_cache_tracks_store_version():
+    """Reads reuse the cached table until the store changes; saves update it in place."""
+    print("🧪 Testing job table cache")
+    reads = []
+    original_read_rows = ExcelManager._read_rows
+
+    def counting_read_rows(self, conn, after_id=0):
+        reads.append(after_id)
+        return original_read_rows(self, conn, after_id)
+
+    ExcelManager._read_rows = counting_read_rows
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'jobs.xlsx')
+            manager = ExcelManager(filename)
+            manager.save_job_data([make_job('<a@example.com>', 'Developer')])
+
+            # Repeated reads, also from a new manager (as on a Streamlit rerun), hit the cache
+            manager.get_statistics()
+            ExcelManager(filename).load_existing_data()
+            manager.get_processed_message_ids()
+            assert reads == [0], reads
+
+            # A save reads back only the new rows
+            manager.save_job_data([make_job('<b@example.com>', 'Analyst')])
+            assert reads == [0, 1], reads
+            assert manager.get_statistics()['total_records'] == 2
+            assert list(manager.load_existing_data()['Job_Title']) == ['Developer', 'Analyst']
+            assert reads == [0, 1], reads
+
+            # A write from another process invalidates the cache
+            with manager._connect() as conn:
+                conn.execute('INSERT INTO jobs ("Message_ID", "Job_Title") VALUES (?, ?)',
+                             ('<c@example.com>', 'Designer'))
+                ExcelManager._bump_version(conn)
+            assert '<c@example.com>' in manager.get_processed_message_ids()
+            assert reads == [0, 1, 0], reads
+
+            # So does clearing the store
+            manager.clear_data()
+            assert manager.get_statistics()['total_records'] == 0
+    finally:
+        ExcelManager._read_rows = original_read_rows
+    print("✅ Cache reused until the store version changed")
+
+
+def test_column_projection_and_dtypes():
+    """Projected reads return just the asked-for columns; low-cardinality columns are categoricals."""
+    print("🧪 Testing projected job table reads")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = ExcelManager(os.path.join(tmp_dir, 'jobs.xlsx'))
+        jobs = [dict(make_job(f'<{i}@example.com>', f'Developer {i}'), job_type='Full-time',
+                     company_name='TechCorp' if i % 2 else 'Initech') for i in range(6)]
+        assert manager.save_job_data(jobs)
+
+        df = manager.load_existing_data(columns=['Company_Name', 'Job_Title'])
+        assert list(df.columns) == ['Company_Name', 'Job_Title'] and len(df) == 6
+        assert isinstance(df['Company_Name'].dtype, pd.CategoricalDtype)
+        assert sorted(df['Company_Name'].cat.categories) == ['Initech', 'TechCorp']
+        # The full table keeps categoricals after rows are appended to the cache
+        manager.save_job_data([make_job('<new@example.com>', 'Analyst')])
+        assert isinstance(manager.load_existing_data()['Job_Type'].dtype, pd.CategoricalDtype)
+
+        found = manager.search_jobs({'Company_Name': 'tech', 'Job_Title': ['developer 1', 'developer 3']},
+                                    columns=['Message_ID'])
+        assert list(found.columns) == ['Message_ID']
+        assert list(found['Message_ID']) == ['<1@example.com>', '<3@example.com>']
+        assert len(manager.search_jobs({'Company_Name': 'TechCorp'})) == 4
+
+        assert manager.load_existing_data(columns=['No_Such_Column']).empty
+    print("✅ Projection and categoricals work")
+
+
+def test_stats_read_only_stats_columns():
+    """get_statistics on a cold cache reads four columns, not the whole table."""
+    queries = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'jobs.xlsx')
+        ExcelManager(filename).save_job_data([make_job('<a@example.com>', 'Developer')])
+        # Another process wrote: the cached table is stale
+        manager = ExcelManager(filename)
+        with manager._connect() as conn:
+            ExcelManager._bump_version(conn)
+
+        original_read_sql = pd.read_sql_query
+
+        def recording_read_sql(sql, *args, **kwargs):
+            queries.append(sql)
+            return original_read_sql(sql, *args, **kwargs)
+
+        pd.read_sql_query = recording_read_sql
+        try:
+            stats = manager.get_statistics()
+        finally:
+            pd.read_sql_query = original_read_sql
+    assert stats['companies'] == ['TechCorp']
+    assert queries == ['SELECT "Company_Name", "Job_Type", "Industry", "Location" FROM jobs ORDER BY id'], queries
+
+
+def test_streaming_workbook_reader():
+    """Workbook rows stream with only the wanted columns, skipping empty rows."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'jobs.xlsx')
+        pd.DataFrame([
+            {'Message_ID': '<a@example.com>', 'Job_Title': 'Developer', 'Notes': 'extra'},
+            {'Message_ID': None, 'Job_Title': None, 'Notes': 'only extra'},
+            {'Message_ID': '<b@example.com>', 'Job_Title': 'Analyst', 'Notes': None},
+        ]).to_excel(filename, index=False, engine='openpyxl')
+        records = list(ExcelManager.iter_excel_records(filename, ['Message_ID', 'Job_Title']))
+    assert records == [{'Message_ID': '<a@example.com>', 'Job_Title': 'Developer'},
+                       {'Message_ID': '<b@example.com>', 'Job_Title': 'Analyst'}]
+
+
+if __name__ == "__main__":
+    test_save_deduplicates_by_message_id()
+    test_migrates_existing_workbook_once()
+    test_table_cache_tracks_store_version()
+    test_column_projection_and_dtypes()
+    test_stats_read_only_stats_columns()
+    test_streaming_workbook_reader()
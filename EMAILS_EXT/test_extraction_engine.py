@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the extraction engine and the prefetching fetch pipeline.
+Uses a stub processor so no NLP models are needed.
+"""
+
+import threading
+import time
+
+from extraction_engine import ExtractionEngine, prefetch
+
+
+class StubProcessor:
+    """Stands in for TextProcessor: echoes each text back as its job title."""
+
+    def __init__(self):
+        self.calls = []
+
+    def extract_many(self, texts):
+        self.calls.append(list(texts))
+        return [{'job_title': text} for text in texts]
+
+
+def test_in_process_engine_keeps_order():
+    """Results stream back in input order, in chunks of chunk_size."""
+    print("🧪 Testing in-process extraction engine")
+    processor = StubProcessor()
+    engine = ExtractionEngine(workers=0, chunk_size=3, text_processor=processor)
+
+    texts = [f"email {i}" for i in range(10)]
+    progress = []
+    results = engine.extract_many(texts, progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert [r['job_title'] for r in results] == texts
+    assert [len(chunk) for chunk in processor.calls] == [3, 3, 3, 1]
+    assert progress[-1] == (10, 10)
+    assert not engine.uses_pool
+    print("✅ In-process engine returned results in order")
+
+
+class FailingProcessor(StubProcessor):
+    """Raises on any batch containing a text with 'bad' in it."""
+
+    def extract_many(self, texts):
+        if any('bad' in text for text in texts):
+            raise ValueError("cannot parse")
+        return super().extract_many(texts)
+
+
+def test_failed_email_does_not_abort_run():
+    """A failing chunk is retried email by email; only the bad email gets an error result."""
+    print("🧪 Testing extraction failure isolation")
+    processor = FailingProcessor()
+    engine = ExtractionEngine(workers=0, chunk_size=3, text_processor=processor)
+
+    results = engine.extract_many(["email 0", "bad email", "email 2", "email 3"])
+    assert [r.get('job_title') for r in results] == ["email 0", None, "email 2", "email 3"]
+    assert results[1] == {'error': 'cannot parse'}
+    print("✅ One bad email isolated")
+
+
+def test_prefetch_overlaps_and_bounds_buffer():
+    """The producer runs ahead of the consumer, but never by more than maxsize items."""
+    print("🧪 Testing prefetch pipeline")
+    produced = []
+    lock = threading.Lock()
+
+    def producer():
+        for i in range(20):
+            with lock:
+                produced.append(i)
+            yield i
+
+    consumed = []
+    max_ahead = 0
+    for item in prefetch(producer(), maxsize=4):
+        time.sleep(0.005)
+        with lock:
+            max_ahead = max(max_ahead, len(produced) - len(consumed))
+        consumed.append(item)
+
+    assert consumed == list(range(20))
+    # maxsize queued items, plus one being handed over and one being produced
+    assert max_ahead <= 4 + 2, max_ahead
+    print(f"✅ Prefetch kept order; producer ran at most {max_ahead} items ahead")
+
+
+def test_prefetch_propagates_errors_and_stops_early():
+    """Producer errors reach the consumer; closing the consumer stops the producer."""
+    def failing():
+        yield 1
+        raise ValueError("fetch failed")
+
+    received = []
+    try:
+        for item in prefetch(failing(), maxsize=2):
+            received.append(item)
+        raise AssertionError("expected ValueError")
+    except ValueError as e:
+        assert str(e) == "fetch failed"
+    assert received == [1]
+
+    def endless():
+        i = 0
+        while True:
+            yield i
+            i += 1
+
+    feed = prefetch(endless(), maxsize=2)
+    assert next(feed) == 0
+    feed.close()  # must not hang
+    print("✅ Prefetch propagated errors and stopped on close")
+
+
+if __name__ == "__main__":
+    test_in_process_engine_keeps_order()
+    test_failed_email_does_not_abort_run()
+    test_prefetch_overlaps_and_bounds_buffer()
+    test_prefetch_propagates_errors_and_stops_early()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming HTML-to-text converter.
+Runs against every available backend.
+"""
+
+from html_text import LXML_AVAILABLE, html_to_text
+
+BACKENDS = ['stdlib'] + (['lxml'] if LXML_AVAILABLE else [])
+
+JOB_HTML = """<html><head><title>Job alert</title><style>p { color: red }</style></head>
+<body><script>document.write("<p>tracking</p>");</script>
+<div><p>We are hiring a <b>Senior   Python</b> Developer</p><p>Company: Acme&nbsp;Corp &amp; Co</p></div>
+<table><tr><td>Location</td><td>Seattle, WA</td></tr><tr><td>Salary</td><td>$120,000</td></tr></table>
+Apply by<br>December 31, 2024
+<ul><li>Python</li><li>SQL</li></ul></body></html>"""
+
+
+def test_line_structure():
+    """Blocks, rows and <br> become lines; script, style and head are dropped."""
+    print("🧪 Testing HTML-to-text line structure")
+    for backend in BACKENDS:
+        text = html_to_text(JOB_HTML, backend=backend)
+        assert text.splitlines() == [
+            'We are hiring a Senior Python Developer',
+            'Company: Acme Corp & Co',
+            'Location Seattle, WA',
+            'Salary $120,000',
+            'Apply by',
+            'December 31, 2024',
+            'Python',
+            'SQL',
+        ], (backend, text)
+    print(f"✅ Lines preserved ({', '.join(BACKENDS)})")
+
+
+def test_size_caps():
+    """Output stops at max_chars and input past max_input is never parsed."""
+    print("🧪 Testing HTML size caps")
+    huge = "<table>" + "<tr><td>Python Developer</td><td>Remote</td></tr>" * 100000 + "</table>"
+    for backend in BACKENDS:
+        assert len(html_to_text(huge, max_chars=500, backend=backend)) <= 500
+        assert html_to_text("<p>kept</p><p>dropped</p>", max_input=11, backend=backend) == 'kept'
+    print("✅ Caps enforced")
+
+
+def test_unclosed_head():
+    """A missing </head> doesn't swallow the body."""
+    for backend in BACKENDS:
+        assert html_to_text("<head><title>x</title><body>Hiring now", backend=backend) == 'Hiring now'
+
+
+if __name__ == "__main__":
+    test_line_structure()
+    test_size_caps()
+    test_unclosed_head()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the job email gate.
+Covers keyword scoring, training the hashed-feature model, and persistence.
+"""
+
+import os
+import tempfile
+import time
+
+from job_classifier import JobEmailClassifier, evaluate
+
+JOB_EMAILS = [
+    {'subject': 'Senior Python Developer position', 'sender': 'recruiter@techcorp.com',
+     'body': 'We are hiring a Senior Python Developer. Requirements: 5+ years experience.'},
+    {'subject': 'New jobs for you', 'sender': 'alerts@jobboard.com',
+     'body': 'Data Analyst openings in Chicago. Salary $90,000. Unsubscribe at any time.'},
+    {'subject': 'Opportunity at Acme', 'sender': 'talent@acme.io',
+     'body': 'Your profile matches our Backend Engineer role. Skills: Go, Kubernetes.'},
+    {'subject': 'Career opening: DevOps Engineer', 'sender': 'hr@initech.com',
+     'body': 'Join our team. Qualifications: AWS, Terraform. Compensation competitive.'},
+]
+
+NON_JOB_EMAILS = [
+    {'subject': 'Your order has shipped', 'sender': 'orders@shop.com',
+     'body': 'Your order #1234 is on its way. Track your delivery here.'},
+    {'subject': 'Monthly newsletter', 'sender': 'news@blog.com',
+     'body': 'This month in gardening: tomatoes and roses. Unsubscribe below.'},
+    {'subject': 'Payment receipt', 'sender': 'billing@utility.com',
+     'body': 'Thanks for your payment. Your receipt and statement are attached.'},
+    {'subject': 'Dinner on Friday?', 'sender': 'friend@example.com',
+     'body': 'Are you free on Friday? Let me know!'},
+]
+
+
+def test_keyword_gate():
+    """Without a model, job keywords pass and receipts, newsletters and personal mail don't."""
+    print("🧪 Testing keyword gate")
+    with tempfile.TemporaryDirectory() as tmp:
+        gate = JobEmailClassifier(os.path.join(tmp, 'model.json'))
+        assert not gate.is_trained
+        assert all(gate.is_job_email(email_data) for email_data in JOB_EMAILS)
+        assert not any(gate.is_job_email(email_data) for email_data in NON_JOB_EMAILS)
+
+        start = time.perf_counter()
+        for _ in range(100):
+            gate.is_job_email(JOB_EMAILS[0])
+        per_email_ms = (time.perf_counter() - start) * 10
+        assert per_email_ms < 5
+    print(f"✅ Keyword gate correct ({per_email_ms:.3f} ms/email)")
+
+
+def test_trained_model_roundtrip():
+    """The trained model separates the examples and survives save/load."""
+    print("🧪 Testing trained gate model")
+    emails = JOB_EMAILS + NON_JOB_EMAILS
+    labels = [1] * len(JOB_EMAILS) + [0] * len(NON_JOB_EMAILS)
+    with tempfile.TemporaryDirectory() as tmp:
+        model_file = os.path.join(tmp, 'model.json')
+        gate = JobEmailClassifier(model_file).train(emails, labels, epochs=20)
+        metrics = evaluate(gate, emails, labels)
+        assert metrics['recall'] == 1.0 and metrics['precision'] == 1.0
+        assert gate.save()
+
+        reloaded = JobEmailClassifier(model_file)
+        assert reloaded.is_trained
+        assert [reloaded.is_job_email(e) for e in emails] == [gate.is_job_email(e) for e in emails]
+    print("✅ Model trained and reloaded")
+
+
+if __name__ == "__main__":
+    test_keyword_gate()
+    test_trained_model_roundtrip()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the Aho-Corasick keyword matcher used by TextProcessor.
+Checks word-boundary matching and that every category is reported from one scan.
+"""
+
+from keyword_matcher import KeywordMatcher, AHOCORASICK_AVAILABLE
+from config import Config
+
+CATEGORIES = {
+    'skills': ['python', 'ai', 'machine learning', 'c++', 'c#', '.net', 'node.js'],
+    'job_types': {
+        'full-time': ['full time', 'full-time', 'permanent'],
+        'contract': ['contract', 'contractor'],
+        'temporary': ['temp', 'temporary'],
+    },
+    'seniority_levels': {
+        'mid-level': ['mid level', 'mid'],
+        'senior': ['senior', 'lead'],
+    },
+    'job_keywords': Config.JOB_KEYWORDS,
+}
+
+
+def check_matcher(matcher: KeywordMatcher):
+    """Run the shared assertions against one matcher backend."""
+    # Word boundaries: no hits inside larger words
+    hits = matcher.scan("We maintain templates amid the contractual mess")
+    assert hits['skills'] == [], hits
+    assert hits['job_types'] == [], hits
+    assert hits['seniority_levels'] == [], hits
+
+    # Keywords with punctuation at their edges
+    hits = matcher.scan("Stack: Python, C++, C# and ASP.NET with Node.js and Machine Learning (AI).")
+    assert hits['skills'] == ['python', 'ai', 'machine learning', 'c++', 'c#', '.net', 'node.js'], hits
+
+    # Plurals and version numbers are still matched
+    hits = matcher.scan("Python3 services and C++ contractors")
+    assert hits['skills'] == ['python', 'c++'], hits
+    assert hits['job_types'] == ['contract'], hits
+
+    # Labels come back in priority order, whatever the order in the text
+    hits = matcher.scan("Temporary contract, could become a permanent role for a senior or mid engineer")
+    assert hits['job_types'] == ['full-time', 'contract', 'temporary'], hits
+    assert hits['seniority_levels'] == ['mid-level', 'senior'], hits
+    assert hits['job_keywords'] == ['role'], hits
+
+    # Empty text returns every category with no hits
+    assert matcher.scan("") == {category: [] for category in CATEGORIES}
+
+
+def test_keyword_matcher():
+    """Test the pure-Python automaton and, if installed, the pyahocorasick backend."""
+    print("🧪 Testing Keyword Matcher")
+    print("=" * 40)
+
+    check_matcher(KeywordMatcher(CATEGORIES, use_native=False))
+    print("✅ Pure-Python automaton passed")
+
+    if AHOCORASICK_AVAILABLE:
+        check_matcher(KeywordMatcher(CATEGORIES))
+        print("✅ pyahocorasick automaton passed")
+    else:
+        print("⚠️  pyahocorasick not installed, native backend skipped")
+
+
+if __name__ == "__main__":
+    test_keyword_matcher()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared model service.
+Uses a stub TextProcessor so no NLP models are needed.
+"""
+
+import sys
+import types
+
+import model_service
+from model_service import ModelService
+
+
+class StubTextProcessor:
+    """Counts how often the model is loaded and used."""
+
+    instances = 0
+
+    def __init__(self):
+        StubTextProcessor.instances += 1
+        self.ner_pipeline = None
+        self.calls = 0
+
+    def extract_all_job_info(self, text, use_cache=True):
+        self.calls += 1
+        self.used_cache = use_cache
+        return {'job_title': 'Senior Python Developer'}
+
+
+def test_model_loaded_once_and_warmed_up():
+    """start() loads and warms up once; shutdown() releases the model for a fresh load."""
+    print("🧪 Testing shared model service")
+    real_module = sys.modules.get('text_processor')
+    sys.modules['text_processor'] = types.SimpleNamespace(TextProcessor=StubTextProcessor)
+    StubTextProcessor.instances = 0
+    try:
+        service = ModelService()
+        assert not service.is_loaded
+
+        first = service.start().text_processor
+        second = service.start().text_processor
+        assert first is second
+        assert StubTextProcessor.instances == 1
+        assert first.calls == 1  # warm-up
+        assert not first.used_cache  # the model must run, not a cached result
+
+        status = service.status()
+        assert status['loaded'] and not status['ner_available']
+        assert status['load_seconds'] is not None and status['warmup_seconds'] is not None
+
+        service.shutdown()
+        assert not service.is_loaded
+        assert service.start().text_processor is not first
+        assert StubTextProcessor.instances == 2
+        service.shutdown()
+    finally:
+        if real_module is not None:
+            sys.modules['text_processor'] = real_module
+        else:
+            del sys.modules['text_processor']
+    print("✅ Model loaded once per process")
+
+
+def test_process_memory_reading():
+    memory = model_service.process_memory_mb()
+    assert memory is None or memory > 0
+
+
+if __name__ == "__main__":
+    test_model_loaded_once_and_warmed_up()
+    test_process_memory_reading()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for sliding-window NER over long emails.
+Uses a stub whitespace tokenizer and a stub NER pipeline that tags
+capitalized words, so no model is needed.
+"""
+
+import re
+
+from config import Config
+from text_processor import TextProcessor
+
+# Keep test extractions out of the app's result cache
+Config.RESULT_CACHE_ENABLED = False
+
+
+class StubTokenizer:
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        return {'offset_mapping': [match.span() for match in re.finditer(r'\S+', text)]}
+
+
+class StubNerPipeline:
+    """Tags every capitalized word as ORG (LOC if it ends in 'ville'); records window sizes."""
+
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+        self.window_tokens = []
+
+    def _tag(self, text):
+        self.window_tokens.append(len(text.split()))
+        entities = []
+        for match in re.finditer(r'[A-Z][a-z]+', text):
+            group = 'LOC' if match.group().endswith('ville') else 'ORG'
+            entities.append({'entity_group': group, 'score': 0.99, 'word': match.group(),
+                             'start': match.start(), 'end': match.end()})
+        return entities
+
+    def __call__(self, texts, batch_size=None):
+        if isinstance(texts, str):
+            return self._tag(texts)
+        return [self._tag(text) for text in texts]
+
+
+def make_processor():
+    processor = TextProcessor()
+    processor.ner_pipeline = StubNerPipeline()
+    return processor
+
+
+def test_late_entities_found():
+    """Entities near the end of a long email are found, each once, in windows of bounded size."""
+    print("🧪 Testing windowed NER")
+    original = (Config.NER_WINDOW_TOKENS, Config.NER_WINDOW_STRIDE, Config.NER_MAX_DOC_TOKENS)
+    Config.NER_WINDOW_TOKENS, Config.NER_WINDOW_STRIDE, Config.NER_MAX_DOC_TOKENS = 50, 40, 10000
+    try:
+        processor = make_processor()
+        filler = ' '.join(['word'] * 400)
+        text = f"Initech is hiring. {filler} Apply at Globex in Springville. {filler} Contact Umbrella."
+
+        entities = processor.extract_entities_with_bert(text)
+        assert set(entities['ORG']) >= {'Initech', 'Globex', 'Umbrella'}
+        assert entities['LOC'] == ['Springville']
+        assert max(processor.ner_pipeline.window_tokens) <= 50
+
+        # Batched extraction merges the same way
+        assert processor.extract_entities_batch(['', text])[1] == entities
+    finally:
+        Config.NER_WINDOW_TOKENS, Config.NER_WINDOW_STRIDE, Config.NER_MAX_DOC_TOKENS = original
+    print("✅ Late entities found")
+
+
+def test_token_budget():
+    """Tokens past the per-document budget never reach the model."""
+    print("🧪 Testing NER token budget")
+    original = (Config.NER_WINDOW_TOKENS, Config.NER_WINDOW_STRIDE, Config.NER_MAX_DOC_TOKENS)
+    Config.NER_WINDOW_TOKENS, Config.NER_WINDOW_STRIDE, Config.NER_MAX_DOC_TOKENS = 50, 50, 100
+    try:
+        processor = make_processor()
+        text = "Initech " + ' '.join(['word'] * 1000) + " Umbrella"
+        entities = processor.extract_entities_with_bert(text)
+        assert entities['ORG'] == ['Initech']
+        assert sum(processor.ner_pipeline.window_tokens) == 100
+    finally:
+        Config.NER_WINDOW_TOKENS, Config.NER_WINDOW_STRIDE, Config.NER_MAX_DOC_TOKENS = original
+    print("✅ Budget respected")
+
+
+def test_tokenizer_failure_falls_back():
+    """A tokenizer that can't report offsets gives one whole-text window instead of an error."""
+    processor = make_processor()
+
+    def broken_tokenizer(*args, **kwargs):
+        raise NotImplementedError("return_offset_mapping is not available")
+    processor.ner_pipeline.tokenizer = broken_tokenizer
+
+    text = "Initech is hiring. " + ' '.join(['word'] * 400) + " Contact Umbrella."
+    assert processor._ner_windows(text) == [(0, len(text))]
+    assert set(processor.extract_entities_with_bert(text)['ORG']) == {'Initech', 'Contact', 'Umbrella'}
+
+
+def test_overlap_merge():
+    """Of overlapping spans from neighbouring windows, the longest wins."""
+    entities = [
+        {'entity_group': 'ORG', 'score': 0.9, 'word': 'Tech', 'start': 10, 'end': 14},
+        {'entity_group': 'ORG', 'score': 0.8, 'word': 'TechCorp', 'start': 10, 'end': 18},
+        {'entity_group': 'LOC', 'score': 0.9, 'word': 'Paris', 'start': 30, 'end': 35},
+        {'entity_group': 'LOC', 'score': 0.95, 'word': 'Paris', 'start': 30, 'end': 35},
+    ]
+    merged = TextProcessor._merge_window_entities(entities)
+    assert [(e['word'], e['score']) for e in merged] == [('TechCorp', 0.8), ('Paris', 0.95)]
+
+
+if __name__ == "__main__":
+    test_late_entities_found()
+    test_token_budget()
+    test_tokenizer_failure_falls_back()
+    test_overlap_merge()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the ONNX Runtime NER backend.
+Checks the "simple" entity aggregation without needing a model, and backend
+selection falling back when onnxruntime is missing.
+"""
+
+from config import Config
+from onnx_ner import OnnxNerPipeline, onnx_model_dir
+
+
+class StubTokenizer:
+    def __init__(self, vocab):
+        self.vocab = vocab
+
+    def decode(self, ids):
+        words = []
+        for token_id in ids:
+            token = self.vocab[token_id]
+            if token.startswith('##') and words:
+                words[-1] += token[2:]
+            else:
+                words.append(token)
+        return ' '.join(words)
+
+
+def token(label, score, token_id, start, end):
+    return {'label': label, 'score': score, 'id': token_id, 'start': start, 'end': end}
+
+
+def test_simple_aggregation():
+    """Adjacent tokens of one type form an entity; B- starts a new one; O is dropped."""
+    print("🧪 Testing ONNX NER aggregation")
+    vocab = {0: 'Tech', 1: '##Corp', 2: 'in', 3: 'San', 4: 'Francisco', 5: 'Acme'}
+    pipeline = OnnxNerPipeline.__new__(OnnxNerPipeline)
+    pipeline.tokenizer = StubTokenizer(vocab)
+
+    text = "TechCorp in San Francisco Acme"
+    tokens = [
+        token('B-ORG', 0.9, 0, 0, 4),
+        token('I-ORG', 0.7, 1, 4, 8),
+        token('O', 0.99, 2, 9, 11),
+        token('B-LOC', 0.95, 3, 12, 15),
+        token('I-LOC', 0.85, 4, 16, 25),
+        token('B-ORG', 0.8, 5, 26, 30),
+    ]
+    entities = pipeline._aggregate(tokens, text)
+
+    assert [(e['entity_group'], e['word'], e['start'], e['end']) for e in entities] == [
+        ('ORG', 'TechCorp', 0, 8),
+        ('LOC', 'San Francisco', 12, 25),
+        ('ORG', 'Acme', 26, 30),
+    ]
+    assert abs(entities[0]['score'] - 0.8) < 1e-9
+    print("✅ Aggregation matches the simple strategy")
+
+
+def test_model_dir_is_filesystem_safe():
+    path = onnx_model_dir("dslim/bert-base-NER", "models")
+    assert path.endswith("dslim_bert-base-NER")
+
+
+def test_onnx_backend_falls_back():
+    """Selecting ONNX without onnxruntime installed falls back and keeps TextProcessor working."""
+    import text_processor
+
+    original = (Config.USE_BERT, Config.NER_BACKEND,
+                text_processor.ONNXRUNTIME_AVAILABLE, text_processor.TRANSFORMERS_AVAILABLE)
+    Config.USE_BERT, Config.NER_BACKEND = True, 'onnx-int8'
+    text_processor.ONNXRUNTIME_AVAILABLE = text_processor.TRANSFORMERS_AVAILABLE = False
+    try:
+        processor = text_processor.TextProcessor()
+        assert processor.ner_pipeline is None and processor.ner_backend is None
+        assert processor.extract_all_job_info("Hiring a Python Developer")['cleaned_text']
+    finally:
+        (Config.USE_BERT, Config.NER_BACKEND,
+         text_processor.ONNXRUNTIME_AVAILABLE, text_processor.TRANSFORMERS_AVAILABLE) = original
+
+
+if __name__ == "__main__":
+    test_simple_aggregation()
+    test_model_dir_is_filesystem_safe()
+    test_onnx_backend_falls_back()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact email and job records.
+Checks they read like the dicts they replace and keep only one copy of the body.
+"""
+
+import email
+import os
+import tempfile
+
+from dedupe_index import DedupeIndex, dedupe_key
+from email_client import EmailClient
+from records import EmailRecord, JobRecord
+
+RAW = (b"Message-ID: <abc@example.com>\r\nFrom: hr@techcorp.com\r\nSubject: Python Developer\r\n"
+       b"Date: Mon, 15 Jan 2024 10:00:00 +0000\r\n\r\nWe are hiring a Python Developer.\r\n")
+
+
+def test_email_record():
+    """Fetched emails are slotted records without the parsed message."""
+    print("🧪 Testing EmailRecord")
+    record = EmailClient()._extract_email_data(email.message_from_bytes(RAW))
+    assert isinstance(record, EmailRecord) and not hasattr(record, '__dict__')
+    assert 'raw_message' not in record and 'uid' not in record
+    assert record['subject'] == 'Python Developer' and record.get('uid') is None
+
+    record['message_number'] = '7'
+    assert dict(record)['message_number'] == '7'
+    try:
+        record['raw_message'] = object()
+        assert False, "unknown field accepted"
+    except KeyError:
+        pass
+    print("✅ EmailRecord behaves like the old dict")
+
+
+def test_job_record():
+    """Job records take the email metadata, drop cleaned_text and share the email's body."""
+    print("🧪 Testing JobRecord")
+    email_data = EmailRecord(subject='Python Developer', sender='hr@techcorp.com', date='Mon, 15 Jan 2024',
+                             message_id='', body='We are hiring a Python Developer.')
+    job_info = {'job_title': 'Python Developer', 'required_skills': ['python'],
+                'cleaned_text': 'We are hiring a Python Developer.'}
+    job = JobRecord.from_extraction(job_info, email_data)
+
+    assert job['job_title'] == 'Python Developer' and job['email_date'] == 'Mon, 15 Jan 2024'
+    assert 'cleaned_text' not in job and job.get('company_name', 'N/A') == 'N/A'
+    assert job['raw_email'] is email_data['body']
+    # Emails without a Message-ID fingerprint the same from either record
+    assert dedupe_key(job) == dedupe_key(email_data)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DedupeIndex(os.path.join(tmp, 'index.db'))
+        index.add_many([job])
+        assert email_data in index
+    print("✅ JobRecord keeps one copy of the body")
+
+
+if __name__ == "__main__":
+    test_email_record()
+    test_job_record()
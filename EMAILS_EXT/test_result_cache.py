@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the extraction result cache.
+Covers the LRU tier, the on-disk tier, version invalidation and TextProcessor reuse.
+"""
+
+import os
+import tempfile
+
+from config import Config
+from result_cache import ResultCache
+
+RESULT = {'job_title': 'Senior Python Developer', 'required_skills': ['python', 'aws'], 'min_salary': None}
+
+
+def test_lru_and_disk_tiers():
+    """Evicted entries are still served from disk; counters track each tier."""
+    print("🧪 Testing result cache tiers")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'cache.db')
+        cache = ResultCache('v1', filename, max_entries=2)
+        for i in range(3):
+            cache.put(f"text {i}", dict(RESULT, job_title=f"Job {i}"))
+
+        assert cache.stats()['memory_entries'] == 2
+        assert cache.get("text 2")['job_title'] == 'Job 2'  # memory
+        assert cache.get("text 0")['job_title'] == 'Job 0'  # evicted, from disk
+        assert cache.get("unknown text") is None
+
+        stats = cache.stats()
+        assert (stats['memory_hits'], stats['disk_hits'], stats['misses']) == (1, 1, 1)
+
+        # Callers get their own copy
+        cache.get("text 2")['required_skills'].append('java')
+        assert cache.get("text 2")['required_skills'] == ['python', 'aws']
+
+        # A new process sees the on-disk tier
+        reopened = ResultCache('v1', filename, max_entries=2)
+        assert reopened.get("text 1")['job_title'] == 'Job 1'
+    print("✅ LRU and disk tiers work")
+
+
+def test_version_invalidation():
+    """Results of another extractor version are never returned and are dropped from disk."""
+    print("🧪 Testing result cache invalidation")
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'cache.db')
+        ResultCache('v1', filename).put("same text", RESULT)
+        upgraded = ResultCache('v2', filename)
+        assert upgraded.get("same text") is None
+        assert ResultCache('v1', filename).get("same text") is None
+    print("✅ Stale results invalidated")
+
+
+def test_text_processor_reuses_results():
+    """Identical bodies are extracted once, in single and batched extraction."""
+    print("🧪 Testing TextProcessor result reuse")
+    from text_processor import TextProcessor
+
+    original = (Config.RESULT_CACHE_FILE, Config.RESULT_CACHE_ENABLED)
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.RESULT_CACHE_FILE, Config.RESULT_CACHE_ENABLED = os.path.join(tmp, 'cache.db'), True
+        try:
+            processor = TextProcessor()
+            body = "We are hiring a Senior Python Developer. Requirements: 5+ years of experience."
+            calls = []
+            extract_fields = processor._extract_fields
+            processor._extract_fields = lambda *args: calls.append(1) or extract_fields(*args)
+
+            first = processor.extract_all_job_info(body)
+            second = processor.extract_all_job_info(body)
+            assert first == second and len(calls) == 1
+
+            other = "Contract role: Data Analyst with SQL and Tableau. Remote."
+            batch = processor.extract_many([body, other, other])
+            assert batch[0] == first and batch[1] == batch[2]
+            assert batch[1] is not batch[2]
+            assert len(calls) == 2
+
+            # Changing a pattern set, or the NER confidence threshold, changes the version
+            processor.job_title_patterns.append(r'Role:\s*(.+)')
+            assert processor._extractor_version() != processor.extractor_version
+            processor.job_title_patterns.pop()
+            processor.ner_pipeline = object()
+            with_model = processor._extractor_version()
+            original_threshold = Config.CONFIDENCE_THRESHOLD
+            Config.CONFIDENCE_THRESHOLD = original_threshold / 2
+            try:
+                assert processor._extractor_version() != with_model
+            finally:
+                Config.CONFIDENCE_THRESHOLD = original_threshold
+        finally:
+            Config.RESULT_CACHE_FILE, Config.RESULT_CACHE_ENABLED = original
+    print("✅ Results reused")
+
+
+def test_put_many():
+    """A batch of results is written in one go and read back by a new process."""
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'cache.db')
+        ResultCache('v1', filename).put_many([(f"text {i}", dict(RESULT, job_title=f"Job {i}")) for i in range(3)])
+        reopened = ResultCache('v1', filename)
+        assert [reopened.get(f"text {i}")['job_title'] for i in range(3)] == ['Job 0', 'Job 1', 'Job 2']
+
+
+class FailingNerPipeline:
+    def __call__(self, texts, batch_size=None):
+        raise RuntimeError("model crashed")
+
+
+def test_ner_failures_not_cached():
+    """Results degraded by a failing NER model are returned but not cached."""
+    print("🧪 Testing NER failures bypass the result cache")
+    from text_processor import TextProcessor
+
+    original = (Config.RESULT_CACHE_FILE, Config.RESULT_CACHE_ENABLED)
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.RESULT_CACHE_FILE, Config.RESULT_CACHE_ENABLED = os.path.join(tmp, 'cache.db'), True
+        try:
+            processor = TextProcessor()
+            processor.ner_pipeline = FailingNerPipeline()
+            body = "We are hiring a Senior Python Developer. Requirements: 5+ years of experience."
+            calls = []
+            extract_fields = processor._extract_fields
+            processor._extract_fields = lambda *args: calls.append(1) or extract_fields(*args)
+
+            processor.extract_all_job_info(body)
+            processor.extract_many([body])
+            processor.extract_all_job_info(body)
+            assert len(calls) == 3
+            assert processor.result_cache.stats()['memory_entries'] == 0
+        finally:
+            Config.RESULT_CACHE_FILE, Config.RESULT_CACHE_ENABLED = original
+    print("✅ Degraded results not cached")
+
+
+if __name__ == "__main__":
+    test_lru_and_disk_tiers()
+    test_version_invalidation()
+    test_text_processor_reuses_results()
+    test_put_many()
+    test_ner_failures_not_cached()
@@ -1,63 +1,43 @@
+import copy
 import re
+import time
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple, Any
 from datetime import datetime
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
-
-# Hugging Face imports for NER
-try:
-    from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
-    import torch
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    print("Warning: transformers or torch not available. BERT features will be disabled.")
+import hashlib
+import importlib.util
+import json
 
 from config import Config
+from keyword_matcher import KeywordMatcher
+from nlp_resources import get_nltk_tools
+from onnx_ner import ONNXRUNTIME_AVAILABLE, load_onnx_pipeline
+from result_cache import get_result_cache
+
+# transformers/torch are only imported when the NER pipeline is built, so
+# importing this module stays fast and free of side effects
+TRANSFORMERS_AVAILABLE = (importlib.util.find_spec('transformers') is not None
+                          and importlib.util.find_spec('torch') is not None)
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+NER_MODEL_NAME = "dslim/bert-base-NER"
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Bump when extraction logic changes in a way the pattern and keyword lists
+# don't capture, so cached results of the old logic are invalidated
+EXTRACTOR_VERSION = 1
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger')
 
 class TextProcessor:
     """Text processing utilities for cleaning and extracting job information from emails using advanced NLP."""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.stop_words = set(stopwords.words('english'))
+        
+        # Per-stage wall-clock timings (seconds) of the last extract_all_job_info call
+        self.last_stage_timings: Dict[str, float] = {}
         
         # Initialize NER pipeline if BERT is enabled
-        self.ner_pipeline = None
-        if Config.USE_BERT and TRANSFORMERS_AVAILABLE:
-            try:
-                self.logger.info("Initializing BERT NER pipeline...")
-                self.ner_pipeline = pipeline(
-                    "ner",
-                    model="dslim/bert-base-NER",
-                    aggregation_strategy="simple",
-                    device=0 if torch.cuda.is_available() else -1
-                )
-                self.logger.info("BERT NER pipeline initialized successfully")
-            except Exception as e:
-                self.logger.warning(f"Failed to initialize BERT NER pipeline: {e}. Falling back to regex patterns.")
-                self.ner_pipeline = None
-        elif Config.USE_BERT and not TRANSFORMERS_AVAILABLE:
-            self.logger.warning("BERT is enabled but transformers/torch not available. Install with: pip install transformers torch")
+        self.ner_pipeline = self._load_ner_pipeline()
         
         # Common email patterns to remove
         self.email_patterns = [
@@ -109,46 +89,419 @@ class TextProcessor:
             r'([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate|Architect|Consultant|Advisor|Coordinator|Supervisor|Administrator))\s+(?:position|role|job)',
             r'(?:Senior|Junior|Lead|Principal|Staff)\s+([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate|Architect|Consultant|Advisor|Coordinator|Supervisor|Administrator))',
         ]
+        
+        # Basic job title patterns used by extract_job_title
+        self.basic_job_title_patterns = [
+            r'(?:looking for|seeking|hiring|position for|role of|job as)\s+([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate))',
+            r'(?:position|role|job)\s+(?:as\s+)?([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate))',
+            r'([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate))\s+(?:position|role|job)',
+        ]
+        
+        # Company name patterns
+        self.company_patterns = [
+            r'(?:at|with|for|from)\s+([A-Z][A-Za-z\s&.,]+(?:Inc|Corp|LLC|Ltd|Company|Co|Group|Solutions|Systems|Technologies))',
+            r'([A-Z][A-Za-z\s&.,]+(?:Inc|Corp|LLC|Ltd|Company|Co|Group|Solutions|Systems|Technologies))',
+            r'(?:company|organization):\s*([A-Z][A-Za-z\s&.,]+)',
+        ]
+        
+        # Location patterns
+        self.location_patterns = [
+            r'(?:location|based in|work from|office in)[:\s]+([A-Za-z\s,]+(?:City|State|Country|NY|CA|TX|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|OR|CO|AZ|NV|UT|ID|MT|WY|ND|SD|NE|KS|OK|AR|LA|MS|AL|TN|KY|IN|MO|IA|MN|WI|MI|NY|MA|CT|RI|VT|NH|ME|DE|MD|DC))',
+            r'([A-Za-z\s,]+(?:City|State|Country|NY|CA|TX|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|OR|CO|AZ|NV|UT|ID|MT|WY|ND|SD|NE|KS|OK|AR|LA|MS|AL|TN|KY|IN|MO|IA|MN|WI|MI|NY|MA|CT|RI|VT|NH|ME|DE|MD|DC))',
+        ]
+        
+        # Years of experience patterns
+        self.experience_patterns = [
+            r'(\d+)[\s-]*(?:years?|yrs?)\s+(?:of\s+)?experience',
+            r'experience[:\s]+(\d+)[\s-]*(?:years?|yrs?)',
+            r'(\d+)[\s-]*(?:years?|yrs?)\s+(?:in\s+)?(?:the\s+)?field',
+            r'minimum\s+(\d+)[\s-]*(?:years?|yrs?)',
+            r'at\s+least\s+(\d+)[\s-]*(?:years?|yrs?)',
+        ]
+        
+        # Skill section patterns
+        self.skill_section_patterns = [
+            r'skills?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
+            r'requirements?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
+            r'qualifications?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
+            r'technologies?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
+        ]
+        
+        # Job summary patterns
+        self.summary_patterns = [
+            r'(?:about|description|summary|overview)[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
+            r'(?:we are|we\'re|our company|about us)[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
+        ]
+        
+        # Application deadline patterns
+        self.deadline_patterns = [
+            r'(?:deadline|apply by|application deadline|closing date)[:\s]+([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
+            r'(?:deadline|apply by|application deadline|closing date)[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+            r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})\s+(?:deadline|apply by|closing)',
+        ]
+        
+        # Salary patterns: ranges first, then single values
+        self.salary_range_patterns = [
+            r'\$(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*[-–—]\s*\$(\d{1,3}(?:,\d{3})*(?:k|K)?)',
+            r'(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*[-–—]\s*(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*(?:dollars?|USD)',
+            r'salary[:\s]+(?:range\s+)?\$(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*[-–—]\s*\$(\d{1,3}(?:,\d{3})*(?:k|K)?)',
+        ]
+        self.single_salary_patterns = [
+            r'\$(\d{1,3}(?:,\d{3})*(?:k|K)?)',
+            r'(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*(?:dollars?|USD)',
+        ]
+        
+        # Precompiled pattern bank, built once per processor
+        self.patterns = self._compile_patterns()
+        
+        # Common skill keywords
+        self.skill_keywords = [
+            'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js',
+            'sql', 'mysql', 'postgresql', 'mongodb', 'aws', 'azure', 'docker',
+            'kubernetes', 'git', 'agile', 'scrum', 'machine learning', 'ai',
+            'data science', 'excel', 'power bi', 'tableau', 'salesforce',
+            'html', 'css', 'php', 'c++', 'c#', '.net', 'spring', 'django',
+            'flask', 'fastapi', 'rest api', 'graphql', 'microservices'
+        ]
+        
+        # Job types in priority order
+        self.job_types = {
+            'full-time': ['full time', 'fulltime', 'full-time', 'permanent'],
+            'part-time': ['part time', 'parttime', 'part-time'],
+            'contract': ['contract', 'contractor', 'contracting'],
+            'temporary': ['temp', 'temporary', 'temporary position'],
+            'internship': ['intern', 'internship', 'intern position'],
+            'freelance': ['freelance', 'freelancer', 'consultant'],
+        }
+        
+        # Industries in priority order
+        self.industries = [
+            'technology', 'healthcare', 'finance', 'education', 'retail',
+            'manufacturing', 'consulting', 'marketing', 'sales', 'real estate',
+            'media', 'entertainment', 'government', 'non-profit', 'automotive',
+            'aerospace', 'energy', 'telecommunications', 'transportation'
+        ]
+        
+        # Seniority levels in priority order
+        self.seniority_levels = {
+            'entry-level': ['entry level', 'entry-level', 'junior', 'beginner'],
+            'mid-level': ['mid level', 'mid-level', 'intermediate', 'mid'],
+            'senior': ['senior', 'experienced', 'lead'],
+            'principal': ['principal', 'staff'],
+            'manager': ['manager', 'management'],
+            'director': ['director'],
+            'executive': ['executive', 'vp', 'vice president', 'c-level', 'chief']
+        }
+        
+        # One keyword automaton over every dictionary, scanned once per text
+        self.keyword_matcher = KeywordMatcher({
+            'skills': self.skill_keywords,
+            'job_types': self.job_types,
+            'industries': self.industries,
+            'seniority_levels': self.seniority_levels,
+            'job_keywords': Config.JOB_KEYWORDS,
+            'skills_keywords': Config.SKILLS_KEYWORDS,
+            'salary_keywords': Config.SALARY_KEYWORDS,
+        })
+        
+        # Results of previously seen texts, invalidated when the model or patterns change
+        self.extractor_version = self._extractor_version()
+        self.result_cache = get_result_cache(self.extractor_version) if Config.RESULT_CACHE_ENABLED else None
+    
+    def _extractor_version(self) -> str:
+        """Fingerprint of everything that determines extraction results: logic version, model and patterns."""
+        pattern_lists = {name: value for name, value in vars(self).items()
+                         if name.endswith('_patterns') and isinstance(value, list)}
+        fingerprint = json.dumps({
+            'extractor_version': EXTRACTOR_VERSION,
+            'ner_model': [NER_MODEL_NAME, self.ner_backend, Config.NER_WINDOW_TOKENS, Config.NER_WINDOW_STRIDE,
+                          Config.NER_MAX_DOC_TOKENS, Config.CONFIDENCE_THRESHOLD] if self.ner_pipeline else None,
+            'patterns': pattern_lists,
+            'keywords': self.keyword_matcher.labels,
+            'keyword_sources': [self.skill_keywords, self.job_types, self.seniority_levels,
+                                Config.JOB_KEYWORDS, Config.SKILLS_KEYWORDS, Config.SALARY_KEYWORDS],
+        }, sort_keys=True)
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+    
+    def _compile_patterns(self) -> Dict[str, Any]:
+        """Compile every regex used by the processor.
+        
+        Header, signature and forward/reply patterns are merged into one
+        alternation each, so cleaning an email takes a handful of scans. The
+        extractor patterns stay ordered lists because the first pattern that
+        matches wins.
+        """
+        def combined(patterns: List[str], flags: int) -> re.Pattern:
+            return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+        
+        def compiled(patterns: List[str], flags: int = re.IGNORECASE) -> List[re.Pattern]:
+            return [re.compile(pattern, flags) for pattern in patterns]
+        
+        return {
+            'email_headers': combined(self.email_patterns, re.IGNORECASE | re.MULTILINE),
+            'signature': combined(self.signature_patterns, re.IGNORECASE | re.DOTALL),
+            'forward_reply': combined(self.forward_reply_patterns, re.IGNORECASE | re.DOTALL),
+            'blank_lines': re.compile(r'\n\s*\n'),
+            'spaces': re.compile(r' +'),
+            'job_title': compiled(self.job_title_patterns),
+            'basic_job_title': compiled(self.basic_job_title_patterns),
+            'company': compiled(self.company_patterns),
+            'location': compiled(self.location_patterns),
+            'experience': compiled(self.experience_patterns),
+            'skill_sections': compiled(self.skill_section_patterns, re.IGNORECASE | re.MULTILINE),
+            'skill_token': re.compile(r'\b([A-Za-z][A-Za-z0-9\s+#]+?)\b'),
+            'summary': compiled(self.summary_patterns, re.IGNORECASE | re.MULTILINE),
+            'deadline': compiled(self.deadline_patterns),
+            'salary_range': compiled(self.salary_range_patterns),
+            'single_salary': compiled(self.single_salary_patterns),
+        }
+    
+    @contextmanager
+    def _timed_stage(self, stage: str):
+        """Record the wall-clock duration of a pipeline stage in last_stage_timings."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.last_stage_timings[stage] = self.last_stage_timings.get(stage, 0.0) + time.perf_counter() - start
+    
+    def scan_keywords(self, text: str) -> Dict[str, List[str]]:
+        """Scan text once for every keyword category (skills, job types, industries, ...)."""
+        return self.keyword_matcher.scan(text)
+    
+    def _load_ner_pipeline(self):
+        """Build the BERT NER pipeline if enabled, importing the inference backend only now.
+        
+        Config.NER_BACKEND selects PyTorch ('torch') or ONNX Runtime ('onnx', or
+        'onnx-int8' for dynamically quantized weights); ONNX falls back to PyTorch
+        when it can't be loaded.
+        """
+        self.ner_backend = None
+        if not Config.USE_BERT:
+            return None
+        
+        backend = Config.NER_BACKEND.lower()
+        if backend in ('onnx', 'onnx-int8'):
+            if not (ONNXRUNTIME_AVAILABLE and importlib.util.find_spec('transformers') is not None):
+                self.logger.warning("NER_BACKEND is ONNX but onnxruntime/transformers not available. "
+                                    "Install with: pip install onnxruntime onnx transformers. Falling back to PyTorch.")
+            else:
+                try:
+                    self.logger.info(f"Initializing BERT NER pipeline on ONNX Runtime ({backend})...")
+                    ner_pipeline = load_onnx_pipeline(NER_MODEL_NAME, quantize=backend == 'onnx-int8')
+                    self.ner_backend = backend
+                    self.logger.info("BERT NER pipeline initialized successfully")
+                    return ner_pipeline
+                except Exception as e:
+                    self.logger.warning(f"Failed to initialize ONNX NER pipeline: {e}. Falling back to PyTorch.")
+        elif backend != 'torch':
+            self.logger.warning(f"Unknown NER_BACKEND '{Config.NER_BACKEND}'; using PyTorch.")
+        
+        if not TRANSFORMERS_AVAILABLE:
+            self.logger.warning("BERT is enabled but transformers/torch not available. Install with: pip install transformers torch")
+            return None
+        try:
+            self.logger.info("Initializing BERT NER pipeline...")
+            import torch
+            from transformers import pipeline
+            ner_pipeline = pipeline(
+                "ner",
+                model=NER_MODEL_NAME,
+                aggregation_strategy="simple",
+                device=0 if torch.cuda.is_available() else -1
+            )
+            self.ner_backend = 'torch'
+            self.logger.info("BERT NER pipeline initialized successfully")
+            return ner_pipeline
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize BERT NER pipeline: {e}. Falling back to regex patterns.")
+            return None
+    
+    @property
+    def stop_words(self) -> set:
+        """English stop words, loaded from NLTK on first use."""
+        return get_nltk_tools().stop_words
+    
+    def _capitalized_title(self, text: str) -> Optional[str]:
+        """Fallback job title: the first all-caps proper nouns of a sentence."""
+        tools = get_nltk_tools()
+        for sentence in tools.sent_tokenize(text):
+            words = tools.word_tokenize(sentence)
+            if tools.pos_tag:
+                tagged = tools.pos_tag(words)
+            else:
+                # Without the tagger, treat all-caps words as proper nouns
+                tagged = [(word, 'NNP' if word.isalpha() else '') for word in words]
+            
+            # Look for proper nouns that might be job titles
+            title_candidates = [word for word, tag in tagged if tag.startswith('NNP') and word.isupper()]
+            if title_candidates:
+                return ' '.join(title_candidates[:3])  # Limit to first 3 words
+        
+        return None
     
     def extract_entities_with_bert(self, text: str) -> Dict[str, List[str]]:
-        """Extract named entities using BERT NER model."""
+        """Extract named entities using BERT NER model, window by window for long texts."""
         if not self.ner_pipeline or not text:
             return {}
         
-        try:
-            # Run NER on the text
-            entities = self.ner_pipeline(text)
-            
-            # Group entities by type
-            entity_groups = {
-                'PERSON': [],
-                'ORG': [],
-                'LOC': [],
-                'MISC': []
-            }
-            
+        return self.extract_entities_batch([text])[0]
+    
+    def extract_entities_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, List[str]]]:
+        """Extract named entities for many texts, feeding the NER model in batches.
+        
+        Long texts are split into overlapping token windows (see _ner_windows) whose
+        entities are merged back per text. Windows are bucketed by length before
+        batching so that each batch is padded to a similar sequence length.
+        Results are returned in input order.
+        """
+        return self._extract_entities(texts, batch_size)[0]
+    
+    def _extract_entities(self, texts: List[str],
+                          batch_size: Optional[int] = None) -> Tuple[List[Dict[str, List[str]]], Set[int]]:
+        """extract_entities_batch, plus the indices of texts the NER model failed on."""
+        results: List[Dict[str, List[str]]] = [{} for _ in texts]
+        if not self.ner_pipeline:
+            return results, set()
+        
+        # (text index, character offset of the window, window text) for every window
+        windows = []
+        for i, text in enumerate(texts):
+            if text:
+                windows.extend((i, start, text[start:end]) for start, end in self._ner_windows(text))
+        
+        window_entities, failed_windows = self._run_ner([window_text for _, _, window_text in windows], batch_size)
+        failed = {windows[w][0] for w in failed_windows}
+        
+        per_text: Dict[int, List[Dict[str, Any]]] = {}
+        for (i, offset, _), entities in zip(windows, window_entities):
             for entity in entities:
-                if entity['score'] >= Config.CONFIDENCE_THRESHOLD:
-                    entity_type = entity['entity_group']
-                    entity_text = entity['word'].strip()
-                    
-                    if entity_type in entity_groups and entity_text not in entity_groups[entity_type]:
-                        entity_groups[entity_type].append(entity_text)
-            
-            return entity_groups
-            
+                entity = dict(entity)
+                if entity.get('start') is not None:
+                    entity['start'] += offset
+                    entity['end'] += offset
+                per_text.setdefault(i, []).append(entity)
+        
+        for i, entities in per_text.items():
+            results[i] = self._group_entities(self._merge_window_entities(entities))
+        return results, failed
+    
+    def _ner_windows(self, text: str) -> List[Tuple[int, int]]:
+        """Character spans of the NER windows of a text.
+        
+        Windows hold Config.NER_WINDOW_TOKENS tokens and start every
+        Config.NER_WINDOW_STRIDE tokens, so neighbours overlap and an entity cut at
+        one window's edge is whole in the next. Only the first
+        Config.NER_MAX_DOC_TOKENS tokens are covered, so one huge newsletter can't
+        monopolize the model. If the tokenizer can't report offsets, the whole
+        text is one window.
+        """
+        window = max(1, min(Config.NER_WINDOW_TOKENS, 510))  # BERT's 512 positions minus [CLS]/[SEP]
+        stride = max(1, min(Config.NER_WINDOW_STRIDE, window))
+        # A token covers at least one character: short texts fit one window untokenized
+        if len(text) <= window:
+            return [(0, len(text))]
+        
+        try:
+            offsets = [(start, end) for start, end in self.ner_pipeline.tokenizer(
+                text, add_special_tokens=False, return_offsets_mapping=True)['offset_mapping'] if end > start]
         except Exception as e:
-            self.logger.error(f"Error in BERT NER extraction: {e}")
-            return {}
+            self.logger.warning(f"NER tokenizer failed ({e}); running the whole text as one window.")
+            return [(0, len(text))]
+        if len(offsets) > Config.NER_MAX_DOC_TOKENS:
+            self.logger.debug(f"NER limited to the first {Config.NER_MAX_DOC_TOKENS} of {len(offsets)} tokens")
+            offsets = offsets[:max(1, Config.NER_MAX_DOC_TOKENS)]
+        if len(offsets) <= window:
+            return [(0, offsets[-1][1] if offsets else len(text))]
+        
+        spans = []
+        for first in range(0, len(offsets), stride):
+            last = min(first + window, len(offsets)) - 1
+            spans.append((offsets[first][0], offsets[last][1]))
+            if last == len(offsets) - 1:
+                break
+        return spans
+    
+    def _run_ner(self, texts: List[str], batch_size: Optional[int] = None) -> Tuple[List[List[Dict[str, Any]]], Set[int]]:
+        """Raw NER pipeline output for each text, in length-bucketed batches.
+        
+        Texts the model fails on get no entities; their indices are returned
+        alongside, so that degraded results aren't cached.
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        failed: Set[int] = set()
+        batch_size = max(1, batch_size or Config.NER_BATCH_SIZE)
+        
+        # Length bucketing: sort texts by length, then cut into batches
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            batch_indices = order[start:start + batch_size]
+            batch_texts = [texts[i] for i in batch_indices]
+            try:
+                batch_entities = self.ner_pipeline(batch_texts, batch_size=len(batch_texts))
+            except Exception as e:
+                self.logger.warning(f"Batched BERT NER failed ({e}); retrying documents one at a time.")
+                for i in batch_indices:
+                    try:
+                        results[i] = self.ner_pipeline(texts[i])
+                    except Exception as e:
+                        self.logger.error(f"Error in BERT NER extraction: {e}")
+                        failed.add(i)
+                continue
+            
+            for i, entities in zip(batch_indices, batch_entities):
+                results[i] = entities
+        
+        return results, failed
+    
+    @staticmethod
+    def _merge_window_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge entities found by overlapping windows: of overlapping spans, keep the longest, then most confident."""
+        positioned = sorted((e for e in entities if e.get('start') is not None),
+                            key=lambda e: (e['start'], -(e['end'] - e['start'])))
+        merged: List[Dict[str, Any]] = []
+        for entity in positioned:
+            if merged and entity['start'] < merged[-1]['end']:
+                kept = merged[-1]
+                if (entity['end'] - entity['start'], entity['score']) > (kept['end'] - kept['start'], kept['score']):
+                    merged[-1] = entity
+                continue
+            merged.append(entity)
+        # Entities without offsets are deduped later by text
+        return merged + [e for e in entities if e.get('start') is None]
+    
+    def _group_entities(self, entities: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Group raw NER pipeline output by entity type, keeping confident unique entities."""
+        entity_groups = {
+            'PERSON': [],
+            'ORG': [],
+            'LOC': [],
+            'MISC': []
+        }
+        
+        for entity in entities:
+            if entity['score'] >= Config.CONFIDENCE_THRESHOLD:
+                entity_type = entity['entity_group']
+                entity_text = entity['word'].strip()
+                
+                if entity_type in entity_groups and entity_text not in entity_groups[entity_type]:
+                    entity_groups[entity_type].append(entity_text)
+        
+        return entity_groups
     
-    def extract_job_title_bert(self, text: str) -> Optional[str]:
-        """Extract job title using BERT NER and enhanced patterns."""
+    def extract_job_title_bert(self, text: str, entities: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
+        """Extract job title using BERT NER and enhanced patterns.
+        
+        If ``entities`` (the output of extract_entities_with_bert) is given, it is
+        reused instead of running the NER model again.
+        """
         if not text:
             return None
         
         # First try BERT NER for organizations and misc entities
         if self.ner_pipeline:
-            entities = self.extract_entities_with_bert(text)
+            if entities is None:
+                entities = self.extract_entities_with_bert(text)
             
             # Look for job titles in MISC entities (often contain job titles)
             for misc_entity in entities.get('MISC', []):
@@ -161,38 +514,25 @@ class TextProcessor:
                     return misc_entity
         
         # Fallback to enhanced regex patterns
-        for pattern in self.job_title_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['job_title']:
+            match = pattern.search(text)
             if match:
                 title = match.group(1).strip()
                 if len(title) > 3:  # Filter out very short matches
                     return title
         
         # Additional fallback: look for capitalized phrases that might be job titles
-        sentences = sent_tokenize(text)
-        for sentence in sentences:
-            words = word_tokenize(sentence)
-            tagged = pos_tag(words)
-            
-            # Look for proper nouns that might be job titles
-            title_candidates = []
-            for word, tag in tagged:
-                if tag.startswith('NNP') and word.isupper():
-                    title_candidates.append(word)
-            
-            if title_candidates:
-                return ' '.join(title_candidates[:3])  # Limit to first 3 words
-        
-        return None
+        return self._capitalized_title(text)
     
-    def extract_company_name_bert(self, text: str) -> Optional[str]:
-        """Extract company name using BERT NER."""
+    def extract_company_name_bert(self, text: str, entities: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
+        """Extract company name using BERT NER, reusing precomputed ``entities`` if given."""
         if not text:
             return None
         
         # Use BERT NER for organization extraction
         if self.ner_pipeline:
-            entities = self.extract_entities_with_bert(text)
+            if entities is None:
+                entities = self.extract_entities_with_bert(text)
             
             # Look for organizations
             for org in entities.get('ORG', []):
@@ -204,14 +544,8 @@ class TextProcessor:
                     return org
         
         # Fallback to regex patterns
-        patterns = [
-            r'(?:at|with|for|from)\s+([A-Z][A-Za-z\s&.,]+(?:Inc|Corp|LLC|Ltd|Company|Co|Group|Solutions|Systems|Technologies))',
-            r'([A-Z][A-Za-z\s&.,]+(?:Inc|Corp|LLC|Ltd|Company|Co|Group|Solutions|Systems|Technologies))',
-            r'(?:company|organization):\s*([A-Z][A-Za-z\s&.,]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['company']:
+            match = pattern.search(text)
             if match:
                 company = match.group(1).strip()
                 if len(company) > 2:
@@ -219,14 +553,15 @@ class TextProcessor:
         
         return None
     
-    def extract_location_bert(self, text: str) -> Optional[str]:
-        """Extract location using BERT NER."""
+    def extract_location_bert(self, text: str, entities: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
+        """Extract location using BERT NER, reusing precomputed ``entities`` if given."""
         if not text:
             return None
         
         # Use BERT NER for location extraction
         if self.ner_pipeline:
-            entities = self.extract_entities_with_bert(text)
+            if entities is None:
+                entities = self.extract_entities_with_bert(text)
             
             # Look for locations
             locations = entities.get('LOC', [])
@@ -234,13 +569,8 @@ class TextProcessor:
                 return locations[0]  # Return the first location found
         
         # Fallback to regex patterns
-        patterns = [
-            r'(?:location|based in|work from|office in)[:\s]+([A-Za-z\s,]+(?:City|State|Country|NY|CA|TX|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|OR|CO|AZ|NV|UT|ID|MT|WY|ND|SD|NE|KS|OK|AR|LA|MS|AL|TN|KY|IN|MO|IA|MN|WI|MI|NY|MA|CT|RI|VT|NH|ME|DE|MD|DC))',
-            r'([A-Za-z\s,]+(?:City|State|Country|NY|CA|TX|FL|IL|PA|OH|GA|NC|MI|NJ|VA|WA|OR|CO|AZ|NV|UT|ID|MT|WY|ND|SD|NE|KS|OK|AR|LA|MS|AL|TN|KY|IN|MO|IA|MN|WI|MI|NY|MA|CT|RI|VT|NH|ME|DE|MD|DC))',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['location']:
+            match = pattern.search(text)
             if match:
                 location = match.group(1).strip()
                 if len(location) > 2:
@@ -257,20 +587,17 @@ class TextProcessor:
         text = str(text)
         
         # Remove email headers
-        for pattern in self.email_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+        text = self.patterns['email_headers'].sub('', text)
         
         # Remove signatures
-        for pattern in self.signature_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+        text = self.patterns['signature'].sub('', text)
         
         # Remove forwarded/replied content
-        for pattern in self.forward_reply_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+        text = self.patterns['forward_reply'].sub('', text)
         
         # Remove multiple newlines and spaces
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = self.patterns['blank_lines'].sub('\n\n', text)
+        text = self.patterns['spaces'].sub(' ', text)
         
         # Remove leading/trailing whitespace
         text = text.strip()
@@ -283,95 +610,51 @@ class TextProcessor:
             return None
         
         # Common job title patterns
-        patterns = [
-            r'(?:looking for|seeking|hiring|position for|role of|job as)\s+([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate))',
-            r'(?:position|role|job)\s+(?:as\s+)?([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate))',
-            r'([A-Z][a-z\s]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead|Senior|Junior|Associate))\s+(?:position|role|job)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['basic_job_title']:
+            match = pattern.search(text)
             if match:
                 title = match.group(1).strip()
                 if len(title) > 3:  # Filter out very short matches
                     return title
         
         # Fallback: look for capitalized phrases that might be job titles
-        sentences = sent_tokenize(text)
-        for sentence in sentences:
-            words = word_tokenize(sentence)
-            tagged = pos_tag(words)
-            
-            # Look for proper nouns that might be job titles
-            title_candidates = []
-            for word, tag in tagged:
-                if tag.startswith('NNP') and word.isupper():
-                    title_candidates.append(word)
-            
-            if title_candidates:
-                return ' '.join(title_candidates[:3])  # Limit to first 3 words
-        
-        return None
+        return self._capitalized_title(text)
     
     def extract_years_experience(self, text: str) -> Optional[str]:
         """Extract years of experience requirement."""
         if not text:
             return None
         
-        patterns = [
-            r'(\d+)[\s-]*(?:years?|yrs?)\s+(?:of\s+)?experience',
-            r'experience[:\s]+(\d+)[\s-]*(?:years?|yrs?)',
-            r'(\d+)[\s-]*(?:years?|yrs?)\s+(?:in\s+)?(?:the\s+)?field',
-            r'minimum\s+(\d+)[\s-]*(?:years?|yrs?)',
-            r'at\s+least\s+(\d+)[\s-]*(?:years?|yrs?)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['experience']:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
         return None
     
-    def extract_skills(self, text: str) -> List[str]:
-        """Extract required skills from text."""
+    def extract_skills(self, text: str, keyword_hits: Optional[Dict[str, List[str]]] = None) -> List[str]:
+        """Extract required skills from text.
+        
+        ``keyword_hits`` is the output of scan_keywords; it is computed if not given.
+        """
         if not text:
             return []
         
-        skills = []
+        if keyword_hits is None:
+            keyword_hits = self.scan_keywords(text)
         
-        # Common skill keywords
-        skill_keywords = [
-            'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js',
-            'sql', 'mysql', 'postgresql', 'mongodb', 'aws', 'azure', 'docker',
-            'kubernetes', 'git', 'agile', 'scrum', 'machine learning', 'ai',
-            'data science', 'excel', 'power bi', 'tableau', 'salesforce',
-            'html', 'css', 'php', 'c++', 'c#', '.net', 'spring', 'django',
-            'flask', 'fastapi', 'rest api', 'graphql', 'microservices'
-        ]
-        
-        # Look for skills in text
-        text_lower = text.lower()
-        for skill in skill_keywords:
-            if skill in text_lower:
-                skills.append(skill.title())
+        # Skills found by the keyword automaton
+        skills = [skill.title() for skill in keyword_hits['skills']]
         
         # Look for skills in specific sections
-        skill_sections = [
-            r'skills?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
-            r'requirements?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
-            r'qualifications?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
-            r'technologies?[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
-        ]
-        
-        for pattern in skill_sections:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for pattern in self.patterns['skill_sections']:
+            matches = pattern.findall(text)
             for match in matches:
                 # Extract individual skills from the section
-                section_skills = re.findall(r'\b([A-Za-z][A-Za-z0-9\s+#]+?)\b', match)
+                section_skills = self.patterns['skill_token'].findall(match)
                 for skill in section_skills:
                     skill = skill.strip()
-                    if len(skill) > 2 and skill.lower() in skill_keywords:
+                    if len(skill) > 2 and skill.lower() in self.skill_keywords:
                         skills.append(skill.title())
         
         return list(set(skills))  # Remove duplicates
@@ -382,14 +665,8 @@ class TextProcessor:
             return None
         
         # Look for company patterns
-        patterns = [
-            r'(?:at|with|for|from)\s+([A-Z][A-Za-z\s&.,]+(?:Inc|Corp|LLC|Ltd|Company|Co|Group|Solutions|Systems|Technologies))',
-            r'([A-Z][A-Za-z\s&.,]+(?:Inc|Corp|LLC|Ltd|Company|Co|Group|Solutions|Systems|Technologies))',
-            r'(?:company|organization):\s*([A-Z][A-Za-z\s&.,]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['company']:
+            match = pattern.search(text)
             if match:
                 company = match.group(1).strip()
                 if len(company) > 2:
@@ -397,71 +674,39 @@ class TextProcessor:
         
         return None
     
-    def extract_job_type(self, text: str) -> Optional[str]:
+    def extract_job_type(self, text: str, keyword_hits: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
         """Extract job type (full-time, part-time, contract, etc.)."""
         if not text:
             return None
         
-        text_lower = text.lower()
-        
-        job_types = {
-            'full-time': ['full time', 'fulltime', 'full-time', 'permanent'],
-            'part-time': ['part time', 'parttime', 'part-time'],
-            'contract': ['contract', 'contractor', 'contracting'],
-            'temporary': ['temp', 'temporary', 'temporary position'],
-            'internship': ['intern', 'internship', 'intern position'],
-            'freelance': ['freelance', 'freelancer', 'consultant'],
-        }
-        
-        for job_type, keywords in job_types.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return job_type
+        if keyword_hits is None:
+            keyword_hits = self.scan_keywords(text)
         
-        return None
+        # Labels are ordered by priority, so the first hit wins
+        job_types = keyword_hits['job_types']
+        return job_types[0] if job_types else None
     
-    def extract_industry(self, text: str) -> Optional[str]:
+    def extract_industry(self, text: str, keyword_hits: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
         """Extract industry from text."""
         if not text:
             return None
         
-        industries = [
-            'technology', 'healthcare', 'finance', 'education', 'retail',
-            'manufacturing', 'consulting', 'marketing', 'sales', 'real estate',
-            'media', 'entertainment', 'government', 'non-profit', 'automotive',
-            'aerospace', 'energy', 'telecommunications', 'transportation'
-        ]
+        if keyword_hits is None:
+            keyword_hits = self.scan_keywords(text)
         
-        text_lower = text.lower()
-        for industry in industries:
-            if industry in text_lower:
-                return industry.title()
-        
-        return None
+        industries = keyword_hits['industries']
+        return industries[0].title() if industries else None
     
-    def extract_seniority_level(self, text: str) -> Optional[str]:
+    def extract_seniority_level(self, text: str, keyword_hits: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
         """Extract seniority level from text."""
         if not text:
             return None
         
-        text_lower = text.lower()
-        
-        levels = {
-            'entry-level': ['entry level', 'entry-level', 'junior', 'beginner'],
-            'mid-level': ['mid level', 'mid-level', 'intermediate', 'mid'],
-            'senior': ['senior', 'experienced', 'lead'],
-            'principal': ['principal', 'staff'],
-            'manager': ['manager', 'management'],
-            'director': ['director'],
-            'executive': ['executive', 'vp', 'vice president', 'c-level', 'chief']
-        }
+        if keyword_hits is None:
+            keyword_hits = self.scan_keywords(text)
         
-        for level, keywords in levels.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return level
-        
-        return None
+        levels = keyword_hits['seniority_levels']
+        return levels[0] if levels else None
     
     def extract_job_summary(self, text: str) -> Optional[str]:
         """Extract job summary/description."""
@@ -469,20 +714,15 @@ class TextProcessor:
             return None
         
         # Look for summary sections
-        patterns = [
-            r'(?:about|description|summary|overview)[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
-            r'(?:we are|we\'re|our company|about us)[:\s]+(.*?)(?:\n\n|\n[A-Z]|$)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for pattern in self.patterns['summary']:
+            match = pattern.search(text)
             if match:
                 summary = match.group(1).strip()
                 if len(summary) > 20:  # Minimum length for meaningful summary
                     return summary[:500]  # Limit length
         
         # Fallback: take first few sentences
-        sentences = sent_tokenize(text)
+        sentences = get_nltk_tools().sent_tokenize(text)
         if sentences:
             summary = ' '.join(sentences[:3])  # First 3 sentences
             if len(summary) > 20:
@@ -495,14 +735,8 @@ class TextProcessor:
         if not text:
             return None
         
-        patterns = [
-            r'(?:deadline|apply by|application deadline|closing date)[:\s]+([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
-            r'(?:deadline|apply by|application deadline|closing date)[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})\s+(?:deadline|apply by|closing)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['deadline']:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
@@ -514,27 +748,16 @@ class TextProcessor:
             return None, None
         
         # Look for salary patterns
-        patterns = [
-            r'\$(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*[-–—]\s*\$(\d{1,3}(?:,\d{3})*(?:k|K)?)',
-            r'(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*[-–—]\s*(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*(?:dollars?|USD)',
-            r'salary[:\s]+(?:range\s+)?\$(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*[-–—]\s*\$(\d{1,3}(?:,\d{3})*(?:k|K)?)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['salary_range']:
+            match = pattern.search(text)
             if match:
                 min_salary = match.group(1)
                 max_salary = match.group(2)
                 return min_salary, max_salary
         
         # Look for single salary values
-        single_patterns = [
-            r'\$(\d{1,3}(?:,\d{3})*(?:k|K)?)',
-            r'(\d{1,3}(?:,\d{3})*(?:k|K)?)\s*(?:dollars?|USD)',
-        ]
-        
-        for pattern in single_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['single_salary']:
+            matches = pattern.findall(text)
             if len(matches) >= 2:
                 return matches[0], matches[1]
             elif len(matches) == 1:
@@ -542,13 +765,98 @@ class TextProcessor:
         
         return None, None
     
-    def extract_all_job_info(self, text: str) -> Dict[str, Any]:
-        """Extract all job-related information from text using enhanced NLP and robust fallback."""
-        cleaned_text = self.clean_email_text(text)
+    def extract_all_job_info(self, text: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Extract all job-related information from text using enhanced NLP and robust fallback.
+        
+        The NER model runs once per document; its grouped entities are shared by the
+        title, company and location extractors. Texts extracted before are answered
+        from ``self.result_cache`` unless ``use_cache`` is False. Per-stage timings
+        of the call are left in ``self.last_stage_timings``.
+        """
+        self.last_stage_timings = {}
+        use_cache = use_cache and self.result_cache is not None
+        with self._timed_stage('total'):
+            with self._timed_stage('clean'):
+                cleaned_text = self.clean_email_text(text)
+            
+            with self._timed_stage('cache'):
+                result = self.result_cache.get(cleaned_text) if use_cache else None
+            
+            if result is None:
+                # --- Entity extraction stage: a single NER forward pass per email ---
+                with self._timed_stage('ner'):
+                    entities, failed = self._extract_entities([cleaned_text])
+                
+                with self._timed_stage('fields'):
+                    result = self._extract_fields(cleaned_text, entities[0])
+                
+                if use_cache and not failed:
+                    self.result_cache.put(cleaned_text, result)
+        
+        self.logger.debug("Stage timings (s): " + ", ".join(
+            f"{stage}={seconds:.4f}" for stage, seconds in self.last_stage_timings.items()))
+        return result
+    
+    def extract_many(self, texts: List[str], batch_size: Optional[int] = None,
+                     progress_callback=None, use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Extract job information from many emails at once.
+        
+        Equivalent to calling extract_all_job_info on each text, but the NER model
+        sees batches of length-bucketed documents instead of one document at a time,
+        and only texts missing from the result cache are extracted at all; new
+        results are written back in one transaction. Results are returned in input
+        order. ``progress_callback(done, total)`` is called after each document's
+        fields have been extracted.
+        """
+        self.last_stage_timings = {}
+        use_cache = use_cache and self.result_cache is not None
+        results: List[Dict[str, Any]] = []
+        with self._timed_stage('total'):
+            with self._timed_stage('clean'):
+                cleaned_texts = [self.clean_email_text(text) for text in texts]
+            
+            with self._timed_stage('cache'):
+                cached = [self.result_cache.get(cleaned_text) if use_cache else None
+                          for cleaned_text in cleaned_texts]
+                # Unique texts not seen before; duplicates within the batch are extracted once
+                misses = list(dict.fromkeys(
+                    cleaned_text for cleaned_text, result in zip(cleaned_texts, cached) if result is None))
+            
+            with self._timed_stage('ner'):
+                entities, failed = self._extract_entities(misses, batch_size)
+                entities_by_text = dict(zip(misses, entities))
+                failed_texts = {misses[i] for i in failed}
+            
+            with self._timed_stage('fields'):
+                extracted: Dict[str, Dict[str, Any]] = {}
+                new_results = []
+                for cleaned_text, result in zip(cleaned_texts, cached):
+                    if result is None and cleaned_text in extracted:
+                        result = copy.deepcopy(extracted[cleaned_text])
+                    elif result is None:
+                        result = self._extract_fields(cleaned_text, entities_by_text[cleaned_text])
+                        extracted[cleaned_text] = copy.deepcopy(result)
+                        if cleaned_text not in failed_texts:
+                            new_results.append((cleaned_text, extracted[cleaned_text]))
+                    results.append(result)
+                    if progress_callback:
+                        progress_callback(len(results), len(texts))
+            
+            if use_cache and new_results:
+                with self._timed_stage('cache'):
+                    self.result_cache.put_many(new_results)
+        
+        self.logger.debug(f"Extracted {len(results)} documents. Stage timings (s): " + ", ".join(
+            f"{stage}={seconds:.4f}" for stage, seconds in self.last_stage_timings.items()))
+        return results
+    
+    def _extract_fields(self, cleaned_text: str, entities: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Run every field extractor over already cleaned text and precomputed NER entities."""
+        keyword_hits = self.scan_keywords(cleaned_text)
         min_salary, max_salary = self.extract_salary_range(cleaned_text)
 
         # --- Robust job title extraction ---
-        job_title = self.extract_job_title_bert(cleaned_text)
+        job_title = self.extract_job_title_bert(cleaned_text, entities)
         if not job_title:
             job_title = self.extract_job_title(cleaned_text)
         if not job_title:
@@ -559,7 +867,7 @@ class TextProcessor:
                     break
 
         # --- Robust company extraction ---
-        company_name = self.extract_company_name_bert(cleaned_text)
+        company_name = self.extract_company_name_bert(cleaned_text, entities)
         if not company_name:
             company_name = self.extract_company_name(cleaned_text)
         if not company_name:
@@ -570,7 +878,7 @@ class TextProcessor:
                     break
 
         # --- Robust location extraction ---
-        location = self.extract_location_bert(cleaned_text)
+        location = self.extract_location_bert(cleaned_text, entities)
         if not location:
             # Heuristic: look for lines with 'location', 'based in', etc.
             for line in cleaned_text.splitlines():
@@ -581,15 +889,15 @@ class TextProcessor:
         return {
             'job_title': job_title,
             'years_experience': self.extract_years_experience(cleaned_text),
-            'required_skills': self.extract_skills(cleaned_text),
+            'required_skills': self.extract_skills(cleaned_text, keyword_hits),
             'company_name': company_name,
-            'job_type': self.extract_job_type(cleaned_text),
-            'industry': self.extract_industry(cleaned_text),
-            'seniority_level': self.extract_seniority_level(cleaned_text),
+            'job_type': self.extract_job_type(cleaned_text, keyword_hits),
+            'industry': self.extract_industry(cleaned_text, keyword_hits),
+            'seniority_level': self.extract_seniority_level(cleaned_text, keyword_hits),
             'job_summary': self.extract_job_summary(cleaned_text),
             'location': location,
             'application_deadline': self.extract_deadline(cleaned_text),
             'min_salary': min_salary,
             'max_salary': max_salary,
             'cleaned_text': cleaned_text
-        } 
\ No newline at end of file
+        }